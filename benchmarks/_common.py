@@ -0,0 +1,67 @@
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'accounts_pkg.settings')
+
+
+def setup_django(test_database_name=None):
+    """
+    configures django and creates a throwaway test database, returns a callable that destroys it.
+    ``test_database_name`` overrides the name of the test database, like a file instead of sqlite's in memory one.
+    """
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    if test_database_name:
+        connection.settings_dict['TEST']['NAME'] = test_database_name
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    def teardown():
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    return teardown
+
+
+def percentile(samples, percent):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """
+    summarizes a list of durations in seconds, reported in milliseconds.
+    """
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.mean(samples) * 1000,
+        "stdev_ms": (statistics.stdev(samples) if len(samples) > 1 else 0) * 1000,
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+    }
+
+
+def report(results, as_json=False):
+    if as_json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+        return
+
+    for name, summary in results.items():
+        if not isinstance(summary, dict):
+            print("{:<24} {}".format(name, summary))
+            continue
+        print("{:<24} {}".format(name, "  ".join(
+            "{}={:.2f}".format(key, value) if isinstance(value, float) else "{}={}".format(key, value)
+            for key, value in summary.items())))
@@ -0,0 +1,67 @@
+"""
+measures password hashing throughput when importing users with plain passwords: the serial
+RegisterSerializer.create path, make_password in a loop, and make_passwords in a process pool.
+
+    python benchmarks/import_hashing.py --users 200 --workers 4 [--json]
+"""
+import argparse
+import os
+import time
+
+from _common import setup_django, report
+
+
+def throughput(func, count):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return {"count": count, "seconds": elapsed, "hashes_per_second": count / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--json', action='store_true')
+    options = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from django.contrib.auth.hashers import make_password
+        from dj_accounts.authentication.hashers import get_password_hashing_pool, make_passwords, \
+            warm_password_hasher
+        from dj_accounts.authentication.serializers import RegisterSerializer
+
+        warm_password_hasher()
+        passwords = ['Benchmark-{}-password'.format(i) for i in range(options.users)]
+
+        def register():
+            # create() only, validate() checks the RegisterForm fields the serializer does not declare
+            serializer = RegisterSerializer()
+            for i, password in enumerate(passwords):
+                serializer.create({
+                    'username': 'benchmark{}'.format(i), 'email': 'benchmark{}@mail.com'.format(i),
+                    'phone': '0100000{:04d}'.format(i), 'password1': password, 'password2': password,
+                })
+
+        results = {
+            "register_serializer": throughput(register, options.users),
+            "make_password": throughput(lambda: [make_password(password) for password in passwords], options.users),
+        }
+        # the pool is started before timing, the import command reuses it for every chunk
+        with get_password_hashing_pool(options.workers) as pool:
+            list(pool.map(int, range(options.workers)))
+            results["make_passwords_{}_workers".format(options.workers)] = throughput(
+                lambda: make_passwords(passwords, pool, max(1, options.users // (options.workers * 4))),
+                options.users)
+
+        serial = results["register_serializer"]["hashes_per_second"]
+        results["speedup"] = {name: round(summary["hashes_per_second"] / serial, 2)
+                              for name, summary in results.items() if name != "register_serializer"}
+        report(results, options.json)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,274 @@
+"""
+drives the login, register, token refresh, phone verification and profile update api views from concurrent
+threads with a weighted mix of requests, and reports per view the throughput, the latency percentiles,
+the queries and the cpu time per request.
+
+    python benchmarks/load_test.py --requests 1000 --concurrency 4 --mix default [--json] [--output run.json]
+    python benchmarks/load_test.py --mix login=80,refresh=20
+
+the mix is a preset (default, signup, login) or comma separated ``request=weight`` pairs of login, refresh,
+register, verify_phone and update_profile. the requests are drawn from the mix with a fixed seed and every one
+of them is built before the run, so two runs of a release send the same requests.
+
+on sqlite the test database is a temporary file, sqlite serializes the writes so with a concurrency above 1
+the write heavy requests mostly measure its lock. on a local postgres:
+
+    DJANGO_SETTINGS_MODULE=settings_postgres python benchmarks/load_test.py --concurrency 8
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from _common import setup_django, summarize, report
+
+MIXES = {
+    # returning users, the usual traffic of an established app
+    'default': {'login': 40, 'refresh': 35, 'update_profile': 15, 'register': 5, 'verify_phone': 5},
+    'signup': {'register': 50, 'verify_phone': 30, 'login': 20},
+    'login': {'login': 80, 'refresh': 20},
+}
+
+REQUESTS = ('login', 'refresh', 'register', 'verify_phone', 'update_profile')
+
+
+def parse_mix(value):
+    if value in MIXES:
+        return dict(MIXES[value])
+
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in REQUESTS:
+            raise argparse.ArgumentTypeError("unknown request {}, choose from {}".format(name, ', '.join(REQUESTS)))
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+class LoadTest:
+    """
+    builds the requests of every kind before the run, against ``users`` existing users sharing one
+    password hash, so the setup does not hash a password per user.
+    """
+    password = 'secret'
+
+    def __init__(self, users=100, login_failure_rate=0.1, seed=0):
+        from django.contrib.auth import get_user_model
+        from django.contrib.auth.hashers import make_password
+        from django.utils.timezone import now
+        from rest_framework.test import APIRequestFactory
+
+        from dj_accounts.authentication import views_api
+
+        self.UserModel = get_user_model()
+        self.factory = APIRequestFactory()
+        self.random = random.Random(seed)
+        self.login_failure_rate = login_failure_rate
+        self.password_hash = make_password(self.password)
+        self.created = 0
+        self.users = self.create_users(users, phone_verified_at=now())
+        self.tokens = {}
+        self.views = {
+            'login': views_api.LoginAPIView.as_view(),
+            'refresh': views_api.TokenRefreshAPIView.as_view(),
+            'register': views_api.RegisterAPIView.as_view(),
+            'verify_phone': views_api.VerifyPhoneAPIView.as_view(),
+            'update_profile': views_api.UpdateProfileAPIView.as_view(),
+        }
+
+    def create_users(self, count, **fields):
+        users = []
+        for i in range(self.created, self.created + count):
+            users.append(self.UserModel(
+                username='load.{}'.format(i), email='load.{}@mail.com'.format(i), phone='+2010{:08d}'.format(i),
+                first_name='Load', last_name='Test', password=self.password_hash, **fields))
+        self.created += count
+        self.UserModel.objects.bulk_create(users, batch_size=500)
+        # bulk_create sets the primary keys on postgres only
+        return list(self.UserModel.objects.filter(username__in=[user.username for user in users]))
+
+    def authorization(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        if user.pk not in self.tokens:
+            self.tokens[user.pk] = 'Bearer {}'.format(AccessToken.for_user(user))
+        return {'HTTP_AUTHORIZATION': self.tokens[user.pk]}
+
+    def build(self, name, count):
+        """
+        returns ``count`` requests of the kind ``name``.
+        """
+        return getattr(self, 'build_{}'.format(name))(count)
+
+    def build_login(self, count):
+        requests = []
+        for _ in range(count):
+            user = self.random.choice(self.users)
+            password = 'wrong' if self.random.random() < self.login_failure_rate else self.password
+            requests.append(self.factory.post('/api/login/', {
+                'identifier': self.random.choice((user.username, user.email, user.phone)),
+                'password': password}, format='json'))
+        return requests
+
+    def build_refresh(self, count):
+        from rest_framework_simplejwt.tokens import RefreshToken
+
+        # a token per request, refresh tokens may be rotated and blacklisted once used
+        return [self.factory.post('/api/token/refresh/', {
+            'refresh': str(RefreshToken.for_user(self.random.choice(self.users)))}, format='json')
+            for _ in range(count)]
+
+    def build_register(self, count):
+        requests = []
+        for i in range(self.created, self.created + count):
+            requests.append(self.factory.post('/api/register/', {
+                'username': 'load.{}'.format(i), 'email': 'load.{}@mail.com'.format(i),
+                'phone': '+2010{:08d}'.format(i), 'first_name': 'Load', 'last_name': 'Test',
+                'password1': 'newTESTPasswordD', 'password2': 'newTESTPasswordD', 'toc': True}, format='json'))
+        self.created += count
+        return requests
+
+    def build_verify_phone(self, count):
+        # a user verifies the phone once, every request needs an unverified one
+        return [self.factory.post('/api/verify/phone/', {'code': '777777'}, **self.authorization(user))
+                for user in self.create_users(count)]
+
+    def build_update_profile(self, count):
+        requests = []
+        for i in range(count):
+            user = self.random.choice(self.users)
+            requests.append(self.factory.put('/api/profile/', {
+                'first_name': 'Load {}'.format(i), 'last_name': 'Test'}, format='json', **self.authorization(user)))
+        return requests
+
+    def plan(self, mix, count):
+        """
+        draws ``count`` request kinds from the mix and builds them, returns (name, request) pairs.
+        """
+        names = self.random.choices(list(mix), weights=list(mix.values()), k=count)
+        requests = {name: iter(self.build(name, total)) for name, total in Counter(names).items()}
+        return [(name, next(requests[name])) for name in names]
+
+
+def run(views, plan, concurrency):
+    """
+    sends the planned requests from ``concurrency`` threads, every thread with its own database connection,
+    returns a (name, status, seconds, cpu seconds, queries) sample per request and the wall time.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    requests = iter(plan)
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    samples = []
+
+    def worker():
+        thread_samples = []
+        try:
+            connection.ensure_connection()
+            barrier.wait()
+            while True:
+                with lock:
+                    name, request = next(requests, (None, None))
+                if name is None:
+                    break
+                with CaptureQueriesContext(connection) as queries:
+                    started_cpu, started_at = time.thread_time(), time.perf_counter()
+                    try:
+                        response = views[name](request)
+                        if hasattr(response, 'render'):
+                            response.render()
+                        status = response.status_code
+                    except Exception as e:
+                        status = type(e).__name__
+                    elapsed, cpu = time.perf_counter() - started_at, time.thread_time() - started_cpu
+                thread_samples.append((name, status, elapsed, cpu, len(queries)))
+        finally:
+            connection.close()
+            with lock:
+                samples.extend(thread_samples)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started_at
+
+
+def summarize_samples(samples, wall_time):
+    summary = summarize([elapsed for _, _, elapsed, _, _ in samples])
+    summary.update({
+        "throughput_rps": len(samples) / wall_time,
+        "cpu_ms_per_request": sum(cpu for _, _, _, cpu, _ in samples) / len(samples) * 1000,
+        "queries_per_request": sum(queries for _, _, _, _, queries in samples) / len(samples),
+        "status_codes": dict(sorted(Counter(str(status) for _, status, _, _, _ in samples).items())),
+    })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help="requests measured (default: 500)")
+    parser.add_argument('--warmup', type=int, default=50, help="requests sent before measuring (default: 50)")
+    parser.add_argument('--concurrency', type=int, default=1, help="threads sending requests (default: 1)")
+    parser.add_argument('--mix', type=parse_mix, default='default',
+                        help="preset ({}) or request=weight pairs (default: default)".format(', '.join(MIXES)))
+    parser.add_argument('--users', type=int, default=100, help="existing users logging in (default: 100)")
+    parser.add_argument('--login-failure-rate', type=float, default=0.1,
+                        help="share of logins with a wrong password (default: 0.1)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true')
+    parser.add_argument('--output', default=None, help="file the json results are written to")
+    options = parser.parse_args()
+
+    from django.conf import settings
+    is_sqlite = settings.DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3'
+    teardown = setup_django(os.path.join(tempfile.mkdtemp(), 'load_test.sqlite3') if is_sqlite else None)
+    try:
+        import django
+        from django.db import connection
+
+        load_test = LoadTest(options.users, options.login_failure_rate, options.seed)
+        warmup = load_test.plan(options.mix, options.warmup)
+        plan = load_test.plan(options.mix, options.requests)
+        # the connection of the main thread is not used by the workers, it would hold sqlite's lock
+        connection.close()
+        if warmup:
+            run(load_test.views, warmup, 1)
+        samples, wall_time = run(load_test.views, plan, options.concurrency)
+
+        results = {
+            "meta": {
+                "database": connection.vendor,
+                "django": django.get_version(),
+                "concurrency": options.concurrency,
+                "requests": options.requests,
+                "mix": options.mix,
+                "seed": options.seed,
+                "wall_time_s": wall_time,
+            },
+            "total": summarize_samples(samples, wall_time),
+        }
+        for name in options.mix:
+            named = [sample for sample in samples if sample[0] == name]
+            if named:
+                results[name] = summarize_samples(named, wall_time)
+
+        report(results, options.json)
+        if options.output:
+            with open(options.output, 'w') as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
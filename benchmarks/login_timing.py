@@ -0,0 +1,54 @@
+"""
+measures MultipleAuthenticationBackend.authenticate latency for an existing user with the right
+password, an existing user with a wrong password and an unknown identifier.
+
+with the dummy hash path the three distributions should sit on top of each other.
+
+    python benchmarks/login_timing.py --iterations 200 [--json]
+"""
+import argparse
+import time
+
+from _common import setup_django, summarize, report
+
+
+def measure(authenticate, scenarios, iterations):
+    # scenarios are interleaved so cpu frequency drift affects all of them alike
+    samples = {name: [] for name in scenarios}
+    for _ in range(iterations):
+        for name, (identifier, password) in scenarios.items():
+            start = time.perf_counter()
+            authenticate(None, identifier=identifier, password=password)
+            samples[name].append(time.perf_counter() - start)
+    return {name: summarize(durations) for name, durations in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--json', action='store_true')
+    options = parser.parse_args()
+
+    teardown = setup_django()
+    try:
+        from dj_accounts.authentication.backends import MultipleAuthenticationBackend
+        from dj_accounts.authentication.hashers import warm_password_hasher
+        from dj_accounts.authentication.tests.factories import UserFactory
+
+        user = UserFactory(username="benchmark", email="benchmark@mail.com")
+        authenticate = MultipleAuthenticationBackend().authenticate
+        warm_password_hasher()
+
+        results = measure(authenticate, {
+            "hit": (user.email, "secret"),
+            "hit_wrong_password": (user.email, "wrong"),
+            "miss": ("nobody@mail.com", "secret"),
+        }, options.iterations)
+        results["miss_to_hit_p50_ratio"] = round(results["miss"]["p50_ms"] / results["hit"]["p50_ms"], 3)
+        report(results, options.json)
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+"""
+the project settings on a local postgres, configured by the libpq environment variables:
+
+    PGUSER=postgres PGPASSWORD=secret DJANGO_SETTINGS_MODULE=settings_postgres python benchmarks/load_test.py
+
+the benchmarks create and destroy their own test database, ``test_<PGDATABASE>``.
+"""
+import os
+
+from accounts_pkg.settings import *  # noqa
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('PGDATABASE', 'dj_accounts'),
+        'USER': os.environ.get('PGUSER', 'postgres'),
+        'PASSWORD': os.environ.get('PGPASSWORD', ''),
+        'HOST': os.environ.get('PGHOST', 'localhost'),
+        'PORT': os.environ.get('PGPORT', '5432'),
+    }
+}
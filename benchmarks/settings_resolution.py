@@ -0,0 +1,55 @@
+"""
+measures the per request cost of resolving the classes views read from settings,
+before (import on every call) and after (resolved once and cached).
+
+    python benchmarks/settings_resolution.py [--number 100000] [--json]
+"""
+import argparse
+import importlib
+import timeit
+
+from _common import report
+
+# (settings key, default) pairs resolved by the login, register and profile views on every request
+LOOKUPS = (
+    ('LOGIN_FORM', 'django.contrib.auth.forms.AuthenticationForm'),
+    ('REGISTER_FORM', 'dj_accounts.authentication.forms.UserCreationForm'),
+    ('REGISTER_CALLBACK', None),
+    ('PROFILE_SERIALIZER', 'dj_accounts.authentication.serializers.UpdateUserDataSerializer'),
+)
+
+
+def uncached_get_class_from_settings(settings_key, default_class=None):
+    from django.conf import settings
+
+    class_name = getattr(settings, settings_key, None) or default_class
+    if type(class_name) is not str:
+        return class_name
+    name_split = class_name.split('.')
+    return getattr(importlib.import_module('.'.join(name_split[:-1])), name_split[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--number', type=int, default=100000)
+    parser.add_argument('--json', action='store_true')
+    options = parser.parse_args()
+
+    import django
+    django.setup()
+    from dj_accounts.utils import get_class_from_settings
+
+    def resolve_all(resolve):
+        return lambda: [resolve(key, default) for key, default in LOOKUPS]
+
+    results = {}
+    for name, resolve in (("uncached", uncached_get_class_from_settings), ("cached", get_class_from_settings)):
+        resolve_all(resolve)()
+        seconds = min(timeit.repeat(resolve_all(resolve), number=options.number, repeat=3))
+        results[name] = {"us_per_request": seconds / options.number * 1e6}
+    results["speedup"] = round(results["uncached"]["us_per_request"] / results["cached"]["us_per_request"], 1)
+    report(results, options.json)
+
+
+if __name__ == '__main__':
+    main()
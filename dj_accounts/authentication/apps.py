@@ -9,3 +9,11 @@ class DjAccountsAuthenticationConfig(AppConfig):
     def ready(self):
         from .signals import create_site_profile_for_initial_sites
         post_migrate.connect(create_site_profile_for_initial_sites, sender=self)
+
+        # connects the receivers that invalidate the cached users and unlock the accounts
+        from . import authentication, lockout  # noqa
+
+        from ..utils import get_settings_value
+        if get_settings_value('AUTHENTICATION_WARM_PASSWORD_HASHER', False):
+            from .hashers import warm_password_hasher
+            warm_password_hasher()
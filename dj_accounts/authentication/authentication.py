@@ -0,0 +1,307 @@
+import hashlib
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import TokenVersion
+from ..utils import get_settings_value
+
+UserModel = get_user_model()
+
+
+def get_user_cache():
+    return caches[get_settings_value('JWT_USER_SNAPSHOT_CACHE', 'default')]
+
+
+def get_user_snapshot_keys(user_id):
+    key = 'dj_accounts:user:{}'.format(user_id)
+    return key, '{}:version'.format(key)
+
+
+def get_user_snapshot_fields():
+    """
+    the fields kept in the snapshot, every concrete field but the password by default,
+    the others are loaded from the database the first time they are accessed.
+    """
+    fields = get_settings_value('JWT_USER_SNAPSHOT_FIELDS', None)
+    # in the order of the model fields, as Model.from_db expects them
+    return [
+        field.attname for field in UserModel._meta.concrete_fields
+        if field.primary_key or (field.name != 'password' if fields is None else field.attname in fields)
+    ]
+
+
+def get_user_version(user_id):
+    """
+    returns the version stamp of the user, starting a new one if the cache has none.
+    """
+    cache = get_user_cache()
+    snapshot_key, version_key = get_user_snapshot_keys(user_id)
+    cache.add(version_key, time.time_ns(), None)
+    return cache.get(version_key)
+
+
+def invalidate_user_snapshot(user_id):
+    """
+    bumps the version stamp of the user, so the cached snapshots of every process stop matching it.
+    """
+    cache = get_user_cache()
+    snapshot_key, version_key = get_user_snapshot_keys(user_id)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        # a fresh stamp, older snapshots can not match it
+        cache.set(version_key, time.time_ns(), None)
+
+
+def invalidate_cached_user(user):
+    invalidate_user_snapshot(getattr(user, api_settings.USER_ID_FIELD))
+
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+def get_token_version_cache_key(user_id):
+    return 'dj_accounts:token_version:{}'.format(user_id)
+
+
+def get_token_version(user_id):
+    """
+    returns the current token version of the user, tokens with an older version are revoked.
+    """
+    cache = get_user_cache()
+    key = get_token_version_cache_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = TokenVersion.objects.filter(**{'user__{}'.format(api_settings.USER_ID_FIELD): user_id}).values_list(
+            'version', flat=True).first() or 0
+        # add, not set, so a version bumped meanwhile is not overwritten by the one read here
+        cache.add(key, version, get_settings_value('JWT_TOKEN_VERSION_CACHE_TTL', 3600))
+    return version
+
+
+def revoke_user_tokens(user):
+    """
+    revokes every token issued to the user so far, by bumping its token version.
+    """
+    with transaction.atomic():
+        if not TokenVersion.objects.filter(user_id=user.pk).update(version=F('version') + 1):
+            try:
+                with transaction.atomic():
+                    TokenVersion.objects.create(user_id=user.pk, version=1)
+            except IntegrityError:
+                TokenVersion.objects.filter(user_id=user.pk).update(version=F('version') + 1)
+        version = TokenVersion.objects.get(user_id=user.pk).version
+
+    # dropped right away so this transaction reads the new version,
+    # and set once committed over the old one other requests may have cached meanwhile
+    cache = get_user_cache()
+    key = get_token_version_cache_key(getattr(user, api_settings.USER_ID_FIELD))
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.set(key, version, get_settings_value('JWT_TOKEN_VERSION_CACHE_TTL', 3600)))
+
+
+def is_token_revoked(payload):
+    if not get_settings_value('JWT_TOKEN_VERSION_ACTIVE', False) or api_settings.USER_ID_CLAIM not in payload:
+        return False
+    return payload.get(TOKEN_VERSION_CLAIM, 0) < get_token_version(payload[api_settings.USER_ID_CLAIM])
+
+
+class TokenVersionAuthenticationMixin:
+    """
+    rejects the tokens revoked by revoke_user_tokens when JWT_TOKEN_VERSION_ACTIVE is set.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_("Token is revoked"))
+        return validated_token
+
+
+class TokenVersionJWTAuthentication(TokenVersionAuthenticationMixin, JWTAuthentication):
+    pass
+
+
+class CachedJWTAuthentication(TokenVersionAuthenticationMixin, JWTAuthentication):
+    """
+    jwt authentication that keeps a snapshot of the user in the cache, so authenticated requests
+    do not query the users table.
+
+    a snapshot is only used while it carries the current version stamp of the user,
+    which is bumped when the user is saved, deleted or logs out.
+    queryset ``update()`` calls bypass the signals, call ``invalidate_user_snapshot`` after them.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache = get_user_cache()
+        snapshot_key, version_key = get_user_snapshot_keys(user_id)
+        cached = cache.get_many([snapshot_key, version_key])
+        snapshot, version = cached.get(snapshot_key), cached.get(version_key)
+
+        if snapshot is not None and version is not None and snapshot['version'] == version:
+            user = self.get_user_from_snapshot(snapshot)
+        else:
+            # the stamp is read before the user, a change saved in between bumps it
+            # and leaves the snapshot stored below outdated from the start
+            version = get_user_version(user_id)
+            user = super().get_user(validated_token)
+            cache.set(snapshot_key, self.make_snapshot(user, version),
+                      get_settings_value('JWT_USER_SNAPSHOT_TTL', 300))
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    @staticmethod
+    def make_snapshot(user, version):
+        fields = get_user_snapshot_fields()
+        return {
+            'version': version,
+            'fields': fields,
+            'values': [getattr(user, field) for field in fields],
+        }
+
+    @staticmethod
+    def get_user_from_snapshot(snapshot):
+        return UserModel.from_db(DEFAULT_DB_ALIAS, snapshot['fields'], snapshot['values'])
+
+
+USER_CLAIMS_KEY = 'user'
+
+
+def claim_email_verified(user):
+    return getattr(user, 'email_verified_at', None) is not None
+
+
+def claim_phone_verified(user):
+    return getattr(user, 'phone_verified_at', None) is not None
+
+
+def claim_permissions_hash(user):
+    permissions = sorted(user.get_all_permissions())
+    value = '{}:{}'.format(user.is_superuser, ','.join(permissions))
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+# claims computed from the user, any other name in JWT_USER_CLAIMS is a field of the user model
+USER_CLAIMS = {
+    'email_verified': claim_email_verified,
+    'phone_verified': claim_phone_verified,
+    'permissions_hash': claim_permissions_hash,
+}
+
+
+def get_user_claims(user):
+    """
+    returns the JWT_USER_CLAIMS of the user, to embed in its tokens.
+    """
+    claims = {}
+    for name in get_settings_value('JWT_USER_CLAIMS', None) or []:
+        if name in USER_CLAIMS:
+            claims[name] = USER_CLAIMS[name](user)
+            continue
+        field = UserModel._meta.get_field(name)
+        value = field.to_python(field.value_from_object(user))
+        claims[name] = value if value is None or isinstance(value, (bool, int, float, str)) \
+            else DjangoJSONEncoder().default(value)
+    return claims
+
+
+class ClaimsJWTAuthentication(TokenVersionAuthenticationMixin, JWTAuthentication):
+    """
+    jwt authentication that builds the user from the claims get_user_tokens embeds in the token
+    when JWT_USER_CLAIMS is set, without querying the users table.
+
+    the user is a model instance with only the claimed fields loaded, the row is loaded the first time
+    another field is accessed. the computed claims are kept in ``user.token_claims``.
+    the claims may be stale, so saving the user reloads the claimed fields it did not change from the row
+    instead of writing the claimed values back.
+    tokens without claims, or when USER_ID_FIELD is not the primary key, fall back to the database.
+    """
+
+    def get_user(self, validated_token):
+        claims = validated_token.get(USER_CLAIMS_KEY)
+        pk = UserModel._meta.pk
+        if claims is None or api_settings.USER_ID_FIELD not in ('pk', pk.name, pk.attname):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = self.get_user_from_claims(user_id, claims)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
+
+    @staticmethod
+    def get_user_from_claims(user_id, claims):
+        pk = UserModel._meta.pk
+        values = {pk.attname: pk.to_python(user_id)}
+        for name, value in claims.items():
+            if name in USER_CLAIMS:
+                continue
+            field = UserModel._meta.get_field(name)
+            values[field.attname] = None if value is None else field.to_python(value)
+
+        # in the order of the model fields, as Model.from_db expects them
+        fields = [field.attname for field in UserModel._meta.concrete_fields if field.attname in values]
+        user = UserModel.from_db(DEFAULT_DB_ALIAS, fields, [values[field] for field in fields])
+        user.token_claims = claims
+        user._claimed_values = {field: values[field] for field in fields if field != pk.attname}
+        return user
+
+
+@receiver(pre_save, sender=UserModel)
+def reload_claimed_fields(sender, instance, **kwargs):
+    # the fields of a user built from token claims hold the values of when the token was issued
+    claimed_values = instance.__dict__.pop('_claimed_values', None)
+    if not claimed_values:
+        return
+    unchanged = [field for field, value in claimed_values.items() if getattr(instance, field) == value]
+    if not unchanged:
+        return
+    row = UserModel._base_manager.using(instance._state.db).filter(pk=instance.pk).values(*unchanged).first()
+    for field, value in (row or {}).items():
+        setattr(instance, field, value)
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def invalidate_saved_user_snapshot(sender, instance, **kwargs):
+    invalidate_cached_user(instance)
+
+
+@receiver(post_save, sender=UserModel)
+def revoke_tokens_on_password_change(sender, instance, created=False, **kwargs):
+    # set_password keeps the raw password in _password until the save is done,
+    # hash upgrades on login do not go through it
+    if not created and getattr(instance, '_password', None) is not None \
+            and get_settings_value('JWT_TOKEN_VERSION_ACTIVE', False):
+        revoke_user_tokens(instance)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user_snapshot(sender, user=None, **kwargs):
+    if user is not None and user.pk is not None:
+        invalidate_cached_user(user)
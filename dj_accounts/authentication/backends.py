@@ -1,10 +1,25 @@
-from django.contrib.auth import get_user_model
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model, _get_backends, _clean_credentials
 from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.signals import user_login_failed
+from django.core.exceptions import PermissionDenied
+
+from .hashers import run_dummy_password_hasher, check_user_password, run_in_password_hasher_executor, \
+    defer_password_hash_write
+from .lockout import AccountLocked, get_account_lockout, is_account_lockout_active
+from .resolvers import IdentifierResolver
+from ..utils import get_settings_value
 
 UserModel = get_user_model()
 
 
 class MultipleAuthenticationBackend(ModelBackend):
+    def get_identifier_resolver(self):
+        return IdentifierResolver(UserModel)
+
     def authenticate(self, request, *args, **kwargs):
         identifier = kwargs.pop('identifier', None)
         password = kwargs.pop('password', None)
@@ -12,22 +27,94 @@ class MultipleAuthenticationBackend(ModelBackend):
         if not password or not identifier:
             return
 
-        query = UserModel.objects.none()
-        try:
-            for field in UserModel.AUTHENTICATION_FIELDS:
-                query = query | UserModel.objects.filter(**{field: identifier})
-        except Exception as e:
-            pass
-        finally:
-            if not query.exists():
-                return
-
-        try:
-            user = query.first()
-        except UserModel.DoesNotExist:
+        user = self.get_identifier_resolver().resolve(identifier)
+        if user is None:
             # Run the default password hasher once to reduce the timing
             # difference between an existing and a nonexistent user (#20760).
-            UserModel().set_password(password)
+            run_dummy_password_hasher(password)
+            return
+
+        # checked before the password, a locked account costs no hashing
+        lockout = get_account_lockout() if is_account_lockout_active() else None
+        if lockout is not None and lockout.get_remaining(user):
+            raise AccountLocked()
+
+        is_correct = check_user_password(user, password)
+        if lockout is not None and is_correct:
+            lockout.clear_failures(user)
+        elif lockout is not None:
+            lockout.add_failure(user)
+
+        if is_correct and self.user_can_authenticate(user):
+            return user
+
+    async def aauthenticate(self, request, *args, **kwargs):
+        """
+        like authenticate, but the password hashing runs in the password hasher pool
+        and the queries in the thread django runs sync code in.
+        """
+        identifier = kwargs.pop('identifier', None)
+        password = kwargs.pop('password', None)
+
+        if not password or not identifier:
+            return
+
+        user = await sync_to_async(self.get_identifier_resolver().resolve)(identifier)
+        if user is None:
+            await run_in_password_hasher_executor(run_dummy_password_hasher, password)
+            return
+
+        lockout = get_account_lockout() if is_account_lockout_active() else None
+        if lockout is not None and await sync_to_async(lockout.get_remaining)(user):
+            raise AccountLocked()
+
+        must_update = []
+        is_correct = await run_in_password_hasher_executor(check_password, password, user.password,
+                                                           must_update.append)
+        if lockout is not None:
+            await sync_to_async(lockout.clear_failures if is_correct else lockout.add_failure)(user)
+        if is_correct and must_update:
+            encoded = await run_in_password_hasher_executor(make_password, password)
+            await sync_to_async(self.save_password_hash)(user, encoded)
+
+        if is_correct and self.user_can_authenticate(user):
+            return user
+
+    @staticmethod
+    def save_password_hash(user, encoded):
+        if get_settings_value('PASSWORD_HASH_UPGRADE_ACTIVE', False):
+            defer_password_hash_write(user, encoded)
         else:
-            if user.check_password(password) and self.user_can_authenticate(user):
-                return user
+            user.password = encoded
+            user.save(update_fields=['password'])
+
+
+async def aauthenticate(request=None, **credentials):
+    """
+    async version of django.contrib.auth.authenticate, awaits the backends aauthenticate
+    when they have one and runs their authenticate in a thread otherwise.
+    """
+    for backend, backend_path in _get_backends(return_tuples=True):
+        backend_signature = inspect.signature(backend.authenticate)
+        try:
+            backend_signature.bind(request, **credentials)
+        except TypeError:
+            # This backend doesn't accept these credentials as arguments. Try the next one.
+            continue
+        try:
+            if hasattr(backend, 'aauthenticate'):
+                user = await backend.aauthenticate(request, **credentials)
+            else:
+                user = await sync_to_async(backend.authenticate)(request, **credentials)
+        except PermissionDenied:
+            # This backend says to stop in our tracks - this user should not be allowed in at all.
+            break
+        if user is None:
+            continue
+        # Annotate the user object with the path of the backend.
+        user.backend = backend_path
+        return user
+
+    # The credentials supplied are invalid to all backends, fire signal
+    await sync_to_async(user_login_failed.send)(
+        sender=__name__, credentials=_clean_credentials(credentials), request=request)
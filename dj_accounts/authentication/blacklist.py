@@ -0,0 +1,105 @@
+import functools
+import math
+import threading
+import time
+
+from django.core.cache import caches
+from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .authentication import is_token_revoked
+from ..utils import get_settings_value
+
+
+class TokenBlacklist:
+    """
+    answers whether a token is blacklisted without querying the database.
+
+    the blacklisted jtis are kept in a process local dict, loaded from the database once
+    and synced with the rows added since every TOKEN_BLACKLIST_SYNC_INTERVAL seconds.
+    tokens blacklisted through this layer are also written to the cache until they expire,
+    so the other processes see them before their next sync.
+    """
+
+    def __init__(self):
+        self.jtis = {}  # jti -> expiration timestamp
+        self.last_id = None
+        self.synced_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[get_settings_value('TOKEN_BLACKLIST_CACHE', 'default')]
+
+    @staticmethod
+    def get_cache_key(jti):
+        return 'dj_accounts:blacklisted_token:{}'.format(jti)
+
+    def add(self, jti, exp):
+        self.jtis[jti] = exp
+        self.cache.set(self.get_cache_key(jti), exp, max(1, math.ceil(exp - time.time())))
+
+    def is_blacklisted(self, jti):
+        self.sync_if_stale()
+        if jti in self.jtis:
+            return True
+
+        exp = self.cache.get(self.get_cache_key(jti))
+        if exp is not None:
+            self.jtis[jti] = exp
+            return True
+        return False
+
+    def sync_if_stale(self):
+        interval = get_settings_value('TOKEN_BLACKLIST_SYNC_INTERVAL', 60)
+        if self.synced_at is not None and time.monotonic() - self.synced_at < interval:
+            return
+        with self.lock:
+            if self.synced_at is None or time.monotonic() - self.synced_at >= interval:
+                self.sync()
+
+    def sync(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=now())
+        if self.last_id is not None:
+            rows = rows.filter(id__gt=self.last_id)
+
+        jtis = {}
+        for pk, jti, expires_at in rows.order_by('id').values_list('id', 'token__jti', 'token__expires_at'):
+            jtis[jti] = expires_at.timestamp()
+            self.last_id = pk
+
+        current_time = time.time()
+        jtis.update((jti, exp) for jti, exp in self.jtis.items() if exp > current_time)
+        self.jtis = jtis
+        self.synced_at = time.monotonic()
+
+
+@functools.lru_cache()
+def get_token_blacklist():
+    return TokenBlacklist()
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    refresh token checked against the TokenBlacklist instead of the blacklist table,
+    and rejected once revoked by revoke_user_tokens.
+    """
+
+    def verify(self, *args, **kwargs):
+        super().verify(*args, **kwargs)
+        if is_token_revoked(self.payload):
+            raise TokenError(_("Token is revoked"))
+
+    def check_blacklist(self):
+        if get_token_blacklist().is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        get_token_blacklist().add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ..utils import get_settings_value
+
+UserModel = get_user_model()
+
+SOCIAL_ACCOUNTS_FIELD = 'social_accounts'
+
+DEFAULT_EXPORT_FIELDS = ('id', 'username', 'email', 'phone', 'first_name', 'last_name', 'email_verified_at',
+                         'phone_verified_at', 'date_joined', 'is_active')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def get_export_fields(names=None):
+    """
+    validates the exported fields, the USERS_EXPORT_FIELDS setting by default,
+    raises a ValueError for the unknown ones and the password.
+    """
+    if names is None:
+        names = get_settings_value('USERS_EXPORT_FIELDS', None) or [
+            name for name in DEFAULT_EXPORT_FIELDS if has_user_field(name)]
+
+    for name in names:
+        if name == SOCIAL_ACCOUNTS_FIELD:
+            if not apps.is_installed('dj_accounts.social'):
+                raise ValueError("{} requires dj_accounts.social".format(SOCIAL_ACCOUNTS_FIELD))
+        elif name == 'password' or not has_user_field(name):
+            raise ValueError("Unknown user field {}".format(name))
+    return list(names)
+
+
+def has_user_field(name):
+    try:
+        field = UserModel._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return field.concrete
+
+
+def iter_user_rows(fields, batch_size=1000, queryset=None):
+    """
+    yields a list of rows, as dicts, per batch of users, paginated on the primary key
+    with values_list so no user instance is made.
+    """
+    queryset = UserModel._default_manager.all() if queryset is None else queryset
+    queryset = queryset.order_by('pk')
+    columns = [field for field in fields if field != SOCIAL_ACCOUNTS_FIELD]
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        values = list(page.values_list('pk', *columns)[:batch_size])
+        if not values:
+            return
+
+        rows = [dict(zip(columns, row[1:])) for row in values]
+        if SOCIAL_ACCOUNTS_FIELD in fields:
+            accounts = get_social_accounts([row[0] for row in values])
+            for (pk, *_), row in zip(values, rows):
+                row[SOCIAL_ACCOUNTS_FIELD] = accounts.get(pk, [])
+        yield rows
+
+        if len(values) < batch_size:
+            return
+        last_pk = values[-1][0]
+
+
+def get_social_accounts(user_ids):
+    """
+    the social accounts of a batch of users in a single query, by user id.
+    """
+    from dj_accounts.social.models import SocialAccount
+
+    accounts = {}
+    for user_id, provider, provider_user_id in SocialAccount.objects.filter(user_id__in=user_ids).order_by(
+            'pk').values_list('user_id', 'provider__provider', 'provider_user_id'):
+        accounts.setdefault(user_id, []).append({'provider': provider, 'provider_user_id': provider_user_id})
+    return accounts
+
+
+def export_users(fields, format='csv', batch_size=1000, queryset=None):
+    """
+    yields the export of the users as text, one chunk per batch, csv with a header row or jsonl.
+    in csv the social accounts are joined as ``provider:provider_user_id`` separated by spaces.
+    """
+    if format not in EXPORT_FORMATS:
+        raise ValueError("Unknown export format {}".format(format))
+
+    if format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue()
+
+    for rows in iter_user_rows(fields, batch_size, queryset):
+        if format == 'jsonl':
+            yield ''.join(json.dumps({name: row[name] for name in fields}, cls=DjangoJSONEncoder) + '\n'
+                          for row in rows)
+            continue
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([format_csv_value(name, row[name]) for name in fields])
+        yield buffer.getvalue()
+
+
+def format_csv_value(name, value):
+    if name == SOCIAL_ACCOUNTS_FIELD:
+        return ' '.join('{provider}:{provider_user_id}'.format(**account) for account in value)
+    if value is None:
+        return ''
+    return value if isinstance(value, (bool, int, float, str)) else DjangoJSONEncoder().default(value)
@@ -1,14 +1,23 @@
 from django import forms
 from django.contrib.auth import get_user_model, authenticate, password_validation
-from django.contrib.auth.forms import UserCreationForm as BaseUserCreationForm
+from django.contrib.auth.forms import UserCreationForm as BaseUserCreationForm, \
+    PasswordResetForm as BasePasswordResetForm
 from django.contrib.sites.models import Site
 from django.core.exceptions import ValidationError
+from django.core.mail import EmailMultiAlternatives
+from django.db import IntegrityError, transaction
+from django.db.models import Q, ExpressionWrapper, BooleanField
+from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _
 from translation.forms import TranslatableModelForm
 
+from .backends import aauthenticate
+from .mail import get_email_delivery
 from .models import SiteProfile
 from .templatetags.auth import get_authentication_field_placeholder
+from .throttling import get_phone_verification_attempts, is_phone_verification_attempts_active
 from .verify_phone import VerifyPhone
+from ..utils import get_settings_value
 
 UserModel = get_user_model()
 
@@ -47,11 +56,28 @@ class MultipleLoginForm(forms.ModelForm):
     def __init__(self, request=None, *args, **kwargs):
         self.request = request
         self.user_cache = None
+        self.authenticated = False
         super(MultipleLoginForm, self).__init__(*args, **kwargs)
 
     def get_user(self):
         return self.user_cache
 
+    async def ais_valid(self):
+        """
+        is_valid for async views, the credentials are checked with aauthenticate
+        before the form is cleaned so the password hashing does not block the event loop.
+        """
+        try:
+            credentials = {name: self.fields[name].clean(
+                self.fields[name].widget.value_from_datadict(self.data, self.files, self.add_prefix(name)))
+                for name in ('identifier', 'password')}
+        except ValidationError:
+            return self.is_valid()
+
+        self.user_cache = await aauthenticate(request=self.request, **credentials)
+        self.authenticated = True
+        return self.is_valid()
+
     def clean(self):
         identifier = self.cleaned_data.get('identifier', None)
         password = self.cleaned_data.get('password', None)
@@ -66,7 +92,8 @@ class MultipleLoginForm(forms.ModelForm):
         else:
             credentials = {"password": password, 'identifier': identifier}
 
-            self.user_cache = authenticate(request=self.request, **credentials)
+            if not self.authenticated:
+                self.user_cache = authenticate(request=self.request, **credentials)
             if not self.user_cache:
                 raise ValidationError(self.error_messages['invalid_login'], code='invalid_login')
             if not remember_me and self.request:
@@ -171,25 +198,91 @@ class RegisterForm(UserCreationForm):
             "class": "form-control bg-transparent"
         }))
 
+    # checked together in a single query
+    unique_fields = ('username', 'email', 'phone')
+    unique_error_messages = {
+        'email': _("Email already exists"),
+        'phone': _("Phone already exists"),
+    }
+
     class Meta(UserCreationForm.Meta):
         fields = UserCreationForm.Meta.fields + ("username", "first_name", "last_name", 'email', 'phone',)
 
-    def clean_phone(self):
-        phone = self.cleaned_data['phone']
-        if UserModel.objects.filter(phone=phone).exists():
-            raise ValidationError("Phone already exists", code="unique")
-        return phone
+    def clean(self):
+        cleaned_data = super().clean()
+        if get_settings_value('REGISTER_UNIQUE_PRECHECK', True):
+            self.add_unique_errors()
+        return cleaned_data
+
+    def validate_unique(self):
+        # the unique fields are checked together by clean, or by the insert
+        exclude = set(self._get_validation_exclusions()) | set(self.get_unique_fields())
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as e:
+            self._update_errors(e)
+
+    def get_unique_fields(self):
+        return [field for field in self.unique_fields if field in self.fields]
+
+    def add_unique_errors(self):
+        """
+        checks every unique field in a single query, adds an error to the fields already taken
+        and returns their names.
+        """
+        values = {field: self.cleaned_data[field] for field in self.get_unique_fields()
+                  if self.cleaned_data.get(field) not in (None, '')}
+        if not values:
+            return []
+
+        query = Q()
+        for field, value in values.items():
+            query |= Q(**{field: value})
+        # compared in the database, so the collation decides what collides, as for the unique index
+        rows = UserModel._default_manager.filter(query).values_list(*[
+            ExpressionWrapper(Q(**{field: value}), output_field=BooleanField())
+            for field, value in values.items()
+        ])
+
+        taken = set()
+        for row in rows:
+            taken.update(field for field, collides in zip(values, row) if collides)
+        collisions = [field for field in values if field in taken]
+        for field in collisions:
+            if field in self.unique_error_messages:
+                self.add_error(field, ValidationError(self.unique_error_messages[field], code='unique'))
+            else:
+                self.add_error(field, self.instance.unique_error_message(UserModel, (field,)))
+        return collisions
 
-    def clean_email(self):
-        email = self.cleaned_data['email']
-        if UserModel.objects.filter(email=email).exists():
-            raise ValidationError("Email already exists", code="unique")
-        return email
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        if commit:
+            self.save_user(user)
+        return user
+
+    def save_user(self, user):
+        """
+        inserts the user, a unique constraint it hits is added to the form errors and raised
+        as a ValidationError, which is how collisions surface when REGISTER_UNIQUE_PRECHECK is off.
+        """
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            if not self.add_unique_errors():
+                raise
+            raise ValidationError(_("A user with these details already exists."), code='unique')
+
+        if hasattr(self, 'save_m2m'):
+            self.save_m2m()
 
 
 class VerifyPhoneForm(forms.Form):
     code = forms.CharField(max_length=6, min_length=6)
 
+    too_many_attempts_message = _("Too many invalid codes, please request a new one.")
+
     def __init__(self, *args, **kwargs):
         self.user = kwargs.pop('user', None)
         super(VerifyPhoneForm, self).__init__(*args, **kwargs)
@@ -198,13 +291,53 @@ class VerifyPhoneForm(forms.Form):
     def clean(self):
         code = self.cleaned_data.get('code')
 
-        success = VerifyPhone().check(self.user.phone, code)
+        # the attempt is taken before the provider is called, so a client out of attempts costs no provider call
+        attempts = get_phone_verification_attempts() if is_phone_verification_attempts_active() else None
+        attempt = attempts.take(self.user) if attempts is not None else None
+        if attempt is not None and attempt > attempts.max_attempts:
+            raise ValidationError(self.too_many_attempts_message, code='too_many_attempts')
+
+        success = VerifyPhone.shared().check(self.user.phone, code)
+        if success and attempts is not None:
+            attempts.reset(self.user)
+        elif not success and attempt is not None and attempt == attempts.max_attempts:
+            VerifyPhone.shared().invalidate(self.user.phone)
+            raise ValidationError(self.too_many_attempts_message, code='too_many_attempts')
         if not success:
             raise ValidationError(_("The Provided code is Properly invalid"), code='invalid_code')
 
         return self.cleaned_data
 
 
+class PasswordResetForm(BasePasswordResetForm):
+    def save(self, *args, **kwargs):
+        """
+        collects the reset emails of every matching user and hands them to the configured
+        EMAIL_DELIVERY at once, so they share a single connection.
+        """
+        self.email_messages = []
+        super().save(*args, **kwargs)
+        if self.email_messages:
+            get_email_delivery().send_messages(self.email_messages)
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email, html_email_template_name=None):
+        subject = render_to_string(subject_template_name, context)
+        # Email subject *must not* contain newlines
+        subject = ''.join(subject.splitlines())
+        body = render_to_string(email_template_name, context)
+
+        email_message = EmailMultiAlternatives(subject, body, from_email, [to_email])
+        if html_email_template_name is not None:
+            html_email = render_to_string(html_email_template_name, context)
+            email_message.attach_alternative(html_email, 'text/html')
+
+        if hasattr(self, 'email_messages'):
+            self.email_messages.append(email_message)
+        else:
+            get_email_delivery().send_messages([email_message])
+
+
 class SiteProfileForm(TranslatableModelForm):
     domain = forms.URLField(
         required=True,
@@ -0,0 +1,200 @@
+import asyncio
+import functools
+import itertools
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, make_password, PBKDF2PasswordHasher, \
+    PBKDF2SHA1PasswordHasher, Argon2PasswordHasher
+from django.core.signals import setting_changed
+from django.db import connections, transaction
+from django.dispatch import receiver
+from django.utils.crypto import get_random_string
+
+from .hashing_workers import setup_hashing_worker
+from ..utils import get_settings_value
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache()
+def get_dummy_password_hash():
+    """
+    a hash of a random password made with the first of PASSWORD_HASHERS, computed once per process.
+    """
+    return make_password(get_random_string(32))
+
+
+def run_dummy_password_hasher(password):
+    """
+    verifies the password against the dummy hash, so a login for an unknown identifier
+    costs the same as a login with a wrong password.
+    """
+    check_password(password, get_dummy_password_hash())
+
+
+def warm_password_hasher():
+    get_hasher()
+    get_dummy_password_hash()
+
+
+@receiver(setting_changed)
+def reset_dummy_password_hash(*, setting, **kwargs):
+    if setting in ('PASSWORD_HASHERS', 'PASSWORD_HASHER_TARGET_COST'):
+        get_dummy_password_hash.cache_clear()
+
+
+def calibrated_cost(default):
+    """
+    a hasher work factor read from the PASSWORD_HASHER_TARGET_COST setting, as measured by the
+    calibrate_password_hasher command, falling back to the django default.
+    """
+    return property(lambda self: int(get_settings_value('PASSWORD_HASHER_TARGET_COST', None) or default))
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = calibrated_cost(PBKDF2PasswordHasher.iterations)
+
+
+class CalibratedPBKDF2SHA1PasswordHasher(PBKDF2SHA1PasswordHasher):
+    iterations = calibrated_cost(PBKDF2SHA1PasswordHasher.iterations)
+
+
+class CalibratedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = calibrated_cost(Argon2PasswordHasher.time_cost)
+
+
+_password_upgrade_executor = None
+_password_upgrade_executor_lock = threading.Lock()
+
+
+def get_password_upgrade_executor():
+    global _password_upgrade_executor
+    with _password_upgrade_executor_lock:
+        if _password_upgrade_executor is None:
+            _password_upgrade_executor = ThreadPoolExecutor(
+                max_workers=get_settings_value('PASSWORD_HASH_UPGRADE_WORKERS', 1),
+                thread_name_prefix='dj_accounts_password_upgrade')
+        return _password_upgrade_executor
+
+
+def write_password_hash(user, old_hash, new_hash):
+    """
+    stores the upgraded hash, unless the password was changed in the meantime, and gives it to the
+    in memory user once the row is updated.
+    """
+    try:
+        if type(user)._default_manager.filter(pk=user.pk, password=old_hash).update(password=new_hash):
+            if user.password == old_hash:
+                user.password = new_hash
+    except Exception:
+        logger.exception("Could not upgrade the password hash of user %s", user.pk)
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connections.close_all()
+
+
+def schedule_password_hash_upgrade(user, password):
+    """
+    rehashes the password with the preferred hasher and cost and defers the UPDATE, by default to a
+    background thread once the current transaction commits.
+    """
+    defer_password_hash_write(user, make_password(password))
+
+
+def defer_password_hash_write(user, encoded):
+    """
+    the in memory user keeps its hash until the row is updated, so its session auth hash always
+    matches the stored one.
+    """
+    upgrade = functools.partial(write_password_hash, user, user.password, encoded)
+
+    if get_settings_value('PASSWORD_HASH_UPGRADE_ASYNC', True):
+        transaction.on_commit(lambda: get_password_upgrade_executor().submit(upgrade))
+    else:
+        transaction.on_commit(upgrade)
+
+
+def check_user_password(user, password):
+    """
+    checks the password, when PASSWORD_HASH_UPGRADE_ACTIVE is set outdated hashes are upgraded
+    without blocking on the UPDATE, else it behaves like ``user.check_password``.
+    """
+    if not get_settings_value('PASSWORD_HASH_UPGRADE_ACTIVE', False):
+        return user.check_password(password)
+    return check_password(password, user.password,
+                          lambda raw_password: schedule_password_hash_upgrade(user, raw_password))
+
+
+_password_hasher_executor = None
+_password_hasher_executor_lock = threading.Lock()
+
+
+def get_password_hasher_executor():
+    """
+    the bounded pool async views hash passwords in, sized by the PASSWORD_HASHER_WORKERS setting.
+    """
+    global _password_hasher_executor
+    with _password_hasher_executor_lock:
+        if _password_hasher_executor is None:
+            _password_hasher_executor = ThreadPoolExecutor(
+                max_workers=get_settings_value('PASSWORD_HASHER_WORKERS', None) or os.cpu_count() or 1,
+                thread_name_prefix='dj_accounts_password_hasher')
+        return _password_hasher_executor
+
+
+@receiver(setting_changed)
+def reset_password_hasher_executor(*, setting, **kwargs):
+    global _password_hasher_executor
+    if setting == 'PASSWORD_HASHER_WORKERS':
+        with _password_hasher_executor_lock:
+            if _password_hasher_executor is not None:
+                _password_hasher_executor.shutdown(wait=False)
+            _password_hasher_executor = None
+
+
+def _run_and_close_connections(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        connections.close_all()
+
+
+async def run_in_password_hasher_executor(func, *args, **kwargs):
+    """
+    runs a password hashing call in the hasher pool, so it does not block the event loop
+    nor the thread django runs sync code in.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        get_password_hasher_executor(), functools.partial(_run_and_close_connections, func, *args, **kwargs))
+
+
+# the settings the hashers are made from, handed to the hashing workers
+HASHER_SETTINGS = ('PASSWORD_HASHERS', 'PASSWORD_HASHER_TARGET_COST')
+
+
+def get_password_hashing_pool(workers=None, mp_context=None):
+    """
+    a process pool to hash many passwords at once on every core, for imports.
+    the workers set django up with the hasher settings of this process, so they hash with the same
+    PASSWORD_HASHERS whether they are forked or spawned, like on macOS and windows.
+    """
+    hasher_settings = {name: getattr(settings, name) for name in HASHER_SETTINGS if hasattr(settings, name)}
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=setup_hashing_worker,
+                               initargs=(hasher_settings,))
+
+
+def make_passwords(passwords, pool=None, chunksize=1):
+    """
+    hashes the passwords with the preferred hasher, in the process pool when one is given,
+    ``chunksize`` passwords per task, and returns the hashes in the order of the passwords.
+    """
+    # resolved here, so a worker with other settings fails instead of using another hasher
+    algorithm = get_hasher().algorithm
+    if pool is None:
+        return [make_password(password, hasher=algorithm) for password in passwords]
+    return list(pool.map(make_password, passwords, itertools.repeat(None), itertools.repeat(algorithm),
+                         chunksize=chunksize))
@@ -0,0 +1,13 @@
+"""
+the initializer of the password hashing workers, in a module of its own: a spawned worker imports it to
+unpickle the initializer before django is set up, so it must not import the models.
+"""
+import django
+from django.conf import settings
+
+
+def setup_hashing_worker(hasher_settings):
+    django.setup()
+    # a spawned worker loads DJANGO_SETTINGS_MODULE, without the settings overridden in the parent
+    for name, value in hasher_settings.items():
+        setattr(settings, name, value)
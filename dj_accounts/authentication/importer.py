@@ -0,0 +1,253 @@
+import csv
+import json
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Q
+
+from .forms import RegisterForm
+from .hashers import get_password_hashing_pool, make_passwords
+from ..utils import get_class_from_settings
+
+UserModel = get_user_model()
+
+
+class ImportUserForm(RegisterForm):
+    """
+    RegisterForm without the passwords and the terms, the importer hashes the passwords
+    and checks the unique fields of a whole chunk at once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in ('password1', 'password2', 'toc'):
+            self.fields.pop(name, None)
+
+    def clean(self):
+        # skips the per row unique query of RegisterForm
+        return super(RegisterForm, self).clean()
+
+
+def read_users_file(path, format=None):
+    """
+    yields the line number and the row of every user of a csv or jsonl file.
+    """
+    format = format or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, newline='', encoding='utf-8') as file:
+        if format == 'csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+            return
+
+        for line, content in enumerate(file, start=1):
+            if not content.strip():
+                continue
+            try:
+                row = json.loads(content)
+            except ValueError as e:
+                row = {'__error__': str(e)}
+            if not isinstance(row, dict):
+                row = {'__error__': "Expected an object, got {}".format(type(row).__name__)}
+            yield line, row
+
+
+class UserImporter:
+    """
+    imports users in chunks: every row is validated with the RegisterForm rules, the unique fields
+    of a chunk are checked in a single query, then the passwords are hashed and the users are
+    inserted with bulk_create.
+
+    a row may have a plain ``password`` or a ``password_hash`` made by one of the PASSWORD_HASHERS,
+    users without either get an unusable password. with more than one worker the plain passwords
+    are hashed in a process pool.
+    """
+    form_class = ImportUserForm
+
+    def __init__(self, chunk_size=1000, validate_passwords=False, extra_fields=(), site=None, reject_file=None,
+                 workers=1):
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.validate_passwords = validate_passwords
+        self.extra_fields = [UserModel._meta.get_field(name) for name in extra_fields]
+        self.site = site
+        self.reject_file = reject_file
+        self.callback = get_class_from_settings('IMPORT_USERS_CALLBACK')
+        self.unique_fields = self.form_class.unique_fields
+        # values taken by the previous chunks of this import
+        self.seen = {field: set() for field in self.unique_fields}
+        self.imported = 0
+        self.rejected = 0
+        self.rejects = []
+
+    def run(self, rows):
+        started_at = time.monotonic()
+        # started once, the workers are reused by every chunk
+        self.pool = get_password_hashing_pool(self.workers) if self.workers != 1 else None
+        try:
+            chunk = []
+            for line, row in rows:
+                chunk.append((line, row))
+                if len(chunk) >= self.chunk_size:
+                    self.import_chunk(chunk)
+                    chunk = []
+            if chunk:
+                self.import_chunk(chunk)
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+        return self.imported, self.rejected, time.monotonic() - started_at
+
+    def import_chunk(self, chunk):
+        pending = []
+        for line, row in chunk:
+            user, password, errors = self.validate_row(row)
+            if errors:
+                self.reject(line, row, errors)
+            else:
+                pending.append((line, row, user, password))
+
+        pending = self.check_unique(pending)
+        self.set_passwords(pending)
+        self.insert(pending)
+        self.write_rejects()
+
+    def validate_row(self, row):
+        """
+        returns the user of the row, its plain password and the errors of the row.
+        """
+        if '__error__' in row:
+            return None, None, {'__all__': [row['__error__']]}
+
+        form = self.form_class(data=row)
+        if not form.is_valid():
+            return None, None, {field: [str(error) for error in errors] for field, errors in form.errors.items()}
+        user = form.instance
+
+        errors = {}
+        for field in self.extra_fields:
+            if row.get(field.name) in (None, ''):
+                continue
+            try:
+                setattr(user, field.attname, field.clean(row[field.name], user))
+            except ValidationError as e:
+                errors[field.name] = e.messages
+
+        password = row.get('password') or None
+        password_hash = row.get('password_hash') or None
+        if password_hash:
+            try:
+                identify_hasher(password_hash)
+            except ValueError:
+                errors['password_hash'] = ["Unknown password hash format."]
+            user.password = password_hash
+        elif password and self.validate_passwords:
+            try:
+                validate_password(password, user)
+            except ValidationError as e:
+                errors['password'] = e.messages
+        elif not password:
+            user.set_unusable_password()
+
+        return user, None if password_hash else password, errors
+
+    def check_unique(self, pending):
+        """
+        rejects the users whose unique fields are taken, by the database or by an earlier row,
+        with a single query for the whole chunk.
+        """
+        values = {field: {getattr(user, field) for line, row, user, password in pending} for field in self.unique_fields}
+        query = Q()
+        for field, field_values in values.items():
+            query |= Q(**{'{}__in'.format(field): field_values})
+
+        taken = {field: set(self.seen[field]) for field in self.unique_fields}
+        if pending:
+            for row in UserModel._default_manager.filter(query).values_list(*self.unique_fields):
+                for field, value in zip(self.unique_fields, row):
+                    taken[field].add(value)
+
+        accepted = []
+        for line, row, user, password in pending:
+            errors = {field: self.get_unique_error_messages(user, field)
+                      for field in self.unique_fields if getattr(user, field) in taken[field]}
+            if errors:
+                self.reject(line, row, errors)
+                continue
+            for field in self.unique_fields:
+                taken[field].add(getattr(user, field))
+                self.seen[field].add(getattr(user, field))
+            accepted.append((line, row, user, password))
+        return accepted
+
+    def get_unique_error_messages(self, user, field):
+        if field in self.form_class.unique_error_messages:
+            return [str(self.form_class.unique_error_messages[field])]
+        return user.unique_error_message(UserModel, (field,)).messages
+
+    def set_passwords(self, pending):
+        pending = [(user, password) for line, row, user, password in pending if password]
+        # a few tasks per worker, so the slower ones do not hold the others back
+        hashes = make_passwords([password for user, password in pending], self.pool,
+                                max(1, len(pending) // (self.workers * 4)))
+        for (user, password), encoded in zip(pending, hashes):
+            user.password = encoded
+
+    def insert(self, pending):
+        users = [user for line, row, user, password in pending]
+        if not users:
+            return
+
+        try:
+            with transaction.atomic():
+                UserModel._default_manager.bulk_create(users, batch_size=self.chunk_size)
+            self.set_primary_keys(users)
+        except IntegrityError:
+            # a row collided with a user created meanwhile, insert them one by one to find it
+            users = []
+            for line, row, user, password in pending:
+                try:
+                    with transaction.atomic():
+                        user.save(force_insert=True)
+                except IntegrityError as e:
+                    self.reject(line, row, {'__all__': [str(e)]})
+                else:
+                    users.append(user)
+
+        self.imported += len(users)
+        if self.callback:
+            self.callback(users, self.site)
+
+    @staticmethod
+    def set_primary_keys(users):
+        """
+        bulk_create sets the primary keys on postgres only, on the other backends the users are read back
+        by their username, so the callback can relate objects to them.
+        """
+        if connections[router.db_for_write(UserModel)].features.can_return_rows_from_bulk_insert:
+            return
+        field = UserModel.USERNAME_FIELD
+        pks = {}
+        # in slices, older sqlite versions take 999 parameters per query
+        for start in range(0, len(users), 500):
+            pks.update(UserModel._default_manager.filter(**{'{}__in'.format(field): [
+                getattr(user, field) for user in users[start:start + 500]]}).values_list(field, 'pk'))
+        for user in users:
+            user.pk = pks[getattr(user, field)]
+
+    def reject(self, line, row, errors):
+        self.rejected += 1
+        if self.reject_file:
+            row = {key: value for key, value in row.items() if key not in ('password', 'password_hash')}
+            self.rejects.append({'line': line, 'row': row, 'errors': errors})
+
+    def write_rejects(self):
+        # in the order of the file, whichever step rejected them
+        for reject in sorted(self.rejects, key=lambda reject: reject['line']):
+            self.reject_file.write(json.dumps(reject) + '\n')
+        self.rejects = []
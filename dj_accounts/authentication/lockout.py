@@ -0,0 +1,99 @@
+import functools
+import logging
+import math
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from ..utils import get_settings_value
+
+logger = logging.getLogger(__name__)
+
+UserModel = get_user_model()
+
+
+class AccountLocked(PermissionDenied):
+    pass
+
+
+class AccountLockout:
+    """
+    locks an account for ACCOUNT_LOCKOUT_DURATION seconds once it had ACCOUNT_LOCKOUT_THRESHOLD failed logins
+    within ACCOUNT_LOCKOUT_FAILURES_TTL seconds. the duration doubles with every lockout of the account in the
+    last ACCOUNT_LOCKOUT_RESET_AFTER seconds, up to ACCOUNT_LOCKOUT_MAX_DURATION.
+
+    the lock is kept in the cache, so checking it is a single cache read, without a query or a password hash.
+    """
+
+    @property
+    def cache(self):
+        return caches[get_settings_value('ACCOUNT_LOCKOUT_CACHE', 'default')]
+
+    @staticmethod
+    def get_keys(user):
+        key = 'dj_accounts:lockout:{}'.format(user.pk)
+        return key, '{}:failures'.format(key), '{}:level'.format(key)
+
+    def get_duration(self, level):
+        duration = get_settings_value('ACCOUNT_LOCKOUT_DURATION', 60) * 2 ** (level - 1)
+        return min(duration, get_settings_value('ACCOUNT_LOCKOUT_MAX_DURATION', 86400))
+
+    def get_remaining(self, user):
+        """
+        returns the seconds the account stays locked, 0 if it is not.
+        """
+        locked_until = self.cache.get(self.get_keys(user)[0])
+        if locked_until is None:
+            return 0
+        return max(0, math.ceil(locked_until - time.time()))
+
+    def add_failure(self, user):
+        """
+        counts a failed login, locks the account once over the threshold and returns the seconds it is locked for.
+        """
+        lock_key, failures_key, level_key = self.get_keys(user)
+        self.cache.add(failures_key, 0, get_settings_value('ACCOUNT_LOCKOUT_FAILURES_TTL', 3600))
+        try:
+            failures = self.cache.incr(failures_key)
+        except ValueError:
+            failures = 1
+        if failures < get_settings_value('ACCOUNT_LOCKOUT_THRESHOLD', 5):
+            return 0
+
+        self.cache.add(level_key, 0, get_settings_value('ACCOUNT_LOCKOUT_RESET_AFTER', 86400))
+        try:
+            level = self.cache.incr(level_key)
+        except ValueError:
+            level = 1
+        duration = self.get_duration(level)
+        self.cache.set(lock_key, time.time() + duration, duration)
+        self.cache.delete(failures_key)
+        logger.info("Locked user %s out for %d seconds after %d failed logins", user.pk, duration, failures)
+        return duration
+
+    def clear_failures(self, user):
+        # the level is kept, so an account locked again soon after is locked for longer
+        self.cache.delete(self.get_keys(user)[1])
+
+    def unlock(self, user):
+        self.cache.delete_many(self.get_keys(user))
+
+
+@functools.lru_cache()
+def get_account_lockout():
+    return AccountLockout()
+
+
+def is_account_lockout_active():
+    return get_settings_value('ACCOUNT_LOCKOUT_ACTIVE', False)
+
+
+@receiver(post_save, sender=UserModel)
+def unlock_on_password_change(sender, instance, created=False, **kwargs):
+    # a password reset or change proves the owner has the account back
+    if not created and getattr(instance, '_password', None) is not None and is_account_lockout_active():
+        get_account_lockout().unlock(instance)
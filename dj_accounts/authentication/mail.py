@@ -0,0 +1,185 @@
+import functools
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.mail import get_connection, EmailMultiAlternatives
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from django.utils.timezone import now
+
+from .models import OutboxEmail
+from ..utils import get_class_from_settings, get_settings_value, account_activation_token
+
+logger = logging.getLogger(__name__)
+
+
+class EmailDeliveryAbstract(ABC):
+    class Meta:
+        abstract = True
+
+    @abstractmethod
+    def send_messages(self, messages):
+        pass
+
+
+class SyncEmailDelivery(EmailDeliveryAbstract):
+    """
+    sends the messages right away, in the request.
+    """
+
+    def send_messages(self, messages):
+        return get_connection().send_messages(messages)
+
+
+class OutboxEmailDelivery(EmailDeliveryAbstract):
+    """
+    stores the messages in the outbox table, the send_outbox_emails command sends them.
+    the messages are stored in the current transaction, so they are dropped if it rolls back.
+    """
+
+    def send_messages(self, messages):
+        OutboxEmail.objects.bulk_create([OutboxEmail.from_message(message) for message in messages])
+        return len(messages)
+
+
+class QueueEmailDelivery(EmailDeliveryAbstract):
+    """
+    hands the messages to a background thread of this process, they are lost if it exits.
+    meant for development, use OutboxEmailDelivery in production.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name='dj_accounts_email_delivery', daemon=True)
+        self.thread.start()
+
+    def send_messages(self, messages):
+        for message in messages:
+            self.queue.put(message)
+        return len(messages)
+
+    def run(self):
+        while True:
+            messages = [self.queue.get()]
+            while not self.queue.empty():
+                messages.append(self.queue.get_nowait())
+            try:
+                get_connection().send_messages(messages)
+            except Exception:
+                logger.exception("Could not send %d queued emails", len(messages))
+
+
+@functools.lru_cache()
+def _get_email_delivery(delivery_class):
+    return delivery_class()
+
+
+def get_email_delivery():
+    return _get_email_delivery(
+        get_class_from_settings('EMAIL_DELIVERY', 'dj_accounts.authentication.mail.SyncEmailDelivery'))
+
+
+def claim_outbox_emails(batch_size, lease):
+    """
+    picks the next due emails and pushes their send_after by the lease, so other workers skip them,
+    and so they are picked again if this worker dies before recording the result.
+    """
+    with transaction.atomic():
+        emails = list(OutboxEmail.objects.select_for_update(skip_locked=True).filter(
+            status=OutboxEmail.STATUS_PENDING, send_after__lte=now()).order_by('send_after', 'pk')[:batch_size])
+        OutboxEmail.objects.filter(pk__in=[email.pk for email in emails]).update(send_after=now() + lease)
+    return emails
+
+
+def send_outbox_emails(batch_size=100, max_attempts=5, retry_delay=timedelta(minutes=1),
+                       lease=timedelta(minutes=5)):
+    """
+    sends a batch of due outbox emails over a single connection, failed emails are retried
+    with an exponential backoff and marked as failed after max_attempts.
+
+    returns the number of sent and failed emails.
+    """
+    emails = claim_outbox_emails(batch_size, lease)
+    if not emails:
+        return 0, 0
+
+    sent, failed = [], []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        failed = [(email, e) for email in emails]
+    else:
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([email.to_message(connection=connection)])
+                except Exception as e:
+                    failed.append((email, e))
+                else:
+                    sent.append(email.pk)
+        finally:
+            connection.close()
+
+    OutboxEmail.objects.filter(pk__in=sent).update(status=OutboxEmail.STATUS_SENT, sent_at=now())
+
+    for email, error in failed:
+        email.attempts += 1
+        email.last_error = repr(error)
+        if email.attempts >= max_attempts:
+            email.status = OutboxEmail.STATUS_FAILED
+        else:
+            email.send_after = now() + retry_delay * 2 ** (email.attempts - 1)
+    OutboxEmail.objects.bulk_update([email for email, error in failed],
+                                    ['attempts', 'last_error', 'status', 'send_after'])
+
+    return len(sent), len(failed)
+
+
+def build_email_verification_message(user, site, protocol='https', connection=None):
+    html_message = render_to_string('dj_accounts/emails/email_confirmation.html', {
+        'user': user,
+        'site': site,
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': account_activation_token.make_token(user),
+        'protocol': protocol
+    })
+    message = EmailMultiAlternatives(
+        subject=get_settings_value('EMAIL_CONFIRMATION_SUBJECT', None) or '',
+        body=html_message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+        connection=connection
+    )
+    message.attach_alternative(html_message, 'text/html')
+    return message
+
+
+def send_bulk_email_verifications(users, chunk_size=500, site=None, protocol='https', connection=None):
+    """
+    sends the email verification to every user of the queryset over a single connection,
+    in chunks of chunk_size messages. the queryset is streamed with iterator(), so memory
+    stays flat however many users it matches.
+
+    returns the number of sent emails.
+    """
+    site = site or get_current_site(None)
+    connection = connection or get_connection()
+    sent = 0
+    with connection:
+        messages = []
+        for user in users.iterator(chunk_size=chunk_size):
+            messages.append(build_email_verification_message(user, site, protocol, connection=connection))
+            if len(messages) >= chunk_size:
+                sent += connection.send_messages(messages) or 0
+                messages = []
+        if messages:
+            sent += connection.send_messages(messages) or 0
+    return sent
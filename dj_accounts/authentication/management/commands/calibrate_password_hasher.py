@@ -0,0 +1,65 @@
+import math
+import statistics
+import time
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.crypto import get_random_string
+
+# work factor attribute of the hasher and whether the hashing time grows linearly or exponentially with it
+COST_ATTRIBUTES = (
+    ('iterations', 'linear'),
+    ('time_cost', 'linear'),
+    ('rounds', 'log2'),
+)
+
+
+class Command(BaseCommand):
+    help = "Measures the work factor of the default password hasher that takes the target time on this machine"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=80,
+                            help="Target time of a single password hash in milliseconds (default: 80)")
+        parser.add_argument('--samples', type=int, default=5,
+                            help="Hashes measured per tried work factor (default: 5)")
+        parser.add_argument('--passes', type=int, default=3,
+                            help="Measure and adjust passes (default: 3)")
+
+    def handle(self, *args, **options):
+        hasher = get_hasher()
+        attribute, scale = self.get_cost_attribute(hasher)
+        target = options['target_ms'] / 1000
+
+        cost = getattr(hasher, attribute)
+        elapsed = self.measure(hasher, attribute, cost, options['samples'])
+        for _ in range(options['passes']):
+            if scale == 'linear':
+                new_cost = max(1, round(cost * target / elapsed))
+            else:
+                new_cost = max(4, cost + round(math.log2(target / elapsed)))
+            if new_cost == cost:
+                break
+            cost = new_cost
+            elapsed = self.measure(hasher, attribute, cost, options['samples'])
+
+        self.stdout.write("{} {}={} takes {:.1f} ms per hash".format(
+            type(hasher).__name__, attribute, cost, elapsed * 1000))
+        self.stdout.write(self.style.SUCCESS("PASSWORD_HASHER_TARGET_COST = {}".format(cost)))
+
+    @staticmethod
+    def get_cost_attribute(hasher):
+        for attribute, scale in COST_ATTRIBUTES:
+            if isinstance(getattr(hasher, attribute, None), int):
+                return attribute, scale
+        raise CommandError("{} has no tunable work factor".format(type(hasher).__name__))
+
+    @staticmethod
+    def measure(hasher, attribute, cost, samples):
+        probe = type('Probe', (type(hasher),), {attribute: cost})()
+        password, salt = get_random_string(16), probe.salt()
+        durations = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            probe.encode(password, salt)
+            durations.append(time.perf_counter() - start)
+        return statistics.median(durations)
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...exporter import EXPORT_FORMATS, export_users, get_export_fields
+
+
+class Command(BaseCommand):
+    help = "Exports the users as csv or jsonl, streamed in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=tuple(EXPORT_FORMATS), default='csv',
+                            help="Format of the export (default: csv)")
+        parser.add_argument('--fields', default=None,
+                            help="Comma separated fields exported, social_accounts included "
+                                 "(default: USERS_EXPORT_FIELDS or the registration and verification fields)")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Users fetched per query (default: 1000)")
+        parser.add_argument('--output', default=None,
+                            help="File the export is written to (default: stdout)")
+
+    def handle(self, *args, **options):
+        try:
+            fields = get_export_fields(options['fields'].split(',') if options['fields'] else None)
+        except ValueError as e:
+            raise CommandError(e)
+
+        chunks = export_users(fields, options['format'], options['batch_size'])
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        started_at = time.monotonic()
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS("users exported to {} in {:.1f}s".format(
+            options['output'], time.monotonic() - started_at)))
@@ -0,0 +1,55 @@
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand
+
+from ...importer import UserImporter, read_users_file
+
+
+class Command(BaseCommand):
+    help = "Imports users from a csv or jsonl file, validated with the registration rules"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="The csv or jsonl file of the users")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), default=None,
+                            help="Format of the file (default: guessed from the extension)")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Users validated and inserted per chunk (default: 1000)")
+        parser.add_argument('--reject-file', default=None,
+                            help="File the rejected rows and their errors are written to, as jsonl")
+        parser.add_argument('--workers', type=int, default=0,
+                            help="Processes the plain passwords are hashed in, 1 hashes them in the command "
+                                 "(default: one per core)")
+        parser.add_argument('--validate-passwords', action='store_true',
+                            help="Run the AUTH_PASSWORD_VALIDATORS on the plain passwords")
+        parser.add_argument('--extra-fields', default='',
+                            help="Comma separated user fields imported besides the registration ones")
+        parser.add_argument('--site', default=None,
+                            help="Domain of the site the users are imported for, created with its profile if missing")
+        parser.add_argument('--site-name', default=None,
+                            help="Name of the site when it is created (default: the domain)")
+
+    def handle(self, *args, **options):
+        site = None
+        if options['site']:
+            site, created = Site.objects.get_or_create(domain=options['site'], defaults={
+                'name': options['site_name'] or options['site']
+            })
+            if created:
+                self.stdout.write("created the site {}".format(site.domain))
+
+        reject_file = open(options['reject_file'], 'w', encoding='utf-8') if options['reject_file'] else None
+        try:
+            importer = UserImporter(
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                validate_passwords=options['validate_passwords'],
+                extra_fields=[name.strip() for name in options['extra_fields'].split(',') if name.strip()],
+                site=site,
+                reject_file=reject_file,
+            )
+            imported, rejected, elapsed = importer.run(read_users_file(options['path'], options['format']))
+        finally:
+            if reject_file:
+                reject_file.close()
+
+        self.stdout.write(self.style.SUCCESS("{} users imported, {} rejected in {:.1f}s, {:.1f} rows/s".format(
+            imported, rejected, elapsed, (imported + rejected) / elapsed if elapsed else 0)))
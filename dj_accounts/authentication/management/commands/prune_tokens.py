@@ -0,0 +1,59 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+
+class Command(BaseCommand):
+    help = "Deletes the expired outstanding and blacklisted tokens in small chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Tokens deleted per transaction (default: 1000)")
+        parser.add_argument('--sleep', type=float, default=0.1,
+                            help="Seconds to wait between chunks (default: 0.1)")
+        parser.add_argument('--grace', type=int, default=0,
+                            help="Seconds a token is kept after it expired (default: 0)")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep pruning instead of exiting once every expired token is deleted")
+        parser.add_argument('--interval', type=float, default=3600,
+                            help="Seconds to wait between runs in --loop mode (default: 3600)")
+
+    def handle(self, *args, **options):
+        while True:
+            started_at = time.monotonic()
+            deleted, blacklisted = self.prune(options['chunk_size'], options['sleep'],
+                                              timedelta(seconds=options['grace']), options['verbosity'])
+            elapsed = time.monotonic() - started_at
+            self.stdout.write(self.style.SUCCESS("{} tokens deleted, {} of them blacklisted, in {:.1f}s, "
+                                                 "{:.1f} tokens/s".format(deleted, blacklisted, elapsed,
+                                                                          deleted / elapsed if elapsed else 0)))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def prune(self, chunk_size, sleep, grace, verbosity=1):
+        """
+        returns the outstanding tokens deleted and how many of them were blacklisted,
+        the blacklist rows go with their token so they are not counted as tokens of their own.
+        """
+        expired = OutstandingToken.objects.filter(expires_at__lte=now() - grace).order_by('id')
+        last_id = 0
+        deleted = blacklisted = 0
+        while True:
+            ids = list(expired.filter(id__gt=last_id).values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                return deleted, blacklisted
+
+            with transaction.atomic():
+                blacklisted += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+                deleted += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+            last_id = ids[-1]
+
+            if verbosity > 1:
+                self.stdout.write("deleted {} tokens, up to token {}".format(deleted, last_id))
+            if sleep and len(ids) == chunk_size:
+                time.sleep(sleep)
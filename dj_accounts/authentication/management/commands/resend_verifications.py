@@ -0,0 +1,96 @@
+import json
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from ...mail import build_email_verification_message
+
+UserModel = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Re-sends the email verification to every user that did not verify their email yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Users fetched and emails sent per batch (default: 500)")
+        parser.add_argument('--rate', type=float, default=None,
+                            help="Maximum emails sent per second (default: unlimited)")
+        parser.add_argument('--checkpoint', default=None,
+                            help="File the last handled user is stored in, the command resumes from it "
+                                 "and removes it once every user is handled")
+        parser.add_argument('--protocol', default='https',
+                            help="Protocol of the verification link (default: https)")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rate = options['rate']
+        checkpoint = options['checkpoint']
+        site = get_current_site(None)
+
+        last_pk, sent = self.read_checkpoint(checkpoint)
+        if last_pk is not None:
+            self.stdout.write("resuming after user {}, {} emails already sent".format(last_pk, sent))
+
+        queryset = UserModel._default_manager.filter(email_verified_at__isnull=True).order_by('pk')
+        started_at = time.monotonic()
+        sent_now = 0
+
+        with get_connection() as connection:
+            while True:
+                batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+                users = list(batch[:batch_size])
+                if not users:
+                    break
+
+                messages = [build_email_verification_message(user, site, options['protocol'], connection=connection)
+                            for user in users if user.email]
+                if rate:
+                    # paced one email at a time, so a batch is never sent in a burst
+                    for message in messages:
+                        delay = sent_now / rate - (time.monotonic() - started_at)
+                        if delay > 0:
+                            time.sleep(delay)
+                        connection.send_messages([message])
+                        sent_now += 1
+                elif messages:
+                    connection.send_messages(messages)
+                    sent_now += len(messages)
+
+                last_pk = users[-1].pk
+                sent += len(messages)
+                self.write_checkpoint(checkpoint, last_pk, sent)
+
+                elapsed = time.monotonic() - started_at
+                if options['verbosity'] > 1:
+                    self.stdout.write("sent {} emails, up to user {}, {:.1f} emails/s".format(
+                        sent, last_pk, sent_now / elapsed if elapsed else 0))
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.monotonic() - started_at
+        self.stdout.write(self.style.SUCCESS("{} emails sent in {:.1f}s, {:.1f} emails/s".format(
+            sent, elapsed, sent_now / elapsed if elapsed else 0)))
+
+    @staticmethod
+    def read_checkpoint(checkpoint):
+        if not checkpoint or not os.path.exists(checkpoint):
+            return None, 0
+        with open(checkpoint) as file:
+            data = json.load(file)
+        return data['last_pk'], data.get('sent', 0)
+
+    @staticmethod
+    def write_checkpoint(checkpoint, last_pk, sent):
+        if not checkpoint:
+            return
+        # write to a temporary file and rename it, so a crash never leaves a truncated checkpoint
+        temporary = '{}.tmp'.format(checkpoint)
+        with open(temporary, 'w') as file:
+            json.dump({'last_pk': last_pk, 'sent': sent}, file)
+        os.replace(temporary, checkpoint)
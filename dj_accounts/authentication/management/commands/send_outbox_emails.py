@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from ...mail import send_outbox_emails
+
+
+class Command(BaseCommand):
+    help = "Sends the pending emails of the outbox in batches, over one connection per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Emails sent over a single connection (default: 100)")
+        parser.add_argument('--max-attempts', type=int, default=5,
+                            help="Attempts before an email is marked as failed (default: 5)")
+        parser.add_argument('--retry-delay', type=int, default=60,
+                            help="Seconds before the first retry, doubled on every attempt (default: 60)")
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep draining the outbox instead of exiting once it is empty")
+        parser.add_argument('--interval', type=float, default=5,
+                            help="Seconds to wait when the outbox is empty in --loop mode (default: 5)")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_outbox_emails(
+                batch_size=options['batch_size'],
+                max_attempts=options['max_attempts'],
+                retry_delay=timedelta(seconds=options['retry_delay']))
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write("sent {}, failed {}".format(sent, failed))
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS("{} emails sent, {} failed".format(total_sent, total_failed)))
@@ -0,0 +1,44 @@
+# Generated by Django 3.2.8 on 2026-10-18 20:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_siteprofile_options'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.TextField(verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('from_email', models.CharField(blank=True, max_length=254, null=True, verbose_name='From Email')),
+                ('to', models.JSONField(default=list, verbose_name='To')),
+                ('cc', models.JSONField(default=list, verbose_name='Cc')),
+                ('bcc', models.JSONField(default=list, verbose_name='Bcc')),
+                ('reply_to', models.JSONField(default=list, verbose_name='Reply To')),
+                ('headers', models.JSONField(default=dict, verbose_name='Headers')),
+                ('alternatives', models.JSONField(default=list, verbose_name='Alternatives')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Last Error')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Send After')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Sent At')),
+            ],
+            options={
+                'verbose_name': 'Outbox Email',
+                'verbose_name_plural': 'Outbox Emails',
+                'default_permissions': (),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outboxemail',
+            index=models.Index(fields=['status', 'send_after'], name='authenticat_status_a4c4d4_idx'),
+        ),
+    ]
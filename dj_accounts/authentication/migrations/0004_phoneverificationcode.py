@@ -0,0 +1,28 @@
+# Generated by Django 3.2.8 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_outboxemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhoneVerificationCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(max_length=50, unique=True, verbose_name='Phone')),
+                ('code_hash', models.CharField(max_length=128, verbose_name='Code Hash')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires At')),
+            ],
+            options={
+                'verbose_name': 'Phone Verification Code',
+                'verbose_name_plural': 'Phone Verification Codes',
+                'default_permissions': (),
+            },
+        ),
+    ]
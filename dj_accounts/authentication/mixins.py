@@ -1,19 +1,25 @@
+import logging
 import sys
 import traceback
 
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.utils.encoding import force_bytes, force_text
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.core.exceptions import ValidationError
+from django.forms.utils import ErrorDict
+from django.utils.encoding import force_text
+from django.utils.http import urlsafe_base64_decode
 from django.utils.timezone import now
+from django.utils.translation import gettext_lazy as _
 
 from .forms import MultipleLoginForm, VerifyPhoneForm
-from .verify_phone import VerifyPhone
+from .mail import get_email_delivery, build_email_verification_message
+from .sms import get_phone_verification_delivery
+from .throttling import get_login_throttle, get_client_ip, get_verification_resend_throttle, \
+    get_phone_verification_attempts, is_phone_verification_attempts_active
 from ..utils import get_settings_value, get_class_from_settings, account_activation_token
 
+logger = logging.getLogger(__name__)
+
 UserModel = get_user_model()
 
 
@@ -31,28 +37,66 @@ class LoginGetFormClassMixin:
         return get_class_from_settings('LOGIN_FORM', 'django.contrib.auth.forms.AuthenticationForm')
 
 
+class LoginThrottleMixin:
+    """
+    checks the LoginThrottle before the login form is validated, so a throttled attempt costs
+    neither a user lookup nor a password hash, and counts the failed attempts.
+    active when LOGIN_THROTTLE_ACTIVE is set.
+    """
+    throttled_message = _("Too many login attempts, please try again in %(seconds)d seconds.")
+
+    def get_login_throttle_identity(self, request, data):
+        identifier = data.get('identifier') or data.get(UserModel.USERNAME_FIELD)
+        return identifier, get_client_ip(request)
+
+    def check_login_throttle(self, request, data):
+        """
+        returns the seconds to wait before the next attempt, 0 if it is allowed.
+        """
+        if not get_settings_value('LOGIN_THROTTLE_ACTIVE', False):
+            return 0
+        return get_login_throttle().check(*self.get_login_throttle_identity(request, data))
+
+    def add_login_failure(self, request, data):
+        if get_settings_value('LOGIN_THROTTLE_ACTIVE', False):
+            get_login_throttle().add_failure(*self.get_login_throttle_identity(request, data))
+
+    def add_throttled_error(self, form, retry_after):
+        # set without cleaning the form, which would authenticate the credentials
+        form.cleaned_data = {}
+        form._errors = ErrorDict()
+        form.add_error(None, ValidationError(
+            self.throttled_message, code='throttled', params={'seconds': retry_after}))
+        return form
+
+
+class VerificationResendThrottleMixin:
+    """
+    enforces the cooldown and the daily quota of the verification resend views,
+    active when VERIFICATION_RESEND_THROTTLE_ACTIVE is set.
+    """
+    resend_throttled_message = _("Please wait %(seconds)d seconds before requesting a new verification.")
+
+    def check_verification_resend(self, user, kind):
+        """
+        returns the seconds to wait before the next resend, 0 if this one is allowed.
+        """
+        if not get_settings_value('VERIFICATION_RESEND_THROTTLE_ACTIVE', False):
+            return 0
+        return get_verification_resend_throttle().take(user, kind)
+
+    def get_resend_throttled_message(self, retry_after):
+        return self.resend_throttled_message % {'seconds': retry_after}
+
+
 class SendEmailVerificationMixin:
     def send_email_verification(self, request, user):
         try:
-            html_message = render_to_string('dj_accounts/emails/email_confirmation.html', {
-                'user': user,
-                'site': get_current_site(request),
-                'uid': urlsafe_base64_encode(force_bytes(user.pk)),
-                'token': account_activation_token.make_token(user),
-                'protocol': 'https' if request.is_secure() else 'http'
-            })
-            send_mail(
-                subject=get_settings_value('EMAIL_CONFIRMATION_SUBJECT', None),
-                html_message=html_message,
-                message=html_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[user.email]
-            )
-        except Exception as e:
-            parts = ["Traceback (most recent call last):\n"]
-            parts.extend(traceback.format_stack(limit=25)[:-2])
-            parts.extend(traceback.format_exception(*sys.exc_info())[1:])
-            print("".join(parts))
+            message = build_email_verification_message(
+                user, get_current_site(request), 'https' if request.is_secure() else 'http')
+            get_email_delivery().send_messages([message])
+        except Exception:
+            logger.exception("Could not send the verification email of user %s", user.pk)
 
 
 class ViewCallbackMixin:
@@ -65,7 +109,10 @@ class ViewCallbackMixin:
 class SendPhoneVerificationMixin:
     def send_phone_verification(self, user):
         try:
-            VerifyPhone().send(user.phone)
+            get_phone_verification_delivery().send(user.phone)
+            # a new code, with a new set of attempts
+            if is_phone_verification_attempts_active():
+                get_phone_verification_attempts().reset(user)
         except Exception as e:
             parts = ["Traceback (most recent call last):\n"]
             parts.extend(traceback.format_stack(limit=25)[:-2])
@@ -77,6 +124,17 @@ class RegisterMixin(ViewCallbackMixin, SendEmailVerificationMixin, SendPhoneVeri
     def get_form_class(self):
         return get_class_from_settings('REGISTER_FORM', 'dj_accounts.authentication.forms.UserCreationForm')
 
+    @staticmethod
+    def save_form(form):
+        """
+        returns the registered user, or None if the insert hit a unique constraint,
+        the form has the errors then.
+        """
+        try:
+            return form.save()
+        except ValidationError:
+            return None
+
 
 class VerifyEmailMixin:
     def verify(self, uidb64, token):
@@ -1,8 +1,11 @@
 from django import forms
+from django.conf import settings
 from django.contrib.sites.models import Site
+from django.core.mail import EmailMultiAlternatives
 from django.db import models
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from translation.models import TranslatableModel
 
@@ -61,4 +64,96 @@ class SiteProfile(TranslatableModel):
 post_save.connect(create_site_profile_created_site_signal, sender=Site)
 
 
+class OutboxEmail(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
 
+    STATUSES = (
+        (STATUS_PENDING, _("Pending")),
+        (STATUS_SENT, _("Sent")),
+        (STATUS_FAILED, _("Failed")),
+    )
+
+    class Meta:
+        verbose_name = _("Outbox Email")
+        verbose_name_plural = _("Outbox Emails")
+        default_permissions = ()
+        indexes = [
+            models.Index(fields=['status', 'send_after']),
+        ]
+
+    subject = models.TextField(verbose_name=_("Subject"))
+    body = models.TextField(verbose_name=_("Body"))
+    from_email = models.CharField(max_length=254, null=True, blank=True, verbose_name=_("From Email"))
+    to = models.JSONField(default=list, verbose_name=_("To"))
+    cc = models.JSONField(default=list, verbose_name=_("Cc"))
+    bcc = models.JSONField(default=list, verbose_name=_("Bcc"))
+    reply_to = models.JSONField(default=list, verbose_name=_("Reply To"))
+    headers = models.JSONField(default=dict, verbose_name=_("Headers"))
+    alternatives = models.JSONField(default=list, verbose_name=_("Alternatives"))
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_PENDING, verbose_name=_("Status"))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Attempts"))
+    last_error = models.TextField(blank=True, default='', verbose_name=_("Last Error"))
+    send_after = models.DateTimeField(default=now, verbose_name=_("Send After"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
+    sent_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Sent At"))
+
+    def __str__(self):
+        return self.subject
+
+    @classmethod
+    def from_message(cls, message):
+        return cls(
+            # the subject column is not nullable, EmailMessage accepts a None subject
+            subject=message.subject or '',
+            body=message.body,
+            from_email=message.from_email,
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            headers=dict(message.extra_headers),
+            alternatives=[list(alternative) for alternative in getattr(message, 'alternatives', [])])
+
+    def to_message(self, connection=None):
+        return EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to,
+            cc=self.cc,
+            bcc=self.bcc,
+            reply_to=self.reply_to,
+            headers=self.headers,
+            alternatives=[tuple(alternative) for alternative in self.alternatives],
+            connection=connection)
+
+
+class PhoneVerificationCode(models.Model):
+    class Meta:
+        verbose_name = _("Phone Verification Code")
+        verbose_name_plural = _("Phone Verification Codes")
+        default_permissions = ()
+
+    phone = models.CharField(max_length=50, unique=True, verbose_name=_("Phone"))
+    code_hash = models.CharField(max_length=128, verbose_name=_("Code Hash"))
+    attempts = models.PositiveIntegerField(default=0, verbose_name=_("Attempts"))
+    expires_at = models.DateTimeField(verbose_name=_("Expires At"))
+
+    def __str__(self):
+        return self.phone
+
+
+class TokenVersion(models.Model):
+    class Meta:
+        verbose_name = _("Token Version")
+        verbose_name_plural = _("Token Versions")
+        default_permissions = ()
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True,
+                                related_name='+', verbose_name=_("User"))
+    version = models.PositiveIntegerField(default=0, verbose_name=_("Version"))
+
+    def __str__(self):
+        return str(self.version)
@@ -0,0 +1,122 @@
+import hashlib
+import hmac
+import secrets
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.crypto import salted_hmac
+from django.utils.timezone import now
+from django.utils.translation import gettext as _
+
+from .models import PhoneVerificationCode
+from .verify_phone import VerifyPhoneServiceAbstract
+from ..utils import get_settings_value, get_class_from_settings
+
+
+class LocalVerifyPhoneService(VerifyPhoneServiceAbstract):
+    """
+    generates the codes locally and keeps them hashed in the cache with a ttl and an attempts counter,
+    so checking a code is a cache lookup instead of a call to the sms provider.
+    only the sms goes out, through the PHONE_VERIFICATION_SMS_SENDER callable, ``sender(phone, message)``.
+
+    with PHONE_VERIFICATION_CODE_DB_FALLBACK the codes are stored in the database as well,
+    and checked there when the cache lost them.
+    """
+    key_salt = 'dj_accounts.authentication.otp.LocalVerifyPhoneService'
+
+    def open(self):
+        if not get_settings_value('PHONE_VERIFICATION_SMS_SENDER'):
+            raise ImproperlyConfigured("PHONE_VERIFICATION_SMS_SENDER is required by LocalVerifyPhoneService")
+
+    @property
+    def cache(self):
+        return caches[get_settings_value('PHONE_VERIFICATION_CODE_CACHE', 'default')]
+
+    @property
+    def ttl(self):
+        return get_settings_value('PHONE_VERIFICATION_CODE_TTL', 600)
+
+    @property
+    def max_attempts(self):
+        return get_settings_value('PHONE_VERIFICATION_CODE_MAX_ATTEMPTS', 5)
+
+    @property
+    def db_fallback(self):
+        return get_settings_value('PHONE_VERIFICATION_CODE_DB_FALLBACK', False)
+
+    def get_cache_keys(self, phone):
+        key = 'dj_accounts:phone_verification:{}'.format(hashlib.sha256(str(phone).encode()).hexdigest())
+        return key, '{}:attempts'.format(key)
+
+    def generate_code(self):
+        digits = get_settings_value('PHONE_VERIFICATION_CODE_DIGITS', 6)
+        return str(secrets.randbelow(10 ** digits)).zfill(digits)
+
+    def hash_code(self, phone, code):
+        return salted_hmac(self.key_salt, '{}:{}'.format(phone, code), algorithm='sha256').hexdigest()
+
+    def get_message(self, code):
+        message = get_settings_value('PHONE_VERIFICATION_CODE_MESSAGE', None) or _("Your verification code is {code}")
+        return str(message).format(code=code)
+
+    def send(self, phone):
+        code = self.generate_code()
+        code_hash = self.hash_code(phone, code)
+
+        code_key, attempts_key = self.get_cache_keys(phone)
+        self.cache.set_many({code_key: code_hash, attempts_key: 0}, self.ttl)
+        if self.db_fallback:
+            PhoneVerificationCode.objects.update_or_create(phone=phone, defaults={
+                'code_hash': code_hash,
+                'attempts': 0,
+                'expires_at': now() + timedelta(seconds=self.ttl)
+            })
+
+        get_class_from_settings('PHONE_VERIFICATION_SMS_SENDER')(phone, self.get_message(code))
+
+    def check(self, phone, code):
+        code_key, attempts_key = self.get_cache_keys(phone)
+        code_hash = self.cache.get(code_key)
+        if code_hash is None:
+            return self.check_database(phone, code) if self.db_fallback else False
+
+        self.cache.add(attempts_key, 0, self.ttl)
+        try:
+            attempts = self.cache.incr(attempts_key)
+        except ValueError:
+            # the counter expired between the two calls, so did the code
+            return False
+
+        if attempts > self.max_attempts:
+            self.invalidate(phone)
+            return False
+
+        if hmac.compare_digest(code_hash, self.hash_code(phone, code)):
+            self.invalidate(phone)
+            return True
+
+        if attempts >= self.max_attempts:
+            self.invalidate(phone)
+        return False
+
+    def check_database(self, phone, code):
+        with transaction.atomic():
+            verification_code = PhoneVerificationCode.objects.select_for_update().filter(
+                phone=phone, expires_at__gt=now()).first()
+            if verification_code is None:
+                return False
+
+            verification_code.attempts += 1
+            is_correct = hmac.compare_digest(verification_code.code_hash, self.hash_code(phone, code))
+            if is_correct or verification_code.attempts >= self.max_attempts:
+                verification_code.delete()
+            else:
+                verification_code.save(update_fields=['attempts'])
+            return is_correct
+
+    def invalidate(self, phone):
+        self.cache.delete_many(self.get_cache_keys(phone))
+        if self.db_fallback:
+            PhoneVerificationCode.objects.filter(phone=phone).delete()
@@ -0,0 +1,101 @@
+import re
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+
+from ..utils import get_class_from_settings, import_class_or_function
+
+EMAIL_SHAPE_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+\Z'
+E164_PHONE_PATTERN = r'^\+?[1-9]\d{1,14}\Z'
+NUMERIC_ID_PATTERN = r'^\d+\Z'
+USERNAME_SHAPE_PATTERN = r'^(?!\+?\d+\Z)[\w.+-]+\Z'
+
+
+class IdentifierClassifier:
+    """
+    narrows a login identifier down to the authentication fields it could match.
+
+    a field is a candidate only if the identifier is a valid value for it (type conversion,
+    field validators and max length), and, when ``field_patterns`` declares a pattern for
+    the field, the identifier matches that pattern as well.
+    """
+    field_patterns = {}
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = list(getattr(model, 'AUTHENTICATION_FIELDS', None) or [])
+
+    def classify(self, identifier):
+        return [field for field in self.fields if self.accepts(field, identifier)]
+
+    def accepts(self, lookup, identifier):
+        pattern = self.field_patterns.get(lookup)
+        if pattern is not None and not re.match(pattern, str(identifier)):
+            return False
+
+        try:
+            field = self.model._meta.get_field(lookup.split(LOOKUP_SEP)[0])
+        except FieldDoesNotExist:
+            return False
+
+        try:
+            field.run_validators(field.to_python(identifier))
+        except ValidationError:
+            return False
+        return True
+
+
+class ShapeIdentifierClassifier(IdentifierClassifier):
+    """
+    classifies identifiers by their shape: emails contain ``@``, phones are E.164 numbers,
+    ids are numeric and usernames are anything else, so an email or a username never
+    matches more than one column.
+    only use it when your usernames can not contain ``@`` and your phones are stored in E.164.
+    """
+    field_patterns = {
+        'email': EMAIL_SHAPE_PATTERN,
+        'phone': E164_PHONE_PATTERN,
+        'id': NUMERIC_ID_PATTERN,
+        'pk': NUMERIC_ID_PATTERN,
+        'username': USERNAME_SHAPE_PATTERN,
+    }
+
+
+def get_identifier_classifier_class(model):
+    classifier_class = getattr(model, 'AUTHENTICATION_IDENTIFIER_CLASSIFIER', None)
+    if classifier_class:
+        return import_class_or_function(classifier_class) if type(classifier_class) is str else classifier_class
+    return get_class_from_settings('AUTHENTICATION_IDENTIFIER_CLASSIFIER',
+                                   'dj_accounts.authentication.resolvers.IdentifierClassifier')
+
+
+class IdentifierResolver:
+    """
+    resolves a login identifier to a user in a single query, filtering only on the
+    authentication fields the classifier kept for that identifier.
+    """
+
+    def __init__(self, model, classifier=None):
+        self.model = model
+        self.classifier = classifier or get_identifier_classifier_class(model)(model)
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def resolve(self, identifier):
+        fields = self.classifier.classify(identifier)
+        if not fields:
+            return None
+
+        query = Q()
+        for field in fields:
+            query |= Q(**{field: identifier})
+
+        # every authentication field is unique, so this fetches at most one row per field;
+        # picking the lowest pk in python keeps the old ``first()`` semantics without
+        # an ORDER BY across the OR.
+        users = list(self.get_queryset().filter(query).order_by())
+        if not users:
+            return None
+        return min(users, key=lambda user: user.pk)
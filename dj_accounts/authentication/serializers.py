@@ -1,15 +1,16 @@
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth import password_validation
-from django.contrib.auth.forms import PasswordResetForm, AuthenticationForm, PasswordChangeForm
+from django.contrib.auth.forms import AuthenticationForm, PasswordChangeForm
 from django.contrib.auth.password_validation import validate_password
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
 
-from .forms import RegisterForm, MultipleLoginForm
+from .blacklist import RefreshToken
+from .forms import RegisterForm, MultipleLoginForm, PasswordResetForm
+from ..utils import get_settings_value, get_class_from_settings
 
 UserModel = get_user_model()
 
@@ -30,9 +31,9 @@ class LoginSerializer(serializers.Serializer):
         return attrs
 
     def get_authentication_form(self):
-        if getattr(settings, 'MULTIPLE_AUTHENTICATION_ACTIVE', False):
+        if get_settings_value('MULTIPLE_AUTHENTICATION_ACTIVE', False):
             return MultipleLoginForm
-        return getattr(settings, 'LOGIN_FORM', AuthenticationForm)
+        return get_class_from_settings('LOGIN_FORM', AuthenticationForm)
 
 
 class LogoutSerializer(serializers.Serializer):
@@ -45,6 +46,10 @@ class LogoutSerializer(serializers.Serializer):
             raise ValidationError({"refresh": _('Invalid token.')})
 
 
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    token_class = RefreshToken
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
         required=True,
@@ -0,0 +1,125 @@
+import collections
+import functools
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from .verify_phone import VerifyPhone
+from ..utils import get_class_from_settings, get_settings_value
+
+logger = logging.getLogger(__name__)
+
+PhoneVerificationFailure = collections.namedtuple('PhoneVerificationFailure', ['phone', 'attempts', 'error', 'failed_at'])
+
+
+class PhoneVerificationDeliveryAbstract(ABC):
+    class Meta:
+        abstract = True
+
+    @abstractmethod
+    def send(self, phone):
+        pass
+
+
+class SyncPhoneVerificationDelivery(PhoneVerificationDeliveryAbstract):
+    """
+    sends the code right away, in the request.
+    """
+
+    def send(self, phone):
+        return VerifyPhone.shared().send(phone)
+
+
+class QueuePhoneVerificationDelivery(PhoneVerificationDeliveryAbstract):
+    """
+    sends the codes from a pool of worker threads, so the request does not wait for the sms gateway.
+
+    the codes waiting in the queue are sent together through the service ``send_many``, a failed code
+    is retried with an exponential backoff and logged once it ran out of attempts, with the failure in the
+    ``phone_verification_failure`` extra of the record. ``failures`` only keeps the last ones of this process,
+    route the log records to a persistent handler to keep them across restarts and workers.
+    codes still in the queue are lost if the process exits.
+    """
+
+    def __init__(self):
+        self.batch_size = get_settings_value('PHONE_VERIFICATION_QUEUE_BATCH_SIZE', 50)
+        self.max_attempts = get_settings_value('PHONE_VERIFICATION_QUEUE_MAX_ATTEMPTS', 3)
+        self.retry_delay = get_settings_value('PHONE_VERIFICATION_QUEUE_RETRY_DELAY', 2)
+        self.failures = collections.deque(maxlen=get_settings_value('PHONE_VERIFICATION_QUEUE_FAILURES', 1000))
+        self.queue = queue.Queue()
+        self.threads = [
+            threading.Thread(target=self.run, name='dj_accounts_phone_verification_{}'.format(i), daemon=True)
+            for i in range(get_settings_value('PHONE_VERIFICATION_QUEUE_WORKERS', 2))
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def send(self, phone):
+        # (phone, attempts already made)
+        self.queue.put((phone, 0))
+
+    def run(self):
+        while True:
+            self.dispatch(self.get_batch())
+
+    def get_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def dispatch(self, batch):
+        try:
+            errors = VerifyPhone.shared().service.send_many([phone for phone, attempts in batch])
+        except Exception as e:
+            errors = {phone: e for phone, attempts in batch}
+        finally:
+            # the services may use the database, like LocalVerifyPhoneService, the worker threads are not
+            # requests so their connections are not closed for them
+            close_old_connections()
+
+        for phone, attempts in batch:
+            if phone in errors:
+                self.retry(phone, attempts + 1, errors[phone])
+
+    def retry(self, phone, attempts, error):
+        if attempts >= self.max_attempts:
+            failure = PhoneVerificationFailure(phone, attempts, repr(error), now())
+            self.failures.append(failure)
+            logger.error("Could not send the phone verification to %s after %d attempts: %r", phone, attempts, error,
+                         extra={'phone_verification_failure': failure._asdict()})
+            return
+
+        delay = self.retry_delay * 2 ** (attempts - 1)
+        if not delay:
+            self.queue.put((phone, attempts))
+            return
+        timer = threading.Timer(delay, self.queue.put, [(phone, attempts)])
+        timer.daemon = True
+        timer.start()
+
+
+@functools.lru_cache()
+def _get_phone_verification_delivery(delivery_class):
+    return delivery_class()
+
+
+def get_phone_verification_delivery():
+    return _get_phone_verification_delivery(get_class_from_settings(
+        'PHONE_VERIFICATION_DELIVERY', 'dj_accounts.authentication.sms.SyncPhoneVerificationDelivery'))
+
+
+@receiver(setting_changed)
+def reset_phone_verification_delivery(*, setting, **kwargs):
+    # the workers of the previous delivery keep sending the codes already in its queue
+    if setting.startswith('PHONE_VERIFICATION_QUEUE_'):
+        _get_phone_verification_delivery.cache_clear()
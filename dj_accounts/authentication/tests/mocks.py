@@ -12,6 +12,21 @@ class MockVerifyService(VerifyPhoneServiceAbstract):
         return phone == self.phone and code == self.code
 
 
+class CountingVerifyService(MockVerifyService):
+    """
+    records the checked and the invalidated phones.
+    """
+    checked = []
+    invalidated = []
+
+    def check(self, phone, code):
+        self.checked.append(phone)
+        return super().check(phone, code)
+
+    def invalidate(self, phone):
+        self.invalidated.append(phone)
+
+
 class TestingVerifyService(VerifyPhoneServiceAbstract):
     def send(self, phone):
         return True
@@ -21,4 +36,50 @@ class TestingVerifyService(VerifyPhoneServiceAbstract):
 
 
 def register_callback(user):
-    pass
\ No newline at end of file
+    pass
+
+
+class LifecycleVerifyService(VerifyPhoneServiceAbstract):
+    instances = []
+
+    def __init__(self):
+        self.opened = False
+        self.closed = False
+        self.instances.append(self)
+
+    def open(self):
+        self.opened = True
+
+    def close(self):
+        self.closed = True
+
+    def send(self, phone):
+        return True
+
+    def check(self, phone, code):
+        return True
+
+
+class FlakyVerifyService(VerifyPhoneServiceAbstract):
+    """
+    fails the first ``failures`` sends to every phone, records the successful ones in ``sent``.
+    """
+    failures = 1
+    sent = []
+    attempts = {}
+
+    def send(self, phone):
+        self.attempts[phone] = self.attempts.get(phone, 0) + 1
+        if self.attempts[phone] <= self.failures:
+            raise OSError("gateway down")
+        self.sent.append(phone)
+
+    def check(self, phone, code):
+        return True
+
+
+sent_sms = []
+
+
+def sms_sender(phone, message):
+    sent_sms.append((phone, message))
@@ -0,0 +1,268 @@
+from django.contrib.auth.signals import user_logged_out
+from django.utils.timezone import now
+from django.core.cache import cache
+from django.test import TestCase, override_settings, RequestFactory
+from django.urls import reverse
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .factories import UserFactory
+from ..authentication import CachedJWTAuthentication, invalidate_cached_user, ClaimsJWTAuthentication, \
+    TokenVersionJWTAuthentication, revoke_user_tokens, get_token_version
+from ..blacklist import RefreshToken as BlacklistRefreshToken
+from ..views_api import UpdateProfileAPIView
+from ...utils import get_user_tokens
+
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.authentication = CachedJWTAuthentication()
+        self.token = self.authentication.get_validated_token(str(RefreshToken.for_user(self.user).access_token))
+
+    def test_it_returns_the_user_of_the_token(self):
+        self.assertEquals(self.authentication.get_user(self.token), self.user)
+
+    def test_it_does_not_query_the_users_table_once_cached(self):
+        self.authentication.get_user(self.token)
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(self.token)
+        self.assertEquals(user.username, self.user.username)
+        self.assertEquals(user.email, self.user.email)
+
+    def test_cached_users_are_loaded_from_the_database(self):
+        self.authentication.get_user(self.token)
+        user = self.authentication.get_user(self.token)
+        self.assertFalse(user._state.adding)
+        self.assertEquals(user._state.db, 'default')
+
+    def test_the_password_is_not_cached_but_loaded_when_accessed(self):
+        self.authentication.get_user(self.token)
+        user = self.authentication.get_user(self.token)
+        self.assertIn('password', user.get_deferred_fields())
+        self.assertTrue(user.check_password('secret'))
+
+    def test_saving_a_cached_user_only_saves_the_cached_fields(self):
+        self.authentication.get_user(self.token)
+        user = self.authentication.get_user(self.token)
+        user.first_name = 'changed'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEquals(self.user.first_name, 'changed')
+        self.assertTrue(self.user.check_password('secret'))
+
+    @override_settings(JWT_USER_SNAPSHOT_FIELDS=['username'])
+    def test_it_caches_the_fields_set_in_settings(self):
+        self.authentication.get_user(self.token)
+        user = self.authentication.get_user(self.token)
+        self.assertEquals(user.get_deferred_fields() & {'id', 'username'}, set())
+        self.assertIn('email', user.get_deferred_fields())
+
+    def test_saving_the_user_invalidates_the_cache(self):
+        self.authentication.get_user(self.token)
+        self.user.first_name = 'changed'
+        self.user.save()
+        self.assertEquals(self.authentication.get_user(self.token).first_name, 'changed')
+
+    def test_changing_the_password_invalidates_the_cache(self):
+        self.authentication.get_user(self.token)
+        self.user.set_password('new secret')
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.token)
+
+    def test_logging_out_invalidates_the_cache(self):
+        self.authentication.get_user(self.token)
+        user_logged_out.send(sender=type(self.user), request=RequestFactory().get('/'), user=self.user)
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.token)
+
+    def test_invalidate_cached_user(self):
+        self.authentication.get_user(self.token)
+        type(self.user).objects.filter(pk=self.user.pk).update(first_name='changed')
+        invalidate_cached_user(self.user)
+        self.assertEquals(self.authentication.get_user(self.token).first_name, 'changed')
+
+    def test_it_rejects_deleted_users(self):
+        self.authentication.get_user(self.token)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_it_rejects_inactive_users(self):
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.token)
+
+    def test_it_refills_the_cache_if_the_version_is_lost(self):
+        self.authentication.get_user(self.token)
+        cache.delete('dj_accounts:user:{}:version'.format(self.user.pk))
+        with self.assertNumQueries(1):
+            self.authentication.get_user(self.token)
+        with self.assertNumQueries(0):
+            self.authentication.get_user(self.token)
+
+
+@override_settings(JWT_USER_CLAIMS=['is_active', 'username', 'email_verified_at', 'email_verified', 'permissions_hash'])
+class ClaimsJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory(email_verified_at=now())
+        self.user.refresh_from_db()
+        self.authentication = ClaimsJWTAuthentication()
+
+    def get_token(self):
+        return self.authentication.get_validated_token(get_user_tokens(self.user)['access_token'])
+
+    def test_get_user_tokens_embeds_the_claims(self):
+        claims = self.get_token()['user']
+        self.assertEquals(claims['username'], self.user.username)
+        self.assertTrue(claims['is_active'])
+        self.assertTrue(claims['email_verified'])
+        self.assertIn('permissions_hash', claims)
+
+    @override_settings(JWT_USER_CLAIMS=None)
+    def test_get_user_tokens_embeds_no_claims_by_default(self):
+        self.assertNotIn('user', self.get_token())
+
+    def test_it_builds_the_user_from_the_claims(self):
+        token = self.get_token()
+        with self.assertNumQueries(0):
+            user = self.authentication.get_user(token)
+            self.assertEquals(user.pk, self.user.pk)
+            self.assertEquals(user.username, self.user.username)
+            self.assertEquals(user.email_verified_at, self.user.email_verified_at)
+            self.assertTrue(user.token_claims['email_verified'])
+
+    def test_it_loads_the_row_when_a_field_was_not_claimed(self):
+        user = self.authentication.get_user(self.get_token())
+        with self.assertNumQueries(1):
+            self.assertEquals(user.email, self.user.email)
+
+    def test_it_rejects_inactive_users(self):
+        self.user.is_active = False
+        with self.assertRaises(AuthenticationFailed):
+            self.authentication.get_user(self.get_token())
+
+    def test_the_permissions_hash_changes_with_the_permissions(self):
+        permissions_hash = self.get_token()['user']['permissions_hash']
+        self.user.is_superuser = True
+        self.assertNotEqual(self.get_token()['user']['permissions_hash'], permissions_hash)
+
+    def test_tokens_without_claims_fall_back_to_the_database(self):
+        with self.settings(JWT_USER_CLAIMS=None):
+            token = self.get_token()
+        with self.assertNumQueries(1):
+            self.assertEquals(self.authentication.get_user(token), self.user)
+
+
+@override_settings(JWT_USER_CLAIMS=['is_active', 'username', 'first_name', 'phone_verified_at'])
+class ClaimsJWTAuthenticationSaveTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory(first_name='First')
+        self.token = get_user_tokens(self.user)['access_token']
+
+    def update_profile(self):
+        request = APIRequestFactory().put('/', {'first_name': 'Changed', 'last_name': 'Last'}, format='json',
+                                          HTTP_AUTHORIZATION='Bearer {}'.format(self.token))
+        return UpdateProfileAPIView.as_view(authentication_classes=[ClaimsJWTAuthentication])(request)
+
+    def test_a_profile_update_keeps_the_fields_changed_since_the_token(self):
+        verified_at = now()
+        type(self.user).objects.filter(pk=self.user.pk).update(phone_verified_at=verified_at)
+        self.assertEquals(self.update_profile().status_code, 201)
+        self.user.refresh_from_db()
+        self.assertEquals(self.user.phone_verified_at, verified_at)
+        self.assertEquals(self.user.first_name, 'Changed')
+
+    def test_a_profile_update_does_not_reactivate_the_user(self):
+        type(self.user).objects.filter(pk=self.user.pk).update(is_active=False)
+        self.update_profile()
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+
+    def test_the_claimed_fields_changed_on_the_user_are_saved(self):
+        authentication = ClaimsJWTAuthentication()
+        user = authentication.get_user(authentication.get_validated_token(self.token))
+        user.first_name = 'Saved'
+        user.save()
+        self.user.refresh_from_db()
+        self.assertEquals(self.user.first_name, 'Saved')
+
+
+@override_settings(JWT_TOKEN_VERSION_ACTIVE=True)
+class TokenVersionTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.authentication = TokenVersionJWTAuthentication()
+
+    def test_get_user_tokens_embeds_the_token_version(self):
+        revoke_user_tokens(self.user)
+        token = self.authentication.get_validated_token(get_user_tokens(self.user)['access_token'])
+        self.assertEquals(token['token_version'], get_token_version(self.user.pk))
+
+    def test_tokens_are_valid_until_revoked(self):
+        tokens = get_user_tokens(self.user)
+        self.assertEquals(self.authentication.get_validated_token(tokens['access_token'])['user_id'], self.user.pk)
+
+    def test_revoked_tokens_are_rejected(self):
+        tokens = get_user_tokens(self.user)
+        revoke_user_tokens(self.user)
+        with self.assertRaises(InvalidToken):
+            self.authentication.get_validated_token(tokens['access_token'])
+
+    def test_tokens_issued_after_revoking_are_valid(self):
+        revoke_user_tokens(self.user)
+        tokens = get_user_tokens(self.user)
+        self.authentication.get_validated_token(tokens['access_token'])
+
+    def test_revoked_refresh_tokens_can_not_be_refreshed(self):
+        tokens = get_user_tokens(self.user)
+        revoke_user_tokens(self.user)
+        with self.assertRaises(TokenError):
+            BlacklistRefreshToken(tokens['refresh_token'])
+
+    def test_the_version_is_read_from_the_cache(self):
+        get_token_version(self.user.pk)
+        with self.assertNumQueries(0):
+            get_token_version(self.user.pk)
+
+    def test_the_version_survives_the_cache(self):
+        version = get_token_version(self.user.pk)
+        revoke_user_tokens(self.user)
+        revoke_user_tokens(self.user)
+        cache.clear()
+        self.assertEquals(get_token_version(self.user.pk), version + 2)
+
+    def test_changing_the_password_revokes_the_tokens(self):
+        tokens = get_user_tokens(self.user)
+        self.user.set_password('new secret')
+        self.user.save()
+        with self.assertRaises(InvalidToken):
+            self.authentication.get_validated_token(tokens['access_token'])
+
+    def test_saving_without_changing_the_password_keeps_the_tokens(self):
+        tokens = get_user_tokens(self.user)
+        self.user.first_name = 'changed'
+        self.user.save()
+        self.authentication.get_validated_token(tokens['access_token'])
+
+    def test_change_password_api_returns_new_tokens(self):
+        tokens = get_user_tokens(self.user)
+        response = self.client.put(reverse('change_password_api'), {
+            'old_password': 'secret', 'new_password1': 'new-Secret-123', 'new_password2': 'new-Secret-123'
+        }, content_type='application/json', HTTP_AUTHORIZATION='Bearer {}'.format(tokens['access_token']))
+        self.assertEquals(response.status_code, 200)
+        self.authentication.get_validated_token(response.json()['access_token'])
+        with self.assertRaises(InvalidToken):
+            self.authentication.get_validated_token(tokens['access_token'])
+
+    @override_settings(JWT_TOKEN_VERSION_ACTIVE=False)
+    def test_revoked_tokens_are_accepted_when_inactive(self):
+        tokens = get_user_tokens(self.user)
+        revoke_user_tokens(self.user)
+        self.authentication.get_validated_token(tokens['access_token'])
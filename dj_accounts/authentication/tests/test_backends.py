@@ -1,6 +1,11 @@
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+
 from django.test import TestCase, override_settings, Client
 
 from .factories import UserFactory
+from ..backends import MultipleAuthenticationBackend, aauthenticate
 
 
 class MultipleAuthenticationBackendTestCase(TestCase):
@@ -34,3 +39,48 @@ class MultipleAuthenticationBackendTestCase(TestCase):
     def test_it_fails_if_user_does_not_exists(self):
         self.client.login(email="doesnotexist@mail.com", password="secret")
         self.assertNotIn("sessionid", self.client.cookies)
+
+    def test_logs_in_with_phone_and_password(self):
+        self.client.login(identifier=self.user.phone, password="secret")
+        self.assertIn("sessionid", self.client.cookies)
+
+    def test_it_looks_up_the_user_in_a_single_query(self):
+        with self.assertNumQueries(1):
+            MultipleAuthenticationBackend().authenticate(None, identifier=self.user.email, password="wrong")
+
+    @patch('dj_accounts.authentication.backends.run_dummy_password_hasher')
+    def test_it_runs_the_password_hasher_if_user_does_not_exists(self, run_dummy_password_hasher):
+        MultipleAuthenticationBackend().authenticate(None, identifier="doesnotexist@mail.com", password="secret")
+        run_dummy_password_hasher.assert_called_once_with("secret")
+
+
+@override_settings(PASSWORD_HASHER_WORKERS=2)
+class AsyncAuthenticateTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+
+    def test_it_returns_the_user_with_identifier_and_password(self):
+        user = async_to_sync(aauthenticate)(identifier=self.user.email, password="secret")
+        self.assertEquals(user, self.user)
+
+    def test_it_annotates_the_user_with_the_backend(self):
+        user = async_to_sync(aauthenticate)(identifier=self.user.email, password="secret")
+        self.assertEquals(user.backend, "dj_accounts.authentication.backends.MultipleAuthenticationBackend")
+
+    def test_it_returns_none_if_password_is_not_correct(self):
+        self.assertIsNone(async_to_sync(aauthenticate)(identifier=self.user.email, password="wrong"))
+
+    def test_it_returns_none_if_user_does_not_exists(self):
+        self.assertIsNone(async_to_sync(aauthenticate)(identifier="doesnotexist@mail.com", password="secret"))
+
+    def test_it_returns_none_if_user_is_not_active(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(async_to_sync(aauthenticate)(identifier=self.user.email, password="secret"))
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher',
+                                         'django.contrib.auth.hashers.PBKDF2PasswordHasher'])
+    def test_it_upgrades_outdated_hashes(self):
+        async_to_sync(aauthenticate)(identifier=self.user.email, password="secret")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("md5$"))
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+
+from .factories import UserFactory
+from ..blacklist import TokenBlacklist, RefreshToken, get_token_blacklist
+from ..serializers import LogoutSerializer
+
+
+class TokenBlacklistTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.blacklist = TokenBlacklist()
+
+    def test_it_loads_the_blacklisted_tokens_from_the_database(self):
+        token = BaseRefreshToken.for_user(self.user)
+        token.blacklist()
+        self.assertTrue(self.blacklist.is_blacklisted(token['jti']))
+
+    def test_it_does_not_query_the_database_between_syncs(self):
+        token = BaseRefreshToken.for_user(self.user)
+        self.blacklist.is_blacklisted(token['jti'])
+        with self.assertNumQueries(0):
+            self.assertFalse(self.blacklist.is_blacklisted(token['jti']))
+
+    def test_it_sees_tokens_blacklisted_by_other_processes_through_the_cache(self):
+        token = BaseRefreshToken.for_user(self.user)
+        self.blacklist.is_blacklisted(token['jti'])
+        TokenBlacklist().add(token['jti'], token['exp'])
+        with self.assertNumQueries(0):
+            self.assertTrue(self.blacklist.is_blacklisted(token['jti']))
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=0)
+    def test_it_syncs_the_tokens_blacklisted_since_the_last_sync(self):
+        token = BaseRefreshToken.for_user(self.user)
+        self.assertFalse(self.blacklist.is_blacklisted(token['jti']))
+        token.blacklist()
+        self.assertTrue(self.blacklist.is_blacklisted(token['jti']))
+
+    def test_it_drops_expired_tokens_on_sync(self):
+        self.blacklist.add('expired', 1)
+        self.blacklist.sync()
+        self.assertNotIn('expired', self.blacklist.jtis)
+
+
+class RefreshTokenTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_token_blacklist.cache_clear()
+        self.user = UserFactory()
+
+    def test_blacklisted_tokens_are_rejected(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        with self.assertRaises(TokenError):
+            RefreshToken(str(token))
+
+    def test_blacklisting_adds_the_token_to_the_cache(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        self.assertEquals(cache.get(TokenBlacklist.get_cache_key(token['jti'])), token['exp'])
+
+    def test_valid_tokens_are_checked_without_the_blacklist_table(self):
+        token = str(RefreshToken.for_user(self.user))
+        RefreshToken(token)
+        with self.assertNumQueries(0):
+            RefreshToken(token)
+
+
+class TokenRefreshAPIViewTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_token_blacklist.cache_clear()
+        self.user = UserFactory()
+
+    def test_it_refreshes_valid_tokens(self):
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(RefreshToken.for_user(self.user))})
+        self.assertEquals(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+    def test_it_rejects_blacklisted_tokens(self):
+        token = RefreshToken.for_user(self.user)
+        token.blacklist()
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(token)})
+        self.assertEquals(response.status_code, 401)
+
+    @override_settings(TOKEN_BLACKLIST_SYNC_INTERVAL=3600)
+    def test_logout_blacklists_the_token_for_refreshes(self):
+        refresh = RefreshToken.for_user(self.user)
+        self.client.post(reverse('token_refresh'), {'refresh': str(refresh)})
+        serializer = LogoutSerializer(data={'refresh': str(refresh)})
+        serializer.is_valid()
+        serializer.save()
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(refresh)})
+        self.assertEquals(response.status_code, 401)
@@ -0,0 +1,271 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.sites.models import Site
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.management import call_command, CommandError
+from django.test import TestCase, override_settings
+from django.utils.timezone import now
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .factories import UserFactory
+from ..mail import get_email_delivery
+from ..models import SiteProfile
+
+UserModel = get_user_model()
+
+
+class CalibratePasswordHasherCommandTestCase(TestCase):
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.PBKDF2PasswordHasher'])
+    def test_it_prints_the_target_cost_setting(self):
+        out = StringIO()
+        call_command('calibrate_password_hasher', target_ms=1, samples=1, stdout=out)
+        self.assertIn("PASSWORD_HASHER_TARGET_COST = ", out.getvalue())
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_it_fails_if_hasher_has_no_work_factor(self):
+        with self.assertRaises(CommandError):
+            call_command('calibrate_password_hasher', stdout=StringIO())
+
+
+@override_settings(EMAIL_DELIVERY='dj_accounts.authentication.mail.OutboxEmailDelivery')
+class SendOutboxEmailsCommandTestCase(TestCase):
+    def test_it_sends_the_outbox(self):
+        get_email_delivery().send_messages([EmailMessage("Subject", "Body", "from@mail.com", ["user@mail.com"])])
+        out = StringIO()
+        call_command('send_outbox_emails', stdout=out)
+        self.assertEquals(len(mail.outbox), 1)
+        self.assertIn("1 emails sent, 0 failed", out.getvalue())
+
+
+class ResendVerificationsCommandTestCase(TestCase):
+    def setUp(self):
+        self.users = [UserFactory(phone='3215616_{}'.format(i)) for i in range(5)]
+        self.verified = UserFactory(phone='3215616_5', email_verified_at=now())
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'checkpoint.json')
+
+    def test_it_sends_the_verification_to_unverified_users_only(self):
+        out = StringIO()
+        call_command('resend_verifications', batch_size=2, stdout=out)
+        self.assertEquals(sorted(message.to[0] for message in mail.outbox),
+                          sorted(user.email for user in self.users))
+        self.assertIn("5 emails sent", out.getvalue())
+
+    def test_it_resumes_after_the_checkpoint(self):
+        with open(self.checkpoint, 'w') as file:
+            json.dump({'last_pk': self.users[2].pk, 'sent': 3}, file)
+        call_command('resend_verifications', checkpoint=self.checkpoint, stdout=StringIO())
+        self.assertEquals([message.to[0] for message in mail.outbox], [user.email for user in self.users[3:]])
+
+    def test_it_removes_the_checkpoint_once_done(self):
+        call_command('resend_verifications', checkpoint=self.checkpoint, stdout=StringIO())
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_it_keeps_the_checkpoint_of_the_last_sent_batch_on_failure(self):
+        send_messages = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def fail_second_batch(connection, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise OSError("down")
+            return send_messages(connection, messages)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', fail_second_batch):
+            with self.assertRaises(OSError):
+                call_command('resend_verifications', batch_size=2, checkpoint=self.checkpoint, stdout=StringIO())
+        with open(self.checkpoint) as file:
+            self.assertEquals(json.load(file), {'last_pk': self.users[1].pk, 'sent': 2})
+
+    def test_it_paces_every_email_to_the_rate(self):
+        with patch('dj_accounts.authentication.management.commands.resend_verifications.time.sleep') as sleep:
+            call_command('resend_verifications', batch_size=5, rate=10, stdout=StringIO())
+        # the clock does not move while sleep is mocked, every email waits for its slot
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEquals(len(delays), 4)
+        for delay, expected in zip(delays, (0.1, 0.2, 0.3, 0.4)):
+            self.assertAlmostEqual(delay, expected, delta=0.05)
+
+
+class PruneTokensCommandTestCase(TestCase):
+    def setUp(self):
+        user = UserFactory()
+        for i in range(3):
+            RefreshToken.for_user(user).blacklist()
+        RefreshToken.for_user(user)
+        self.valid = RefreshToken.for_user(user)
+        self.valid.blacklist()
+        OutstandingToken.objects.exclude(jti=self.valid['jti']).update(expires_at=now() - timedelta(minutes=1))
+
+    def test_it_deletes_the_expired_tokens(self):
+        out = StringIO()
+        call_command('prune_tokens', chunk_size=2, sleep=0, stdout=out)
+        self.assertEquals(list(OutstandingToken.objects.values_list('jti', flat=True)), [self.valid['jti']])
+        self.assertEquals(BlacklistedToken.objects.count(), 1)
+        self.assertIn("4 tokens deleted, 3 of them blacklisted", out.getvalue())
+
+    def test_it_keeps_tokens_within_the_grace_period(self):
+        call_command('prune_tokens', grace=3600, stdout=StringIO())
+        self.assertEquals(OutstandingToken.objects.count(), 5)
+
+    def test_it_sleeps_between_full_chunks(self):
+        with patch('dj_accounts.authentication.management.commands.prune_tokens.time.sleep') as sleep:
+            call_command('prune_tokens', chunk_size=2, sleep=0.5, stdout=StringIO())
+        self.assertEquals(sleep.call_count, 2)
+
+
+def import_callback(users, site):
+    import_callback.calls.append(([user.username for user in users], site))
+    import_callback.pks.extend(user.pk for user in users)
+
+
+class ImportUsersCommandTestCase(TestCase):
+    def setUp(self):
+        self.existing = UserFactory(username='existing', email='existing@mail.com', phone='3215616_0')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.reject_file = os.path.join(self.directory, 'rejects.jsonl')
+
+    def call_import(self, path, **options):
+        # hashed in the test process, the command starts a process per core by default
+        options.setdefault('workers', 1)
+        call_command('import_users', path, **options)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as file:
+            file.write(content)
+        return path
+
+    def get_row(self, i, **kwargs):
+        row = {'username': 'user{}'.format(i), 'first_name': 'First', 'last_name': 'Last',
+               'email': 'user{}@mail.com'.format(i), 'phone': '3215616_{}'.format(i)}
+        row.update(kwargs)
+        return row
+
+    def write_jsonl(self, rows):
+        return self.write_file('users.jsonl', ''.join(json.dumps(row) + '\n' for row in rows))
+
+    def read_rejects(self):
+        with open(self.reject_file) as file:
+            return [json.loads(line) for line in file]
+
+    def test_it_imports_a_csv_file(self):
+        path = self.write_file('users.csv', "username,first_name,last_name,email,phone,password\n"
+                                            "user1,First,Last,user1@mail.com,3215616_1,secret\n"
+                                            "user2,First,Last,user2@mail.com,3215616_2,\n")
+        out = StringIO()
+        self.call_import(path, stdout=out)
+        self.assertTrue(UserModel.objects.get(username='user1').check_password('secret'))
+        self.assertFalse(UserModel.objects.get(username='user2').has_usable_password())
+        self.assertIn("2 users imported, 0 rejected", out.getvalue())
+
+    def test_it_hashes_the_passwords_in_worker_processes(self):
+        path = self.write_jsonl([self.get_row(i, password='secret{}'.format(i)) for i in range(1, 6)])
+        self.call_import(path, workers=2, chunk_size=3, stdout=StringIO())
+        for i in range(1, 6):
+            self.assertTrue(UserModel.objects.get(username='user{}'.format(i)).check_password('secret{}'.format(i)))
+
+    def test_it_keeps_the_password_hashes(self):
+        path = self.write_jsonl([self.get_row(1, password_hash=make_password('secret'))])
+        self.call_import(path, stdout=StringIO())
+        self.assertTrue(UserModel.objects.get(username='user1').check_password('secret'))
+
+    def test_it_rejects_invalid_password_hashes(self):
+        path = self.write_jsonl([self.get_row(1, password_hash='not-a-hash')])
+        self.call_import(path, reject_file=self.reject_file, stdout=StringIO())
+        self.assertFalse(UserModel.objects.filter(username='user1').exists())
+        self.assertIn('password_hash', self.read_rejects()[0]['errors'])
+
+    def test_it_rejects_taken_and_duplicated_unique_fields(self):
+        path = self.write_jsonl([
+            self.get_row(1),
+            self.get_row(2, email='existing@mail.com'),
+            self.get_row(3, phone='3215616_1'),
+            self.get_row(4, email='invalid'),
+            self.get_row(5),
+        ])
+        out = StringIO()
+        self.call_import(path, chunk_size=2, reject_file=self.reject_file, stdout=out)
+        self.assertEquals(sorted(UserModel.objects.values_list('username', flat=True)),
+                          ['existing', 'user1', 'user5'])
+        rejects = self.read_rejects()
+        self.assertEquals([reject['line'] for reject in rejects], [2, 3, 4])
+        self.assertEquals(list(rejects[0]['errors']), ['email'])
+        self.assertEquals(list(rejects[1]['errors']), ['phone'])
+        self.assertIn("2 users imported, 3 rejected", out.getvalue())
+
+    def test_it_leaves_the_passwords_out_of_the_reject_file(self):
+        path = self.write_jsonl([self.get_row(1, email='invalid', password='secret')])
+        self.call_import(path, reject_file=self.reject_file, stdout=StringIO())
+        self.assertNotIn('password', self.read_rejects()[0]['row'])
+
+    @override_settings(AUTH_PASSWORD_VALIDATORS=[
+        {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'}])
+    def test_it_validates_the_passwords_if_asked(self):
+        path = self.write_jsonl([self.get_row(1, password='short')])
+        self.call_import(path, validate_passwords=True, reject_file=self.reject_file, stdout=StringIO())
+        self.assertIn('password', self.read_rejects()[0]['errors'])
+
+    def test_it_imports_the_extra_fields(self):
+        path = self.write_jsonl([self.get_row(1, email_verified_at='2021-10-01')])
+        self.call_import(path, extra_fields='email_verified_at', stdout=StringIO())
+        self.assertEquals(str(UserModel.objects.get(username='user1').email_verified_at), '2021-10-01')
+
+    @override_settings(IMPORT_USERS_CALLBACK='dj_accounts.authentication.tests.test_commands.import_callback')
+    def test_it_creates_the_site_and_passes_it_to_the_callback(self):
+        import_callback.calls = []
+        import_callback.pks = []
+        path = self.write_jsonl([self.get_row(1), self.get_row(2), self.get_row(3)])
+        self.call_import(path, chunk_size=2, site='import.example.com', site_name='Import',
+                     stdout=StringIO())
+        site = Site.objects.get(domain='import.example.com')
+        self.assertTrue(SiteProfile.objects.filter(site=site).exists())
+        self.assertEquals(import_callback.calls, [(['user1', 'user2'], site), (['user3'], site)])
+        self.assertEquals(import_callback.pks, [UserModel.objects.get(username='user{}'.format(i)).pk
+                                                for i in range(1, 4)])
+
+
+class ExportUsersCommandTestCase(TestCase):
+    def setUp(self):
+        self.users = [UserFactory(phone='3215616_{}'.format(i)) for i in range(5)]
+
+    def test_it_exports_every_user_across_batches(self):
+        out = StringIO()
+        call_command('export_users', fields='id,username', batch_size=2, stdout=out)
+        self.assertEquals(out.getvalue().splitlines(),
+                          ['id,username'] + ['{},{}'.format(user.pk, user.username) for user in self.users])
+
+    def test_it_exports_jsonl_to_a_file(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, 'users.jsonl')
+        call_command('export_users', format='jsonl', output=output, stdout=StringIO())
+        with open(output) as file:
+            rows = [json.loads(line) for line in file]
+        self.assertEquals([row['email'] for row in rows], [user.email for user in self.users])
+        self.assertIn('phone_verified_at', rows[0])
+        self.assertNotIn('password', rows[0])
+
+    def test_it_queries_once_per_batch(self):
+        with self.assertNumQueries(3):
+            call_command('export_users', batch_size=2, stdout=StringIO())
+
+    def test_it_fails_for_unknown_fields(self):
+        with self.assertRaises(CommandError):
+            call_command('export_users', fields='id,unknown', stdout=StringIO())
+
+    def test_it_fails_for_social_accounts_without_the_social_app(self):
+        with self.assertRaises(CommandError):
+            call_command('export_users', fields='id,social_accounts', stdout=StringIO())
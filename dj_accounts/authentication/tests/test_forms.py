@@ -1,13 +1,18 @@
+from unittest.mock import patch
+
 from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
 from django.test import TestCase, RequestFactory
 from django.test import override_settings
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
 from .factories import UserFactory
+from .mocks import CountingVerifyService
 from ..forms import MultipleLoginForm, RegisterForm, VerifyPhoneForm
 from ..templatetags.auth import get_authentication_field_placeholder
 
@@ -133,6 +138,44 @@ class RegisterFormValidationTest(TestCase):
         self.assertFalse(form.is_valid())
         self.assertEquals(form.errors.as_data()["password2"][0].code, 'password_mismatch')
 
+    def test_username_is_unique(self):
+        check_unique(self, "username", "First User")
+
+    def get_valid_data(self):
+        return {**self.DEFAULT_DATA, 'username': 'test_user', 'toc': True}
+
+    def test_it_checks_every_unique_field_in_a_single_query(self):
+        form = RegisterForm(data=self.get_valid_data())
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+
+    def test_it_reports_every_taken_field(self):
+        data = {**self.get_valid_data(), 'email': 'first@aol.com', 'phone': '+201005263987'}
+        form = RegisterForm(data=data)
+        self.assertFalse(form.is_valid())
+        self.assertEquals(set(form.errors), {'email', 'phone'})
+
+    @override_settings(REGISTER_UNIQUE_PRECHECK=False)
+    def test_it_skips_the_unique_query_when_precheck_is_off(self):
+        form = RegisterForm(data={**self.get_valid_data(), 'email': 'first@aol.com'})
+        with self.assertNumQueries(0):
+            self.assertTrue(form.is_valid())
+
+    @override_settings(REGISTER_UNIQUE_PRECHECK=False)
+    def test_it_maps_integrity_errors_to_field_errors_when_precheck_is_off(self):
+        form = RegisterForm(data={**self.get_valid_data(), 'email': 'first@aol.com'})
+        self.assertTrue(form.is_valid())
+        with self.assertRaises(ValidationError):
+            form.save()
+        self.assertEquals(form.errors.as_data()['email'][0].code, 'unique')
+        self.assertFalse(UserModel.objects.filter(username='test_user').exists())
+
+    def test_save_creates_the_user(self):
+        form = RegisterForm(data=self.get_valid_data())
+        self.assertTrue(form.is_valid())
+        user = form.save()
+        self.assertTrue(user.check_password(self.get_valid_data()['password1']))
+
 
 class MultipleLoginFormStructureTestCase(TestCase):
     def setUp(self):
@@ -313,3 +356,65 @@ class VerifyPhoneFormValidationTestCase(TestCase):
     def test_it_passes_if_phone_verification_is_successful(self):
         form = VerifyPhoneForm(user=self.user, data=self.data)
         self.assertTrue(form.is_valid())
+
+
+@override_settings(PHONE_VERIFY_SERVICE="dj_accounts.authentication.tests.mocks.CountingVerifyService",
+                   PHONE_VERIFICATION_ATTEMPTS_ACTIVE=True, PHONE_VERIFICATION_MAX_ATTEMPTS=3)
+class VerifyPhoneFormAttemptsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        CountingVerifyService.checked = []
+        CountingVerifyService.invalidated = []
+        self.user = UserFactory(phone="201002536987")
+
+    def verify(self, code):
+        form = VerifyPhoneForm(user=self.user, data={"code": code})
+        form.is_valid()
+        return form
+
+    def test_it_invalidates_the_code_after_the_last_attempt(self):
+        self.verify("888888")
+        self.verify("888888")
+        form = self.verify("888888")
+        self.assertEquals('too_many_attempts', form.errors.as_data()['__all__'][0].code)
+        self.assertEquals(CountingVerifyService.invalidated, [self.user.phone])
+
+    def test_it_does_not_call_the_provider_once_attempts_are_exhausted(self):
+        for i in range(3):
+            self.verify("888888")
+        form = self.verify("777777")
+        self.assertFalse(form.is_valid())
+        self.assertEquals('too_many_attempts', form.errors.as_data()['__all__'][0].code)
+        self.assertEquals(len(CountingVerifyService.checked), 3)
+
+    def test_concurrent_guesses_do_not_get_more_provider_checks(self):
+        check = CountingVerifyService.check
+        forms = []
+
+        def check_while_other_guesses_arrive(service, phone, code):
+            # the other guesses are made while the first one waits on the provider
+            if len(CountingVerifyService.checked) == 0:
+                CountingVerifyService.checked.append(phone)
+                forms.extend(self.verify("888888") for i in range(5))
+                return False
+            return check(service, phone, code)
+
+        with patch.object(CountingVerifyService, 'check', check_while_other_guesses_arrive):
+            self.verify("888888")
+        self.assertEquals(len(CountingVerifyService.checked), 3)
+        self.assertEquals([form.errors.as_data()['__all__'][0].code for form in forms],
+                          ['invalid_code', 'too_many_attempts'] + ['too_many_attempts'] * 3)
+
+    def test_a_valid_code_resets_the_attempts(self):
+        self.verify("888888")
+        self.verify("888888")
+        self.assertTrue(self.verify("777777").is_valid())
+        form = self.verify("888888")
+        self.assertEquals('invalid_code', form.errors.as_data()['__all__'][0].code)
+
+    @override_settings(PHONE_VERIFICATION_ATTEMPTS_ACTIVE=False)
+    def test_attempts_are_not_limited_when_inactive(self):
+        for i in range(4):
+            form = self.verify("888888")
+        self.assertEquals('invalid_code', form.errors.as_data()['__all__'][0].code)
+        self.assertEquals(CountingVerifyService.invalidated, [])
@@ -0,0 +1,144 @@
+import multiprocessing
+
+from django.contrib.auth.hashers import identify_hasher, check_password
+from django.test import TestCase, override_settings
+
+from .factories import UserFactory
+from ..backends import MultipleAuthenticationBackend
+from ..hashers import get_dummy_password_hash, CalibratedPBKDF2PasswordHasher, check_user_password, \
+    get_password_hashing_pool, make_passwords
+
+CALIBRATED_HASHERS = ['dj_accounts.authentication.hashers.CalibratedPBKDF2PasswordHasher']
+
+
+class GetDummyPasswordHashTestCase(TestCase):
+    def test_it_is_computed_once(self):
+        self.assertEquals(get_dummy_password_hash(), get_dummy_password_hash())
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_it_uses_the_first_configured_hasher(self):
+        self.assertEquals(identify_hasher(get_dummy_password_hash()).algorithm, 'md5')
+
+    def test_it_is_recomputed_when_password_hashers_change(self):
+        with self.settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']):
+            md5_hash = get_dummy_password_hash()
+        self.assertNotEquals(get_dummy_password_hash(), md5_hash)
+
+
+class CalibratedPBKDF2PasswordHasherTestCase(TestCase):
+    def test_it_uses_django_default_iterations_if_target_cost_is_not_set(self):
+        self.assertEquals(CalibratedPBKDF2PasswordHasher().iterations, 260000)
+
+    @override_settings(PASSWORD_HASHER_TARGET_COST=1000)
+    def test_it_uses_target_cost_setting(self):
+        self.assertEquals(CalibratedPBKDF2PasswordHasher().iterations, 1000)
+
+    @override_settings(PASSWORD_HASHER_TARGET_COST=1000)
+    def test_it_encodes_with_target_cost(self):
+        encoded = CalibratedPBKDF2PasswordHasher().encode("secret", "salt")
+        self.assertTrue(encoded.startswith("pbkdf2_sha256$1000$"))
+
+
+@override_settings(PASSWORD_HASHERS=CALIBRATED_HASHERS, PASSWORD_HASHER_TARGET_COST=1000)
+class CheckUserPasswordTestCase(TestCase):
+    def setUp(self):
+        with self.settings(PASSWORD_HASHER_TARGET_COST=2000):
+            self.user = UserFactory()
+        self.old_hash = self.user.password
+
+    def test_it_upgrades_hash_synchronously_without_on_commit_if_upgrade_is_not_active(self):
+        # django's own check_password upgrades the hash right away
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(check_user_password(self.user, "secret"))
+        self.assertEquals(len(callbacks), 0)
+        self.user.refresh_from_db()
+        self.assertNotEquals(self.user.password, self.old_hash)
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_it_defers_the_hash_upgrade_until_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(check_user_password(self.user, "secret"))
+            self.assertEquals(type(self.user).objects.get(pk=self.user.pk).password, self.old_hash)
+        self.assertEquals(len(callbacks), 1)
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_it_upgrades_hash_to_target_cost(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            check_user_password(self.user, "secret")
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+        self.assertTrue(self.user.check_password("secret"))
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_in_memory_user_gets_the_upgraded_hash(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            check_user_password(self.user, "secret")
+        self.assertEquals(self.user.password, type(self.user).objects.get(pk=self.user.pk).password)
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_in_memory_user_keeps_the_stored_hash_until_the_upgrade_is_written(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            check_user_password(self.user, "secret")
+        stored = type(self.user).objects.get(pk=self.user.pk)
+        self.assertEquals(self.user.password, self.old_hash)
+        self.assertEquals(self.user.get_session_auth_hash(), stored.get_session_auth_hash())
+        callbacks[0]()
+        stored.refresh_from_db()
+        self.assertEquals(self.user.get_session_auth_hash(), stored.get_session_auth_hash())
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_in_memory_user_keeps_its_hash_if_the_upgrade_is_not_written(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            check_user_password(self.user, "secret")
+        type(self.user).objects.filter(pk=self.user.pk).update(password="changed")
+        callbacks[0]()
+        self.assertEquals(self.user.password, self.old_hash)
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_it_does_not_overwrite_a_password_changed_in_the_meantime(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            check_user_password(type(self.user).objects.get(pk=self.user.pk), "secret")
+        self.user.set_password("new secret")
+        self.user.save()
+        callbacks[0]()
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("new secret"))
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_it_does_not_upgrade_on_wrong_password(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertFalse(check_user_password(self.user, "wrong"))
+        self.assertEquals(len(callbacks), 0)
+
+    @override_settings(PASSWORD_HASH_UPGRADE_ACTIVE=True, PASSWORD_HASH_UPGRADE_ASYNC=False)
+    def test_backend_upgrades_hash_on_login(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            user = MultipleAuthenticationBackend().authenticate(None, identifier=self.user.email, password="secret")
+        self.assertEquals(user, self.user)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+
+class MakePasswordsTestCase(TestCase):
+    passwords = ['secret{}'.format(i) for i in range(6)]
+
+    def test_it_hashes_the_passwords_in_order(self):
+        hashes = make_passwords(self.passwords)
+        self.assertTrue(all(check_password(password, encoded) for password, encoded in zip(self.passwords, hashes)))
+
+    def test_it_hashes_the_passwords_in_order_in_the_pool(self):
+        with get_password_hashing_pool(2) as pool:
+            hashes = make_passwords(self.passwords, pool, chunksize=2)
+        self.assertTrue(all(check_password(password, encoded) for password, encoded in zip(self.passwords, hashes)))
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_it_uses_the_preferred_hasher_in_the_pool(self):
+        with get_password_hashing_pool(2) as pool:
+            hashes = make_passwords(self.passwords, pool)
+        self.assertEquals({identify_hasher(encoded).algorithm for encoded in hashes}, {'md5'})
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_it_uses_the_preferred_hasher_in_spawned_workers(self):
+        with get_password_hashing_pool(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            hashes = make_passwords(self.passwords, pool)
+        self.assertEquals({identify_hasher(encoded).algorithm for encoded in hashes}, {'md5'})
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.forms import SetPasswordForm
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from .factories import UserFactory
+from ..backends import MultipleAuthenticationBackend
+from ..lockout import AccountLockout, AccountLocked
+
+
+@override_settings(ACCOUNT_LOCKOUT_ACTIVE=True, ACCOUNT_LOCKOUT_THRESHOLD=3, ACCOUNT_LOCKOUT_DURATION=60,
+                   ACCOUNT_LOCKOUT_MAX_DURATION=200)
+class AccountLockoutTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.lockout = AccountLockout()
+
+    def fail(self, times):
+        return [self.lockout.add_failure(self.user) for _ in range(times)]
+
+    def test_it_locks_the_account_once_over_the_threshold(self):
+        self.assertEquals(self.fail(3), [0, 0, 60])
+        self.assertEquals(self.lockout.get_remaining(self.user), 60)
+
+    def test_it_doubles_the_duration_with_every_lockout_up_to_the_maximum(self):
+        self.assertEquals(self.fail(9)[2::3], [60, 120, 200])
+
+    def test_clearing_the_failures_keeps_the_lockout_level(self):
+        self.fail(3)
+        self.fail(2)
+        self.lockout.clear_failures(self.user)
+        self.assertEquals(self.fail(3), [0, 0, 120])
+
+    def test_unlock_releases_the_account(self):
+        self.fail(3)
+        self.lockout.unlock(self.user)
+        self.assertEquals(self.lockout.get_remaining(self.user), 0)
+        self.assertEquals(self.fail(3)[-1], 60)
+
+    def test_a_password_reset_releases_the_account(self):
+        self.fail(3)
+        form = SetPasswordForm(self.user, {'new_password1': 'new-Secret-123', 'new_password2': 'new-Secret-123'})
+        self.assertTrue(form.is_valid())
+        form.save()
+        self.assertEquals(self.lockout.get_remaining(self.user), 0)
+
+
+@override_settings(ACCOUNT_LOCKOUT_ACTIVE=True, ACCOUNT_LOCKOUT_THRESHOLD=2)
+class MultipleAuthenticationBackendLockoutTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.backend = MultipleAuthenticationBackend()
+
+    def authenticate(self, password):
+        return self.backend.authenticate(None, identifier=self.user.email, password=password)
+
+    def test_it_locks_the_account_after_failed_logins(self):
+        self.assertIsNone(self.authenticate('wrong'))
+        self.assertIsNone(self.authenticate('wrong'))
+        with self.assertRaises(AccountLocked):
+            self.authenticate('secret')
+
+    def test_it_checks_the_lock_before_the_password(self):
+        AccountLockout().add_failure(self.user)
+        AccountLockout().add_failure(self.user)
+        with patch('dj_accounts.authentication.backends.check_user_password') as check_user_password, \
+                self.assertRaises(AccountLocked):
+            self.authenticate('secret')
+        check_user_password.assert_not_called()
+
+    def test_a_successful_login_clears_the_failures(self):
+        self.authenticate('wrong')
+        self.assertEquals(self.authenticate('secret'), self.user)
+        self.assertIsNone(self.authenticate('wrong'))
+        self.assertEquals(self.authenticate('secret'), self.user)
+
+    def test_it_locks_the_account_in_aauthenticate(self):
+        AccountLockout().add_failure(self.user)
+        AccountLockout().add_failure(self.user)
+        with self.assertRaises(AccountLocked):
+            async_to_sync(self.backend.aauthenticate)(None, identifier=self.user.email, password='secret')
+
+    @override_settings(ACCOUNT_LOCKOUT_ACTIVE=False)
+    def test_it_does_not_lock_when_inactive(self):
+        for _ in range(3):
+            self.authenticate('wrong')
+        self.assertEquals(self.authenticate('secret'), self.user)
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.test import TestCase, override_settings, RequestFactory
+from django.utils.timezone import now
+
+from .factories import UserFactory
+from ..forms import PasswordResetForm
+from ..mail import get_email_delivery, SyncEmailDelivery, OutboxEmailDelivery, send_outbox_emails, \
+    send_bulk_email_verifications
+from ..mixins import SendEmailVerificationMixin
+from ..models import OutboxEmail
+
+OUTBOX_DELIVERY = 'dj_accounts.authentication.mail.OutboxEmailDelivery'
+
+
+def make_message(to="user@mail.com"):
+    message = EmailMultiAlternatives("Subject", "Body", "from@mail.com", [to])
+    message.attach_alternative("<p>Body</p>", "text/html")
+    return message
+
+
+class GetEmailDeliveryTestCase(TestCase):
+    def test_it_sends_right_away_by_default(self):
+        self.assertIsInstance(get_email_delivery(), SyncEmailDelivery)
+
+    @override_settings(EMAIL_DELIVERY=OUTBOX_DELIVERY)
+    def test_it_returns_the_delivery_set_in_settings(self):
+        self.assertIsInstance(get_email_delivery(), OutboxEmailDelivery)
+
+
+@override_settings(EMAIL_DELIVERY=OUTBOX_DELIVERY)
+class OutboxEmailDeliveryTestCase(TestCase):
+    def test_it_stores_messages_instead_of_sending_them(self):
+        get_email_delivery().send_messages([make_message()])
+        self.assertEquals(len(mail.outbox), 0)
+        self.assertEquals(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_PENDING).count(), 1)
+
+    def test_stored_messages_keep_their_alternatives(self):
+        get_email_delivery().send_messages([make_message()])
+        message = OutboxEmail.objects.get().to_message()
+        self.assertEquals(message.to, ["user@mail.com"])
+        self.assertEquals(message.alternatives, [("<p>Body</p>", "text/html")])
+
+    def test_email_verification_is_stored_in_the_outbox(self):
+        SendEmailVerificationMixin().send_email_verification(RequestFactory().get('/'), UserFactory())
+        self.assertEquals(len(mail.outbox), 0)
+        self.assertEquals(OutboxEmail.objects.count(), 1)
+
+    def test_it_stores_messages_without_a_subject(self):
+        message = make_message()
+        message.subject = None
+        get_email_delivery().send_messages([message])
+        self.assertEquals(OutboxEmail.objects.get().subject, '')
+
+    @override_settings(EMAIL_CONFIRMATION_SUBJECT=None)
+    def test_email_verification_without_a_subject_is_stored_in_the_outbox(self):
+        SendEmailVerificationMixin().send_email_verification(RequestFactory().get('/'), UserFactory())
+        self.assertEquals(OutboxEmail.objects.count(), 1)
+
+
+@override_settings(EMAIL_DELIVERY=OUTBOX_DELIVERY)
+class SendOutboxEmailsTestCase(TestCase):
+    def setUp(self):
+        get_email_delivery().send_messages([make_message("first@mail.com"), make_message("second@mail.com")])
+
+    def test_it_sends_pending_emails(self):
+        self.assertEquals(send_outbox_emails(), (2, 0))
+        self.assertEquals([message.to for message in mail.outbox], [["first@mail.com"], ["second@mail.com"]])
+
+    def test_it_marks_sent_emails(self):
+        send_outbox_emails()
+        self.assertEquals(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_SENT, sent_at__isnull=False).count(), 2)
+
+    def test_it_does_not_send_emails_twice(self):
+        send_outbox_emails()
+        self.assertEquals(send_outbox_emails(), (0, 0))
+        self.assertEquals(len(mail.outbox), 2)
+
+    def test_it_sends_in_batches(self):
+        self.assertEquals(send_outbox_emails(batch_size=1), (1, 0))
+        self.assertEquals(send_outbox_emails(batch_size=1), (1, 0))
+
+    def test_it_opens_a_single_connection_per_batch(self):
+        with patch('dj_accounts.authentication.mail.get_connection', wraps=mail.get_connection) as get_connection:
+            send_outbox_emails()
+        self.assertEquals(get_connection.call_count, 1)
+
+    def test_it_retries_failed_emails_later(self):
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError("down")):
+            self.assertEquals(send_outbox_emails(), (0, 2))
+        email = OutboxEmail.objects.first()
+        self.assertEquals(email.status, OutboxEmail.STATUS_PENDING)
+        self.assertEquals(email.attempts, 1)
+        self.assertIn("down", email.last_error)
+        self.assertGreater(email.send_after, now())
+
+    def test_it_marks_emails_as_failed_after_max_attempts(self):
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError("down")):
+            send_outbox_emails(max_attempts=1)
+        self.assertEquals(OutboxEmail.objects.filter(status=OutboxEmail.STATUS_FAILED).count(), 2)
+
+    def test_it_skips_emails_that_are_not_due(self):
+        OutboxEmail.objects.update(send_after=now() + timedelta(minutes=1))
+        self.assertEquals(send_outbox_emails(), (0, 0))
+
+
+class SendBulkEmailVerificationsTestCase(TestCase):
+    def setUp(self):
+        self.users = [UserFactory(phone='3215616_{}'.format(i)) for i in range(5)]
+        self.queryset = type(self.users[0]).objects.order_by('pk')
+
+    def test_it_sends_an_email_to_every_user(self):
+        self.assertEquals(send_bulk_email_verifications(self.queryset), 5)
+        self.assertEquals(sorted(message.to[0] for message in mail.outbox),
+                          sorted(user.email for user in self.users))
+
+    def test_it_renders_the_email_confirmation_per_user(self):
+        send_bulk_email_verifications(self.queryset)
+        self.assertIn(self.users[0].get_username(), mail.outbox[0].body)
+        self.assertEquals(mail.outbox[0].alternatives[0][1], 'text/html')
+
+    def test_it_uses_a_single_connection(self):
+        with patch('dj_accounts.authentication.mail.get_connection', wraps=mail.get_connection) as get_connection:
+            send_bulk_email_verifications(self.queryset, chunk_size=2)
+        self.assertEquals(get_connection.call_count, 1)
+
+    def test_it_sends_in_chunks(self):
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   side_effect=lambda messages: len(messages)) as send_messages:
+            self.assertEquals(send_bulk_email_verifications(self.queryset, chunk_size=2), 5)
+        self.assertEquals([len(call.args[0]) for call in send_messages.call_args_list], [2, 2, 1])
+
+
+class PasswordResetFormTestCase(TestCase):
+    def test_it_sends_the_reset_emails_in_a_single_delivery_call(self):
+        UserFactory(email='user@mail.com', phone='3215616_1')
+        UserFactory(email='USER@mail.com', username='other', phone='3215616_2')
+        form = PasswordResetForm(data={'email': 'user@mail.com'})
+        self.assertTrue(form.is_valid())
+        with patch.object(SyncEmailDelivery, 'send_messages') as send_messages:
+            form.save(domain_override='example.com', email_template_name='dj_accountxs/password_reset_email.html',
+                      subject_template_name='dj_accountxs/password_reset_subject.txt')
+        self.assertEquals(send_messages.call_count, 1)
+        self.assertEquals(len(send_messages.call_args.args[0]), 2)
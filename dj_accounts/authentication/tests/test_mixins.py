@@ -95,6 +95,12 @@ class SendEmailVerificationMixinTestCase(TestCase):
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(mail.outbox[0].subject, getattr(settings, 'EMAIL_CONFIRMATION_SUBJECT', None))
 
+    def test_it_logs_the_email_verification_failures(self):
+        with patch('dj_accounts.authentication.mixins.get_email_delivery', side_effect=OSError("smtp down")), \
+                self.assertLogs('dj_accounts.authentication.mixins', 'ERROR') as logs:
+            SendEmailVerificationMixin().send_email_verification(RequestFactory().get('/'), UserFactory())
+        self.assertIn("smtp down", logs.output[0])
+
 
 class ViewCallbackMixinTestCase(TestCase):
     def test_it_has_get_callback_method(self):
@@ -0,0 +1,103 @@
+import re
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from . import mocks
+from ..models import PhoneVerificationCode
+from ..otp import LocalVerifyPhoneService
+from ..verify_phone import get_phone_verify_service
+
+PHONE = '201002536987'
+
+
+@override_settings(PHONE_VERIFICATION_SMS_SENDER='dj_accounts.authentication.tests.mocks.sms_sender')
+class LocalVerifyPhoneServiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        mocks.sent_sms.clear()
+        self.service = LocalVerifyPhoneService()
+        self.service.open()
+
+    def send_code(self):
+        self.service.send(PHONE)
+        phone, message = mocks.sent_sms[-1]
+        return re.search(r'\d{6}', message).group()
+
+    @override_settings(PHONE_VERIFICATION_SMS_SENDER=None)
+    def test_it_requires_a_sender(self):
+        with self.assertRaises(ImproperlyConfigured):
+            LocalVerifyPhoneService().open()
+
+    def test_it_sends_the_code_through_the_sender(self):
+        self.service.send(PHONE)
+        self.assertEquals(mocks.sent_sms[0][0], PHONE)
+        self.assertRegex(mocks.sent_sms[0][1], r'\d{6}')
+
+    @override_settings(PHONE_VERIFICATION_CODE_DIGITS=4, PHONE_VERIFICATION_CODE_MESSAGE="code: {code}")
+    def test_it_uses_the_code_settings(self):
+        self.service.send(PHONE)
+        self.assertRegex(mocks.sent_sms[0][1], r'^code: \d{4}$')
+
+    def test_it_stores_the_code_hashed(self):
+        code = self.send_code()
+        code_key, attempts_key = self.service.get_cache_keys(PHONE)
+        self.assertNotIn(code, cache.get(code_key))
+
+    def test_it_accepts_the_sent_code(self):
+        self.assertTrue(self.service.check(PHONE, self.send_code()))
+
+    def test_it_rejects_a_wrong_code(self):
+        code = self.send_code()
+        self.assertFalse(self.service.check(PHONE, str((int(code) + 1) % 10 ** 6).zfill(6)))
+
+    def test_it_rejects_the_code_of_another_phone(self):
+        self.assertFalse(self.service.check('201002536988', self.send_code()))
+
+    def test_a_code_is_used_once(self):
+        code = self.send_code()
+        self.service.check(PHONE, code)
+        self.assertFalse(self.service.check(PHONE, code))
+
+    def test_a_new_code_replaces_the_old_one(self):
+        code = self.send_code()
+        new_code = self.send_code()
+        if code != new_code:
+            self.assertFalse(self.service.check(PHONE, code))
+        self.assertTrue(self.service.check(PHONE, new_code))
+
+    @override_settings(PHONE_VERIFICATION_CODE_MAX_ATTEMPTS=2)
+    def test_it_invalidates_the_code_after_max_attempts(self):
+        code = self.send_code()
+        self.service.check(PHONE, 'wrong')
+        self.service.check(PHONE, 'wrong')
+        self.assertFalse(self.service.check(PHONE, code))
+
+    @override_settings(PHONE_VERIFICATION_CODE_TTL=0)
+    def test_it_rejects_expired_codes(self):
+        self.assertFalse(self.service.check(PHONE, self.send_code()))
+
+    def test_it_does_not_touch_the_database_by_default(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(self.service.check(PHONE, self.send_code()))
+
+    @override_settings(PHONE_VERIFICATION_CODE_DB_FALLBACK=True)
+    def test_it_falls_back_to_the_database_when_the_cache_lost_the_code(self):
+        code = self.send_code()
+        cache.clear()
+        self.assertTrue(self.service.check(PHONE, code))
+        self.assertFalse(PhoneVerificationCode.objects.exists())
+
+    @override_settings(PHONE_VERIFICATION_CODE_DB_FALLBACK=True, PHONE_VERIFICATION_CODE_MAX_ATTEMPTS=2)
+    def test_the_database_fallback_counts_attempts(self):
+        code = self.send_code()
+        cache.clear()
+        self.service.check(PHONE, 'wrong')
+        self.assertEquals(PhoneVerificationCode.objects.get().attempts, 1)
+        self.service.check(PHONE, 'wrong')
+        self.assertFalse(self.service.check(PHONE, code))
+
+    @override_settings(PHONE_VERIFY_SERVICE='dj_accounts.authentication.otp.LocalVerifyPhoneService')
+    def test_it_can_be_used_as_the_phone_verify_service(self):
+        self.assertIsInstance(get_phone_verify_service(), LocalVerifyPhoneService)
@@ -0,0 +1,86 @@
+from django.test import TestCase, override_settings
+
+from .factories import UserFactory
+from .models import User, NoAuthenticationFieldsUser
+from ..resolvers import IdentifierClassifier, ShapeIdentifierClassifier, IdentifierResolver, \
+    get_identifier_classifier_class
+
+
+class IdentifierClassifierTestCase(TestCase):
+    def setUp(self):
+        self.classifier = IdentifierClassifier(User)
+
+    def test_it_drops_id_for_non_numeric_identifiers(self):
+        self.assertNotIn('id', self.classifier.classify('john'))
+
+    def test_it_keeps_id_for_numeric_identifiers(self):
+        self.assertIn('id', self.classifier.classify('15'))
+
+    def test_it_drops_email_for_identifiers_that_are_not_emails(self):
+        self.assertNotIn('email', self.classifier.classify('john'))
+
+    def test_it_drops_fields_whose_validators_reject_the_identifier(self):
+        self.assertEquals(self.classifier.classify('john doe'), ['phone'])
+
+    def test_it_returns_no_fields_if_model_has_no_authentication_fields(self):
+        self.assertEquals(IdentifierClassifier(NoAuthenticationFieldsUser).classify('john'), [])
+
+
+class ShapeIdentifierClassifierTestCase(TestCase):
+    def setUp(self):
+        self.classifier = ShapeIdentifierClassifier(User)
+
+    def test_email_shaped_identifiers_only_match_email(self):
+        self.assertEquals(self.classifier.classify('john@mail.com'), ['email'])
+
+    def test_e164_phones_only_match_phone(self):
+        self.assertEquals(self.classifier.classify('+201002536987'), ['phone'])
+
+    def test_usernames_only_match_username(self):
+        self.assertEquals(self.classifier.classify('john.doe'), ['username'])
+
+    def test_numeric_identifiers_are_ambiguous(self):
+        self.assertEquals(self.classifier.classify('201002536987'), ['phone', 'id'])
+
+
+class GetIdentifierClassifierClassTestCase(TestCase):
+    def test_it_returns_the_default_classifier(self):
+        self.assertEquals(get_identifier_classifier_class(User), IdentifierClassifier)
+
+    @override_settings(AUTHENTICATION_IDENTIFIER_CLASSIFIER='dj_accounts.authentication.resolvers.ShapeIdentifierClassifier')
+    def test_it_returns_the_classifier_from_settings(self):
+        self.assertEquals(get_identifier_classifier_class(User), ShapeIdentifierClassifier)
+
+
+class IdentifierResolverTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory(username="john", email="john@mail.com", phone="201002536987")
+        self.resolver = IdentifierResolver(User)
+
+    def test_it_resolves_user_by_email(self):
+        self.assertEquals(self.resolver.resolve(self.user.email), self.user)
+
+    def test_it_resolves_user_by_username(self):
+        self.assertEquals(self.resolver.resolve(self.user.username), self.user)
+
+    def test_it_resolves_user_by_phone(self):
+        self.assertEquals(self.resolver.resolve(self.user.phone), self.user)
+
+    def test_it_resolves_user_by_id(self):
+        self.assertEquals(self.resolver.resolve(str(self.user.id)), self.user)
+
+    def test_it_returns_none_if_user_does_not_exist(self):
+        self.assertIsNone(self.resolver.resolve("doesnotexist@mail.com"))
+
+    def test_it_resolves_user_in_a_single_query(self):
+        with self.assertNumQueries(1):
+            self.resolver.resolve(self.user.email)
+
+    def test_it_does_not_query_if_no_field_can_match(self):
+        resolver = IdentifierResolver(NoAuthenticationFieldsUser)
+        with self.assertNumQueries(0):
+            self.assertIsNone(resolver.resolve(self.user.email))
+
+    def test_it_returns_the_lowest_pk_if_identifier_matches_several_users(self):
+        other = UserFactory(username=self.user.phone, phone="201063598876")
+        self.assertEquals(self.resolver.resolve(self.user.phone), min(self.user, other, key=lambda u: u.pk))
@@ -0,0 +1,124 @@
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from .mocks import FlakyVerifyService, TestingVerifyService
+from .factories import UserFactory
+from ..mixins import SendPhoneVerificationMixin
+from ..sms import get_phone_verification_delivery, SyncPhoneVerificationDelivery, QueuePhoneVerificationDelivery
+
+FLAKY_SERVICE = 'dj_accounts.authentication.tests.mocks.FlakyVerifyService'
+QUEUE_DELIVERY = 'dj_accounts.authentication.sms.QueuePhoneVerificationDelivery'
+
+
+class GetPhoneVerificationDeliveryTestCase(TestCase):
+    def test_it_sends_right_away_by_default(self):
+        self.assertIsInstance(get_phone_verification_delivery(), SyncPhoneVerificationDelivery)
+
+    @override_settings(PHONE_VERIFICATION_DELIVERY=QUEUE_DELIVERY, PHONE_VERIFICATION_QUEUE_WORKERS=0)
+    def test_it_returns_the_delivery_set_in_settings(self):
+        self.assertIsInstance(get_phone_verification_delivery(), QueuePhoneVerificationDelivery)
+
+    @override_settings(PHONE_VERIFICATION_DELIVERY=QUEUE_DELIVERY, PHONE_VERIFICATION_QUEUE_WORKERS=0)
+    def test_it_rebuilds_the_delivery_when_its_settings_change(self):
+        delivery = get_phone_verification_delivery()
+        with self.settings(PHONE_VERIFICATION_QUEUE_BATCH_SIZE=1):
+            self.assertIsNot(get_phone_verification_delivery(), delivery)
+            self.assertEquals(get_phone_verification_delivery().batch_size, 1)
+
+    @override_settings(PHONE_VERIFICATION_DELIVERY=QUEUE_DELIVERY, PHONE_VERIFICATION_QUEUE_WORKERS=0)
+    def test_send_phone_verification_mixin_uses_the_delivery(self):
+        user = UserFactory()
+        SendPhoneVerificationMixin().send_phone_verification(user)
+        self.assertEquals(get_phone_verification_delivery().queue.get_nowait(), (user.phone, 0))
+
+
+class SendManyTestCase(TestCase):
+    def test_it_sends_to_every_phone(self):
+        with patch.object(TestingVerifyService, 'send') as send:
+            self.assertEquals(TestingVerifyService().send_many(['1', '2']), {})
+        self.assertEquals([call.args[0] for call in send.call_args_list], ['1', '2'])
+
+    def test_it_returns_the_errors_by_phone(self):
+        with patch.object(TestingVerifyService, 'send', side_effect=[None, OSError("down")]):
+            errors = TestingVerifyService().send_many(['1', '2'])
+        self.assertEquals(list(errors), ['2'])
+
+
+@override_settings(PHONE_VERIFY_SERVICE=FLAKY_SERVICE, PHONE_VERIFICATION_QUEUE_WORKERS=0,
+                   PHONE_VERIFICATION_QUEUE_RETRY_DELAY=0)
+class QueuePhoneVerificationDeliveryTestCase(TestCase):
+    def setUp(self):
+        FlakyVerifyService.failures = 0
+        FlakyVerifyService.sent = []
+        FlakyVerifyService.attempts = {}
+        self.delivery = QueuePhoneVerificationDelivery()
+
+    def drain(self):
+        while not self.delivery.queue.empty():
+            self.delivery.dispatch(self.delivery.get_batch())
+
+    def test_it_does_not_send_in_the_request(self):
+        self.delivery.send('201002536987')
+        self.assertEquals(FlakyVerifyService.sent, [])
+
+    def test_it_sends_queued_phones_in_one_batch(self):
+        self.delivery.send('1')
+        self.delivery.send('2')
+        with patch.object(FlakyVerifyService, 'send_many', return_value={}) as send_many:
+            self.drain()
+        send_many.assert_called_once_with(['1', '2'])
+
+    @override_settings(PHONE_VERIFICATION_QUEUE_BATCH_SIZE=1)
+    def test_it_limits_the_batch_size(self):
+        delivery = QueuePhoneVerificationDelivery()
+        delivery.send('1')
+        delivery.send('2')
+        self.assertEquals(delivery.get_batch(), [('1', 0)])
+
+    def test_it_retries_failed_sends(self):
+        FlakyVerifyService.failures = 1
+        self.delivery.send('1')
+        self.drain()
+        self.assertEquals(FlakyVerifyService.sent, ['1'])
+        self.assertEquals(FlakyVerifyService.attempts['1'], 2)
+
+    def test_it_retries_only_the_failed_phones_of_a_batch(self):
+        FlakyVerifyService.attempts = {'1': 1}
+        FlakyVerifyService.failures = 1
+        self.delivery.send('1')
+        self.delivery.send('2')
+        self.drain()
+        self.assertEquals(FlakyVerifyService.attempts, {'1': 2, '2': 2})
+
+    def test_it_retries_the_batch_if_bulk_send_fails(self):
+        self.delivery.send('1')
+        with patch.object(FlakyVerifyService, 'send_many', side_effect=[OSError("down"), {}]) as send_many:
+            self.drain()
+        self.assertEquals(send_many.call_count, 2)
+
+    @override_settings(PHONE_VERIFICATION_QUEUE_MAX_ATTEMPTS=2)
+    def test_it_records_a_failure_after_max_attempts(self):
+        FlakyVerifyService.failures = 5
+        delivery = QueuePhoneVerificationDelivery()
+        delivery.send('1')
+        with self.assertLogs('dj_accounts.authentication.sms', 'ERROR'):
+            while not delivery.queue.empty():
+                delivery.dispatch(delivery.get_batch())
+        failure = delivery.failures[0]
+        self.assertEquals((failure.phone, failure.attempts), ('1', 2))
+        self.assertIn("gateway down", failure.error)
+
+    def test_it_closes_the_old_database_connections_of_the_worker(self):
+        self.delivery.send('1')
+        with patch('dj_accounts.authentication.sms.close_old_connections') as close_old_connections:
+            self.drain()
+        close_old_connections.assert_called_once_with()
+
+    @override_settings(PHONE_VERIFICATION_QUEUE_WORKERS=1)
+    def test_workers_send_in_the_background(self):
+        sent = threading.Event()
+        with patch.object(FlakyVerifyService, 'send_many', side_effect=lambda phones: sent.set() or {}):
+            QueuePhoneVerificationDelivery().send('1')
+            self.assertTrue(sent.wait(5))
@@ -0,0 +1,132 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings, RequestFactory
+
+from .factories import UserFactory
+from ..throttling import SlidingWindowCounter, LoginThrottle, VerificationResendThrottle, get_client_ip
+
+
+class SlidingWindowCounterTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.counter = SlidingWindowCounter('tests:counter', 'LOGIN_THROTTLE_CACHE')
+
+    def hit_at(self, timestamp, times=1):
+        with patch('dj_accounts.authentication.throttling.time.time', return_value=timestamp):
+            for _ in range(times):
+                self.counter.hit('key', 60)
+
+    def count_at(self, timestamp):
+        with patch('dj_accounts.authentication.throttling.time.time', return_value=timestamp):
+            return self.counter.count('key', 60)
+
+    def test_it_counts_the_hits_of_the_current_window(self):
+        self.hit_at(6000, times=3)
+        self.assertEquals(self.count_at(6030), 3)
+
+    def test_it_weights_the_previous_window_by_its_overlap(self):
+        self.hit_at(6000, times=4)
+        self.assertEquals(self.count_at(6075), 3)
+
+    def test_it_forgets_the_hits_older_than_two_windows(self):
+        self.hit_at(6000, times=4)
+        self.assertEquals(self.count_at(6120), 0)
+
+    def test_retry_after_is_zero_under_the_limit(self):
+        self.hit_at(6000, times=2)
+        with patch('dj_accounts.authentication.throttling.time.time', return_value=6010):
+            self.assertEquals(self.counter.retry_after('key', 3, 60), 0)
+
+    def test_retry_after_waits_until_the_count_is_under_the_limit(self):
+        self.hit_at(6000, times=4)
+        with patch('dj_accounts.authentication.throttling.time.time', return_value=6030):
+            retry_after = self.counter.retry_after('key', 4, 60)
+        self.assertEquals(retry_after, 30)
+        self.assertLess(self.count_at(6030 + retry_after + 1), 4)
+
+    @override_settings(LOGIN_THROTTLE_CACHE=None)
+    def test_it_counts_in_memory_without_a_cache(self):
+        self.hit_at(6000, times=2)
+        self.assertEquals(self.count_at(6010), 2)
+        self.assertEquals(cache.get('tests:counter:key:100'), None)
+
+    def test_it_falls_back_to_memory_when_the_cache_fails(self):
+        with patch.object(cache, 'add', side_effect=ConnectionError), \
+                patch.object(cache, 'get_many', side_effect=ConnectionError), \
+                self.assertLogs('dj_accounts.authentication.throttling', 'WARNING'):
+            self.hit_at(6000, times=2)
+            self.assertEquals(self.count_at(6010), 2)
+        self.assertEquals(self.counter.fallbacks, 3)
+
+
+@override_settings(LOGIN_THROTTLE_IDENTIFIER_LIMIT=2, LOGIN_THROTTLE_IP_LIMIT=3)
+class LoginThrottleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.throttle = LoginThrottle()
+
+    def test_it_throttles_the_identifier_over_the_limit(self):
+        self.throttle.add_failure('user@mail.com', '10.0.0.1')
+        self.assertEquals(self.throttle.check('user@mail.com', '10.0.0.1'), 0)
+        self.throttle.add_failure('User@Mail.com ', '10.0.0.2')
+        self.assertGreater(self.throttle.check('user@mail.com', '10.0.0.3'), 0)
+        self.assertEquals(self.throttle.check('other@mail.com', '10.0.0.3'), 0)
+
+    def test_it_throttles_the_ip_over_the_limit(self):
+        for identifier in ('a@mail.com', 'b@mail.com', 'c@mail.com'):
+            self.throttle.add_failure(identifier, '10.0.0.1')
+        self.assertGreater(self.throttle.check('d@mail.com', '10.0.0.1'), 0)
+        self.assertEquals(self.throttle.check('d@mail.com', '10.0.0.2'), 0)
+
+    def test_it_counts_the_attempts(self):
+        self.throttle.add_failure('user@mail.com', '10.0.0.1')
+        self.throttle.add_failure('user@mail.com', '10.0.0.1')
+        self.throttle.check('user@mail.com', '10.0.0.1')
+        self.throttle.check('other@mail.com', '10.0.0.1')
+        self.assertEquals(self.throttle.get_stats(), {
+            'failures': 2, 'throttled_identifier': 1, 'allowed': 1, 'cache_fallbacks': 0})
+
+
+class GetClientIpTestCase(TestCase):
+    def test_it_returns_the_remote_addr(self):
+        self.assertEquals(get_client_ip(RequestFactory().get('/', REMOTE_ADDR='10.0.0.1')), '10.0.0.1')
+
+    @override_settings(LOGIN_THROTTLE_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_it_returns_the_first_ip_of_the_configured_header(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='10.0.0.1, 10.0.0.2')
+        self.assertEquals(get_client_ip(request), '10.0.0.1')
+
+
+@override_settings(VERIFICATION_RESEND_COOLDOWN=60, VERIFICATION_RESEND_DAILY_LIMIT=2)
+class VerificationResendThrottleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserFactory()
+        self.throttle = VerificationResendThrottle()
+
+    def take_at(self, timestamp, kind='email'):
+        with patch('dj_accounts.authentication.throttling.time.time', return_value=timestamp):
+            return self.throttle.take(self.user, kind)
+
+    def test_it_enforces_the_cooldown(self):
+        self.assertEquals(self.take_at(86400 * 10), 0)
+        self.assertEquals(self.take_at(86400 * 10 + 20), 40)
+
+    @override_settings(VERIFICATION_RESEND_COOLDOWN=0)
+    def test_it_enforces_the_daily_limit_until_the_next_day(self):
+        day = 86400 * 10
+        self.assertEquals([self.take_at(day), self.take_at(day + 100)], [0, 0])
+        self.assertEquals(self.take_at(day + 200), 86400 - 200)
+        self.assertEquals(self.take_at(day + 86400), 0)
+
+    @override_settings(VERIFICATION_RESEND_COOLDOWN=60, VERIFICATION_RESEND_DAILY_LIMIT=1)
+    def test_a_request_over_the_daily_limit_waits_until_the_next_day(self):
+        day = 86400 * 10
+        self.assertEquals(self.take_at(day), 0)
+        self.assertEquals(self.take_at(day + 100), 86400 - 100)
+        self.assertEquals(self.take_at(day + 110), 86400 - 110)
+
+    def test_the_kinds_have_their_own_quota(self):
+        self.assertEquals(self.take_at(86400 * 10), 0)
+        self.assertEquals(self.take_at(86400 * 10, 'phone'), 0)
@@ -0,0 +1,45 @@
+from unittest.mock import patch
+
+from django.contrib.auth.forms import AuthenticationForm
+from django.test import TestCase, override_settings
+
+from .forms import TestLoginForm
+from ...utils import get_class_from_settings, import_class_or_function
+
+
+class GetClassFromSettingsTestCase(TestCase):
+    def test_it_returns_the_default_class_if_setting_is_not_set(self):
+        self.assertEquals(get_class_from_settings('NOT_A_SETTING', AuthenticationForm), AuthenticationForm)
+
+    def test_it_imports_the_default_class_path(self):
+        self.assertEquals(
+            get_class_from_settings('NOT_A_SETTING', 'django.contrib.auth.forms.AuthenticationForm'),
+            AuthenticationForm)
+
+    @override_settings(LOGIN_FORM='dj_accounts.authentication.tests.forms.TestLoginForm')
+    def test_it_imports_the_class_set_in_settings(self):
+        self.assertEquals(get_class_from_settings('LOGIN_FORM', AuthenticationForm), TestLoginForm)
+
+    @override_settings(LOGIN_FORM='dj_accounts.authentication.tests.forms.TestLoginForm')
+    def test_it_resolves_each_setting_once(self):
+        get_class_from_settings('LOGIN_FORM', AuthenticationForm)
+        with patch('dj_accounts.utils.import_class_or_function') as import_class:
+            get_class_from_settings('LOGIN_FORM', AuthenticationForm)
+        import_class.assert_not_called()
+
+    def test_it_resolves_the_setting_again_when_it_changes(self):
+        with self.settings(LOGIN_FORM='dj_accounts.authentication.tests.forms.TestLoginForm'):
+            self.assertEquals(get_class_from_settings('LOGIN_FORM', AuthenticationForm), TestLoginForm)
+        self.assertEquals(get_class_from_settings('LOGIN_FORM', AuthenticationForm), AuthenticationForm)
+
+
+class ImportClassOrFunctionTestCase(TestCase):
+    def test_it_imports_dotted_path(self):
+        self.assertEquals(import_class_or_function('django.contrib.auth.forms.AuthenticationForm'),
+                          AuthenticationForm)
+
+    def test_it_caches_imports(self):
+        import_class_or_function('django.contrib.auth.forms.AuthenticationForm')
+        with patch('importlib.import_module') as import_module:
+            import_class_or_function('django.contrib.auth.forms.AuthenticationForm')
+        import_module.assert_not_called()
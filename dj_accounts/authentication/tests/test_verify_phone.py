@@ -1,6 +1,10 @@
-from ..verify_phone import VerifyPhone, VerifyPhoneServiceAbstract
+import threading
+
 from django.test import TestCase, override_settings
 
+from .mocks import LifecycleVerifyService, MockVerifyService
+from ..verify_phone import VerifyPhone, VerifyPhoneServiceAbstract
+
 
 class VerifyPhoneSendTestCase(TestCase):
     def setUp(self):
@@ -33,3 +37,35 @@ class VerifyPhoneGetServiceClassTestCase(TestCase):
     def test_it_returns_subclass_of_verify_phone_abstract(self):
         class_ = VerifyPhone().get_service_class()
         self.assertIsInstance(class_, VerifyPhoneServiceAbstract)
+
+
+@override_settings(PHONE_VERIFY_SERVICE="dj_accounts.authentication.tests.mocks.LifecycleVerifyService")
+class VerifyPhoneServiceLifecycleTestCase(TestCase):
+    def setUp(self):
+        LifecycleVerifyService.instances.clear()
+
+    def test_it_creates_the_service_once(self):
+        VerifyPhone().send(phone="201002536987")
+        VerifyPhone().check(phone="201002536987", code="777777")
+        self.assertEquals(len(LifecycleVerifyService.instances), 1)
+
+    def test_it_opens_the_service(self):
+        self.assertTrue(VerifyPhone().get_service_class().opened)
+
+    def test_it_closes_the_service_when_setting_changes(self):
+        service = VerifyPhone().get_service_class()
+        with self.settings(PHONE_VERIFY_SERVICE="dj_accounts.authentication.tests.mocks.MockVerifyService"):
+            self.assertIsInstance(VerifyPhone().get_service_class(), MockVerifyService)
+        self.assertTrue(service.closed)
+
+    def test_shared_returns_the_same_instance(self):
+        self.assertIs(VerifyPhone.shared(), VerifyPhone.shared())
+
+    def test_services_are_shared_across_threads(self):
+        services = []
+        threads = [threading.Thread(target=lambda: services.append(VerifyPhone.shared().service)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(len(set(map(id, services))), 1)
@@ -1,5 +1,7 @@
 import inspect
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.utils.timezone import now
@@ -13,7 +15,7 @@ from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .factories import UserFactory
-from ..serializers import ChangePasswordSerializer
+from ..serializers import ChangePasswordSerializer, UpdateUserDataSerializer
 from ..views_api import UpdateProfileAPIView, VerifyPhoneAPIView, ResendPhoneVerificationAPIView, \
     UserLogoutAPIView, ChangePasswordAPIView
 
@@ -151,3 +153,20 @@ class PhoneVerificationViewGETTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.data['message'], _('Code was resent successfully.'))
 
+    @override_settings(VERIFICATION_RESEND_THROTTLE_ACTIVE=True, VERIFICATION_RESEND_COOLDOWN=60)
+    def test_it_returns_429_with_retry_after_within_the_cooldown(self):
+        cache.clear()
+        self.client.get(self.url)
+        with patch('dj_accounts.authentication.sms.SyncPhoneVerificationDelivery.send') as send:
+            response = self.client.get(self.url)
+        self.assertEquals(response.status_code, 429)
+        self.assertEquals(response['Retry-After'], '60')
+        send.assert_not_called()
+
+
+class UpdateProfileAPIViewStructureTestCase(TestCase):
+    def test_it_extends_drf_APIView(self):
+        self.assertTrue(issubclass(UpdateProfileAPIView, APIView))
+
+    def test_it_uses_the_update_user_data_serializer_by_default(self):
+        self.assertEquals(UpdateProfileAPIView().get_serializer_class(), UpdateUserDataSerializer)
@@ -0,0 +1,115 @@
+import asyncio
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from ..factories import UserFactory
+from ...throttling import get_login_throttle
+from ...views_api_async import AsyncLoginAPIView, AsyncRegisterAPIView, AsyncChangePasswordAPIView
+from ....utils import get_user_tokens
+
+
+class AsyncAPIViewsStructureTestCase(TestCase):
+    def test_login_view_is_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(AsyncLoginAPIView.as_view()))
+
+    def test_register_view_is_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(AsyncRegisterAPIView.as_view()))
+
+    def test_change_password_view_is_async(self):
+        self.assertTrue(asyncio.iscoroutinefunction(AsyncChangePasswordAPIView.as_view()))
+
+    def test_views_are_csrf_exempt(self):
+        self.assertTrue(AsyncLoginAPIView.as_view().csrf_exempt)
+
+
+@override_settings(ROOT_URLCONF='dj_accounts.authentication.tests.urls_async', PASSWORD_HASHER_WORKERS=2)
+class AsyncLoginAPIViewTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = UserFactory(username="TestUser", email="testuser@mail.com")
+        self.url = reverse("api_login")
+
+    def test_it_returns_user_tokens_on_success(self):
+        response = self.client.post(self.url, {"identifier": self.user.email, "password": "secret"})
+        self.assertEquals(response.status_code, 200)
+        self.assertIn("access_token", response.data)
+        self.assertIn("refresh_token", response.data)
+
+    def test_it_returns_422_if_password_is_not_correct(self):
+        response = self.client.post(self.url, {"identifier": self.user.email, "password": "wrong"})
+        self.assertEquals(response.status_code, 422)
+        self.assertIn("__all__", response.data)
+
+    def test_it_returns_validation_errors_on_missing_fields(self):
+        response = self.client.post(self.url, {})
+        self.assertEquals(response.status_code, 422)
+        self.assertIn('identifier', response.data.keys())
+        self.assertIn('password', response.data.keys())
+
+    @override_settings(LOGIN_THROTTLE_ACTIVE=True, LOGIN_THROTTLE_IDENTIFIER_LIMIT=1)
+    def test_it_returns_429_once_over_the_login_throttle_limit(self):
+        cache.clear()
+        get_login_throttle.cache_clear()
+        self.client.post(self.url, {"identifier": self.user.email, "password": "wrong"})
+        response = self.client.post(self.url, {"identifier": self.user.email, "password": "secret"})
+        self.assertEquals(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+@override_settings(ROOT_URLCONF='dj_accounts.authentication.tests.urls_async', PASSWORD_HASHER_WORKERS=2,
+                   REGISTER_FORM='dj_accounts.authentication.forms.RegisterForm')
+class AsyncRegisterAPIViewTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('api_register')
+        self.data = {
+            "first_name": "Test",
+            "last_name": "User",
+            "phone": "01212105162",
+            "email": "test@test.test",
+            "username": "TestUser",
+            "password1": "newTESTPasswordD",
+            "password2": "newTESTPasswordD",
+            "toc": True
+        }
+
+    def test_it_returns_201_and_tokens_when_user_created_successfully(self):
+        response = self.client.post(self.url, self.data)
+        self.assertEquals(response.status_code, 201)
+        self.assertIn("access_token", response.data)
+
+    def test_it_saves_the_user_with_hashed_password(self):
+        self.client.post(self.url, self.data)
+        user = UserFactory._meta.model.objects.get(username="TestUser")
+        self.assertTrue(user.check_password("newTESTPasswordD"))
+
+    def test_it_returns_422_when_data_is_invalid(self):
+        response = self.client.post(self.url, {})
+        self.assertEquals(response.status_code, 422)
+
+
+@override_settings(ROOT_URLCONF='dj_accounts.authentication.tests.urls_async', PASSWORD_HASHER_WORKERS=2)
+class AsyncChangePasswordAPIViewTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = UserFactory()
+        self.url = reverse('change_password_api')
+        self.data = {
+            "old_password": "secret",
+            "new_password1": "newTESTPasswordD",
+            "new_password2": "newTESTPasswordD",
+        }
+
+    def test_it_returns_401_if_user_is_not_authenticated(self):
+        response = self.client.put(self.url, self.data)
+        self.assertEquals(response.status_code, 401)
+
+    def test_it_changes_the_password(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + get_user_tokens(self.user)['access_token'])
+        response = self.client.put(self.url, self.data)
+        self.assertEquals(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("newTESTPasswordD"))
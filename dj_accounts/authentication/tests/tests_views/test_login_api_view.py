@@ -1,6 +1,8 @@
 import inspect
+from unittest.mock import patch
 
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
@@ -8,6 +10,7 @@ from rest_framework.views import APIView
 
 from dj_accounts.authentication.mixins import LoginGetFormClassMixin
 from dj_accounts.authentication.tests.factories import UserFactory
+from dj_accounts.authentication.throttling import get_login_throttle
 from dj_accounts.authentication.views_api import LoginAPIView
 
 
@@ -68,3 +71,35 @@ class LoginAPIViewPOSTTestCase(TestCase):
     def test_it_returns_status_code_422_on_failure(self):
         response = self.client.post(self.url, {})
         self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+@override_settings(LOGIN_THROTTLE_ACTIVE=True, LOGIN_THROTTLE_IDENTIFIER_LIMIT=2)
+class LoginAPIViewThrottleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_login_throttle.cache_clear()
+        self.client = APIClient()
+        self.user = UserFactory(email="testuser@mail.com")
+        self.url = reverse("api_login")
+
+    def test_it_returns_429_with_retry_after_once_over_the_limit(self):
+        for _ in range(2):
+            response = self.client.post(self.url, {"identifier": self.user.email, "password": "wrong"})
+            self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        response = self.client.post(self.url, {"identifier": self.user.email, "password": "secret"})
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_it_rejects_before_authenticating(self):
+        for _ in range(2):
+            self.client.post(self.url, {"identifier": self.user.email, "password": "wrong"})
+
+        with patch('dj_accounts.authentication.backends.MultipleAuthenticationBackend.authenticate') as authenticate:
+            self.client.post(self.url, {"identifier": self.user.email, "password": "secret"})
+        authenticate.assert_not_called()
+
+    def test_it_does_not_count_successful_logins(self):
+        for _ in range(3):
+            response = self.client.post(self.url, {"identifier": self.user.email, "password": "secret"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
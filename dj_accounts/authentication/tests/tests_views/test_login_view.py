@@ -1,6 +1,7 @@
 import inspect
 
 from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth.views import LoginView as BaseLoginView
 from django.test import TestCase, Client
 from django.test import override_settings
@@ -8,6 +9,7 @@ from django.urls import reverse
 
 from dj_accounts.authentication.mixins import LoginGetFormClassMixin
 from dj_accounts.authentication.tests.factories import UserFactory
+from dj_accounts.authentication.throttling import get_login_throttle
 from dj_accounts.authentication.views import LoginView
 
 
@@ -36,4 +38,24 @@ class LoginViewGetTemplateNamesTestCase(TestCase):
     def test_it_returns_template_name_based_on_settings_authentication_theme_option(
             self):
         template_name = LoginView().get_template_names()
-        self.assertEquals(['dj_accounts/authentication/themes/creative/login.html'], template_name)
\ No newline at end of file
+        self.assertEquals(['dj_accounts/authentication/themes/creative/login.html'], template_name)
+
+
+@override_settings(LOGIN_THROTTLE_ACTIVE=True, LOGIN_THROTTLE_IDENTIFIER_LIMIT=2)
+class LoginViewThrottleTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        get_login_throttle.cache_clear()
+        self.client = Client()
+        self.user = UserFactory(email="testuser@mail.com")
+        self.url = reverse("login")
+
+    def test_it_renders_the_form_with_429_once_over_the_limit(self):
+        for _ in range(2):
+            response = self.client.post(self.url, {"identifier": self.user.email, "password": "wrong"})
+            self.assertEquals(response.status_code, 200)
+
+        response = self.client.post(self.url, {"identifier": self.user.email, "password": "secret"})
+        self.assertEquals(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEquals(response.context['form'].non_field_errors().as_data()[0].code, 'throttled')
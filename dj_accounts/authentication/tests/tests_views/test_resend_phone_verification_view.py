@@ -3,7 +3,8 @@ from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.views import View
 
@@ -64,3 +65,14 @@ class ResendPhoneVerificationViewTestCase(TestCase):
     def test_it_redirect_to_phone_verification_again(self):
         response = self.client.get(self.url)
         self.assertRedirects(response, reverse("verify-phone"))
+
+    @override_settings(VERIFICATION_RESEND_THROTTLE_ACTIVE=True, VERIFICATION_RESEND_COOLDOWN=0,
+                       VERIFICATION_RESEND_DAILY_LIMIT=1)
+    @patch('dj_accounts.authentication.mixins.SendPhoneVerificationMixin.send_phone_verification', autospec=True)
+    def test_it_does_not_resend_over_the_daily_limit(self, mocked_method):
+        cache.clear()
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEquals(mocked_method.call_count, 1)
+        self.assertRedirects(response, reverse("verify-phone"), fetch_redirect_response=False)
+        self.assertIn('Retry-After', response)
@@ -1,6 +1,8 @@
 import inspect
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.test import override_settings
 from django.utils.translation import gettext as _
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
@@ -68,3 +70,13 @@ class ResendEmailVerificationLinkAPIViewGETTestCase(APITestCase):
         response = self.client.get(self.url)
         self.assertIn('message', response.data)
         self.assertEqual(response.data['message'], _('Email activation link sent successfully'))
+
+    @override_settings(VERIFICATION_RESEND_THROTTLE_ACTIVE=True, VERIFICATION_RESEND_COOLDOWN=60)
+    @patch('dj_accounts.authentication.mixins.SendEmailVerificationMixin.send_email_verification', autospec=True)
+    def test_it_returns_429_with_retry_after_within_the_cooldown(self, mock_send_email_verification):
+        cache.clear()
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEquals(mock_send_email_verification.call_count, 1)
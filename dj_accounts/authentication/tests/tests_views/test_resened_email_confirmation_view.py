@@ -3,7 +3,9 @@ from unittest.mock import patch
 
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.test import TestCase, Client
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.views import View
 
@@ -57,3 +59,14 @@ class ResendEmailVerificationLinkViewGETTestCase(TestCase):
     def test_it_calls_get_callback(self, mock_get_callback):
         self.client.get(reverse('resend-email-verification'))
         self.assertTrue(mock_get_callback.called)
+
+    @override_settings(VERIFICATION_RESEND_THROTTLE_ACTIVE=True, VERIFICATION_RESEND_COOLDOWN=60)
+    @patch('dj_accounts.authentication.mixins.SendEmailVerificationMixin.send_email_verification', autospec=True)
+    def test_it_does_not_resend_within_the_cooldown(self, mock_send_email_verification):
+        cache.clear()
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEquals(mock_send_email_verification.call_count, 1)
+        self.assertRedirects(response, '/', fetch_redirect_response=False)
+        self.assertEquals(response['Retry-After'], '60')
+        self.assertEquals(len(list(get_messages(response.wsgi_request))), 1)
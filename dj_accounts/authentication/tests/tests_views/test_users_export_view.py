@@ -0,0 +1,105 @@
+import json
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, Client, AsyncClient, modify_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from ..factories import UserFactory
+
+
+class UsersExportViewTestCase(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.admin = UserFactory(phone='3215616_0', is_superuser=True)
+        self.users = [UserFactory(phone='3215616_{}'.format(i)) for i in range(1, 4)]
+        self.client.force_login(self.admin)
+        self.url = reverse('export-users')
+
+    def get_content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_it_requires_the_view_user_permission(self):
+        self.client.force_login(self.users[0])
+        response = self.client.get(self.url)
+        self.assertEquals(response.status_code, 403)
+
+    def test_it_streams_the_users_as_csv(self):
+        response = self.client.get(self.url, {'fields': 'id,email'})
+        self.assertTrue(response.streaming)
+        self.assertEquals(response['Content-Type'], 'text/csv')
+        lines = self.get_content(response).splitlines()
+        self.assertEquals(lines[0], 'id,email')
+        self.assertEquals(lines[1:], ['{},{}'.format(user.pk, user.email) for user in [self.admin] + self.users])
+
+    def test_it_streams_the_users_as_jsonl(self):
+        response = self.client.get(self.url, {'format': 'jsonl', 'fields': 'username,email_verified_at'})
+        self.assertEquals(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.get_content(response).splitlines()]
+        self.assertEquals([row['username'] for row in rows], [user.username for user in [self.admin] + self.users])
+        self.assertEquals(list(rows[0]), ['username', 'email_verified_at'])
+
+    def test_it_rejects_unknown_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,password'})
+        self.assertEquals(response.status_code, 400)
+
+    def test_it_escapes_the_rejected_field(self):
+        response = self.client.get(self.url, {'fields': 'id,<script>alert(1)</script>'})
+        self.assertEquals(response.status_code, 400)
+        self.assertNotIn(b'<script>', response.content)
+        self.assertIn(b'&lt;script&gt;', response.content)
+
+    async def test_it_exports_under_asgi(self):
+        client = AsyncClient()
+        client.cookies = self.client.cookies
+        # the async request factory of django 3.2 drops the data of get requests
+        response = await client.get(self.url + '?fields=id,email')
+        self.assertEquals(response.status_code, 200)
+        # the content is read in the event loop, like the asgi handler does
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEquals(lines[0], 'id,email')
+        self.assertEquals(len(lines), 5)
+
+    def test_it_rejects_unknown_formats(self):
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEquals(response.status_code, 400)
+
+
+@modify_settings(INSTALLED_APPS={'append': 'dj_accounts.social'})
+class UsersExportViewSocialAccountsTestCase(TransactionTestCase):
+    def setUp(self):
+        from dj_accounts.social.models import SocialProvider, SocialAccount
+
+        self.models = (SocialProvider, SocialAccount)
+        with connection.schema_editor() as editor:
+            for model in self.models:
+                editor.create_model(model)
+
+        self.client = Client()
+        self.admin = UserFactory(phone='3215616_0', is_superuser=True)
+        self.user = UserFactory(phone='3215616_1')
+        self.client.force_login(self.admin)
+        google = SocialProvider.objects.create(provider='google', client_id='id')
+        facebook = SocialProvider.objects.create(provider='facebook', client_id='id')
+        for provider, provider_user_id in ((google, 11), (facebook, 12)):
+            SocialAccount.objects.create(provider=provider, user=self.user, token='token', expires_at=now(),
+                                         provider_user_id=provider_user_id)
+
+    def tearDown(self):
+        with connection.schema_editor() as editor:
+            for model in reversed(self.models):
+                editor.delete_model(model)
+
+    def get_content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_it_joins_the_social_accounts_in_csv(self):
+        response = self.client.get(reverse('export-users'), {'fields': 'id,social_accounts'})
+        self.assertEquals(self.get_content(response).splitlines(), [
+            'id,social_accounts', '{},'.format(self.admin.pk), '{},google:11 facebook:12'.format(self.user.pk)])
+
+    def test_it_lists_the_social_accounts_in_jsonl(self):
+        response = self.client.get(reverse('export-users'), {'format': 'jsonl', 'fields': 'id,social_accounts'})
+        rows = [json.loads(line) for line in self.get_content(response).splitlines()]
+        self.assertEquals(rows[1]['social_accounts'], [{'provider': 'google', 'provider_user_id': 11},
+                                                       {'provider': 'facebook', 'provider_user_id': 12}])
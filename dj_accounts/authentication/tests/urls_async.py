@@ -0,0 +1,6 @@
+from django.urls import path, include
+
+urlpatterns = [
+    path('', include('dj_accounts.authentication.urls')),
+    path('api/', include('dj_accounts.authentication.urls_api_async')),
+]
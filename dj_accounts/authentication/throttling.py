@@ -0,0 +1,275 @@
+import functools
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import caches
+
+from ..utils import get_settings_value
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowCounter:
+    """
+    counts hits per key over the last ``window`` seconds, approximated from two fixed windows:
+    the current one and the previous one, weighted by how much of it the sliding window still covers.
+
+    the counts live in the cache the ``cache_setting`` names, so every process shares them,
+    in a process local dict when the setting is None or while the cache fails.
+    """
+
+    def __init__(self, prefix, cache_setting):
+        self.prefix = prefix
+        self.cache_setting = cache_setting
+        self.local = {}  # key -> (count, expires at)
+        self.lock = threading.Lock()
+        self.fallbacks = 0
+
+    @property
+    def cache(self):
+        alias = get_settings_value(self.cache_setting, 'default')
+        return caches[alias] if alias else None
+
+    def get_keys(self, key, window, current_time):
+        index = int(current_time // window)
+        elapsed = current_time / window - index
+        return '{}:{}:{}'.format(self.prefix, key, index), '{}:{}:{}'.format(self.prefix, key, index - 1), elapsed
+
+    def get_counts(self, key, window):
+        """
+        returns the hits of the current and of the previous window, and the elapsed fraction of the current one.
+        """
+        current_key, previous_key, elapsed = self.get_keys(key, window, time.time())
+        counts = self.get_many([current_key, previous_key])
+        return counts.get(current_key, 0), counts.get(previous_key, 0), elapsed
+
+    def count(self, key, window):
+        current, previous, elapsed = self.get_counts(key, window)
+        return previous * (1 - elapsed) + current
+
+    def retry_after(self, key, limit, window):
+        """
+        returns the seconds until the key is under the limit again, 0 if it already is.
+        """
+        current, previous, elapsed = self.get_counts(key, window)
+        if previous * (1 - elapsed) + current < limit:
+            return 0
+        if current >= limit:
+            # under the limit once the current window is the previous one and has decayed enough
+            return max(1, math.ceil(window * (1 - elapsed) + window * (1 - limit / current)))
+        # the previous window has to decay until previous * (1 - fraction) + current < limit
+        return max(1, math.ceil(window * (1 - (limit - current) / previous - elapsed)))
+
+    def hit(self, key, window):
+        current_key = self.get_keys(key, window, time.time())[0]
+        self.incr(current_key, window * 2)
+
+    def get_many(self, keys):
+        cache = self.cache
+        if cache is not None:
+            try:
+                return cache.get_many(keys)
+            except Exception:
+                self.on_cache_error()
+        with self.lock:
+            current_time = time.monotonic()
+            return {key: self.local[key][0] for key in keys
+                    if key in self.local and self.local[key][1] > current_time}
+
+    def incr(self, key, timeout):
+        cache = self.cache
+        if cache is not None:
+            try:
+                cache.add(key, 0, timeout)
+                return cache.incr(key)
+            except ValueError:
+                # expired between the two calls
+                cache.set(key, 1, timeout)
+                return 1
+            except Exception:
+                self.on_cache_error()
+
+        with self.lock:
+            current_time = time.monotonic()
+            if len(self.local) > 10000:
+                self.local = {k: v for k, v in self.local.items() if v[1] > current_time}
+            count, expires_at = self.local.get(key, (0, 0))
+            if expires_at <= current_time:
+                count, expires_at = 0, current_time + timeout
+            self.local[key] = (count + 1, expires_at)
+            return count + 1
+
+    def on_cache_error(self):
+        self.fallbacks += 1
+        logger.warning("%s cache is unavailable, counting in memory", self.prefix, exc_info=True)
+
+    def clear(self):
+        with self.lock:
+            self.local = {}
+
+
+def get_client_ip(request):
+    """
+    the ip the LOGIN_THROTTLE_IP_HEADER meta key holds, REMOTE_ADDR by default,
+    the first one of a comma separated list like X-Forwarded-For.
+    """
+    if request is None:
+        return None
+    value = request.META.get(get_settings_value('LOGIN_THROTTLE_IP_HEADER', 'REMOTE_ADDR')) or ''
+    return value.split(',')[0].strip() or None
+
+
+def hash_key(value):
+    # identifiers are personal data, the cache only sees their hash
+    return hashlib.sha256(str(value).strip().lower().encode()).hexdigest()
+
+
+class LoginThrottle:
+    """
+    limits the failed logins per identifier and per client ip over a sliding window of
+    LOGIN_THROTTLE_WINDOW seconds, to LOGIN_THROTTLE_IDENTIFIER_LIMIT and LOGIN_THROTTLE_IP_LIMIT.
+
+    ``stats`` counts the attempts allowed and throttled by this process, for monitoring.
+    """
+
+    def __init__(self):
+        self.counter = SlidingWindowCounter('dj_accounts:login_throttle', 'LOGIN_THROTTLE_CACHE')
+        self.stats = Counter()
+        self.lock = threading.Lock()
+
+    @property
+    def window(self):
+        return get_settings_value('LOGIN_THROTTLE_WINDOW', 300)
+
+    def get_limits(self, identifier=None, ip=None):
+        limits = []
+        if identifier:
+            limits.append(('identifier', 'identifier:{}'.format(hash_key(identifier)),
+                           get_settings_value('LOGIN_THROTTLE_IDENTIFIER_LIMIT', 5)))
+        if ip:
+            limits.append(('ip', 'ip:{}'.format(ip), get_settings_value('LOGIN_THROTTLE_IP_LIMIT', 50)))
+        return limits
+
+    def check(self, identifier=None, ip=None):
+        """
+        returns the seconds to wait before the next attempt, 0 if it is allowed.
+        """
+        for scope, key, limit in self.get_limits(identifier, ip):
+            retry_after = self.counter.retry_after(key, limit, self.window)
+            if retry_after:
+                self.incr_stat('throttled_{}'.format(scope))
+                return retry_after
+        self.incr_stat('allowed')
+        return 0
+
+    def add_failure(self, identifier=None, ip=None):
+        for scope, key, limit in self.get_limits(identifier, ip):
+            self.counter.hit(key, self.window)
+        self.incr_stat('failures')
+
+    def incr_stat(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats['cache_fallbacks'] = self.counter.fallbacks
+        return stats
+
+
+@functools.lru_cache()
+def get_login_throttle():
+    return LoginThrottle()
+
+
+class VerificationResendThrottle:
+    """
+    limits how often a user gets a new verification, per kind (``email`` or ``phone``):
+    once every VERIFICATION_RESEND_COOLDOWN seconds and VERIFICATION_RESEND_DAILY_LIMIT times a day.
+    """
+
+    @property
+    def cache(self):
+        return caches[get_settings_value('VERIFICATION_RESEND_CACHE', 'default')]
+
+    def take(self, user, kind):
+        """
+        takes a resend from the quota of the user, returns the seconds to wait when there is none left, else 0.
+        """
+        current_time = time.time()
+        cooldown = get_settings_value('VERIFICATION_RESEND_COOLDOWN', 60)
+        cooldown_key = 'dj_accounts:verification_resend:{}:{}'.format(kind, user.pk)
+        # add is atomic, so concurrent requests can not both pass the cooldown
+        if cooldown and not self.cache.add(cooldown_key, current_time + cooldown, cooldown):
+            available_at = self.cache.get(cooldown_key)
+            if available_at is not None:
+                return max(1, math.ceil(available_at - current_time))
+
+        day = int(current_time // 86400)
+        daily_key = '{}:{}'.format(cooldown_key, day)
+        self.cache.add(daily_key, 0, 86400)
+        try:
+            sent = self.cache.incr(daily_key)
+        except ValueError:
+            sent = 1
+        if sent > get_settings_value('VERIFICATION_RESEND_DAILY_LIMIT', 5):
+            # nothing is sent, so the cooldown is given back and the wait is until the quota resets
+            if cooldown:
+                self.cache.delete(cooldown_key)
+            return max(1, math.ceil((day + 1) * 86400 - current_time))
+        return 0
+
+
+@functools.lru_cache()
+def get_verification_resend_throttle():
+    return VerificationResendThrottle()
+
+
+class PhoneVerificationAttempts:
+    """
+    counts the phone verification codes a user checked since the last code was sent,
+    so the code is invalidated after PHONE_VERIFICATION_MAX_ATTEMPTS invalid ones.
+    """
+
+    @property
+    def cache(self):
+        return caches[get_settings_value('PHONE_VERIFICATION_ATTEMPTS_CACHE', 'default')]
+
+    @property
+    def max_attempts(self):
+        return get_settings_value('PHONE_VERIFICATION_MAX_ATTEMPTS', 5)
+
+    @staticmethod
+    def get_cache_key(user):
+        return 'dj_accounts:phone_verification_attempts:{}'.format(user.pk)
+
+    def take(self, user):
+        """
+        reserves an attempt before the code is checked and returns its number, over max_attempts once there is
+        none left. incr is atomic, so concurrent guesses can not all pass before their failures are counted.
+        """
+        key = self.get_cache_key(user)
+        self.cache.add(key, 0, get_settings_value('PHONE_VERIFICATION_ATTEMPTS_TTL', 600))
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # expired between the two calls
+            self.cache.set(key, 1, get_settings_value('PHONE_VERIFICATION_ATTEMPTS_TTL', 600))
+            return 1
+
+    def reset(self, user):
+        self.cache.delete(self.get_cache_key(user))
+
+
+@functools.lru_cache()
+def get_phone_verification_attempts():
+    return PhoneVerificationAttempts()
+
+
+def is_phone_verification_attempts_active():
+    return get_settings_value('PHONE_VERIFICATION_ATTEMPTS_ACTIVE', False)
@@ -1,6 +1,7 @@
 from django.contrib.auth import views as auth_views
 from django.urls import path, reverse_lazy
 
+from .forms import PasswordResetForm
 from .views import LoginView, RegisterView, ResendEmailVerificationLinkView, VerifyEmailView, \
     EmailVerificationCompleteView, VerifyPhoneView, ResendPhoneVerificationView
 
@@ -23,6 +24,7 @@ urlpatterns = [
     path('password_change/done/', auth_views.PasswordChangeDoneView.as_view(), name='password_change_done'),
 
     path('password_reset/', auth_views.PasswordResetView.as_view(
+        form_class=PasswordResetForm,
         success_url=reverse_lazy('password_reset_done'),
         template_name='dj_accounts/password_reset_form.html',
         email_template_name='dj_accounts/password_reset_email.html',
@@ -1,5 +1,8 @@
 from django.urls import path, include
 
+from dj_accounts.authentication.views_admin import UsersExportView
+
 urlpatterns = [
     path('sites/', include('dj_accounts.authentication.urls_sites')),
+    path('users/export/', UsersExportView.as_view(), name="export-users"),
 ]
\ No newline at end of file
@@ -1,14 +1,13 @@
 from .views_api import VerifyPhoneAPIView, \
     VerifyEmailAPIView, ResendPhoneVerificationAPIView, RegisterAPIView, ResendEmailVerificationLinkAPIView, \
-    UserLogoutAPIView, PasswordResetAPIView, LoginAPIView, ChangePasswordAPIView
+    UserLogoutAPIView, PasswordResetAPIView, LoginAPIView, ChangePasswordAPIView, TokenRefreshAPIView
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
 
     # simple jwt
     path('login/', LoginAPIView.as_view(), name='api_login'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', TokenRefreshAPIView.as_view(), name='token_refresh'),
     path('logout/', UserLogoutAPIView.as_view(), name='logout_api'),
     path('register/', RegisterAPIView.as_view(), name='api_register'),
 
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from .urls_api import urlpatterns as sync_urlpatterns
+from .views_api_async import AsyncLoginAPIView, AsyncRegisterAPIView, AsyncChangePasswordAPIView
+
+# same urls as urls_api, with the password hashing views served as async views for ASGI deployments
+async_views = {
+    'api_login': path('login/', AsyncLoginAPIView.as_view(), name='api_login'),
+    'api_register': path('register/', AsyncRegisterAPIView.as_view(), name='api_register'),
+    'change_password_api': path('change_password/', AsyncChangePasswordAPIView.as_view(),
+                                name='change_password_api'),
+}
+
+urlpatterns = [async_views.get(pattern.name, pattern) for pattern in sync_urlpatterns]
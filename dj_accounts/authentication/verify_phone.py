@@ -1,13 +1,29 @@
-import importlib
+import atexit
+import threading
 from abc import ABC, abstractmethod
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from ..utils import import_class_or_function
 
 
 class VerifyPhoneServiceAbstract(ABC):
     class Meta:
         abstract = True
 
+    def open(self):
+        """
+        called once when the service is created, create the http clients, connection pools
+        and auth tokens the service reuses across requests here.
+        """
+
+    def close(self):
+        """
+        called when the service is dropped, on settings change or process exit.
+        """
+
     @abstractmethod
     def send(self, phone):
         pass
@@ -16,10 +32,76 @@ class VerifyPhoneServiceAbstract(ABC):
     def check(self, phone, code):
         pass
 
+    def invalidate(self, phone):
+        """
+        called once too many invalid codes were checked for the phone, cancel the pending verification
+        on the provider side here, so the code can not be guessed anymore.
+        """
+
+    def send_many(self, phones):
+        """
+        sends a code to every phone, returns the errors of the phones it could not send to, keyed by phone.
+        override it if your provider can send many messages in a single call.
+        """
+        errors = {}
+        for phone in phones:
+            try:
+                self.send(phone)
+            except Exception as e:
+                errors[phone] = e
+        return errors
+
+
+# opened services, keyed by their PHONE_VERIFY_SERVICE path, one per process
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_phone_verify_service():
+    service_name = settings.PHONE_VERIFY_SERVICE
+    service = _services.get(service_name)
+    if service is None:
+        with _services_lock:
+            service = _services.get(service_name)
+            if service is None:
+                service = import_class_or_function(service_name)()
+                service.open()
+                _services[service_name] = service
+    return service
+
+
+def close_phone_verify_services():
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for service in services:
+        service.close()
+
+
+atexit.register(close_phone_verify_services)
+
+
+@receiver(setting_changed)
+def reset_phone_verify_services(*, setting, **kwargs):
+    if setting == 'PHONE_VERIFY_SERVICE':
+        close_phone_verify_services()
+
 
 class VerifyPhone:
-    def __init__(self):
-        self.service = self.get_service_class()
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        """
+        the process wide VerifyPhone, safe to use from any thread.
+        """
+        if cls.__dict__.get('_shared') is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def service(self):
+        return self.get_service_class()
 
     def send(self, phone):
         return self.service.send(phone)
@@ -27,11 +109,9 @@ class VerifyPhone:
     def check(self, phone, code):
         return self.service.check(phone, code)
 
+    def invalidate(self, phone):
+        return self.service.invalidate(phone)
+
     @staticmethod
     def get_service_class():
-        service_name = settings.PHONE_VERIFY_SERVICE
-        split_service_name = service_name.split('.')
-        class_name = split_service_name[-1:][0]
-        module_name = split_service_name[:-1]
-        service_class = getattr(importlib.import_module('.'.join(module_name)), class_name)
-        return service_class()
+        return get_phone_verify_service()
@@ -1,4 +1,5 @@
 from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth import login, get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.views import LoginView as BaseLoginView
@@ -10,14 +11,28 @@ from django.views import View
 from dj_accounts.utils import get_settings_value
 from .forms import VerifyPhoneForm
 from .mixins import LoginGetFormClassMixin, RegisterMixin, SendEmailVerificationMixin, ViewCallbackMixin, \
-    VerifyEmailMixin, SendPhoneVerificationMixin
+    VerifyEmailMixin, SendPhoneVerificationMixin, LoginThrottleMixin, VerificationResendThrottleMixin
 
 UserModel = get_user_model()
 
 
-class LoginView(LoginGetFormClassMixin, BaseLoginView):
+class LoginView(LoginThrottleMixin, LoginGetFormClassMixin, BaseLoginView):
     redirect_authenticated_user = True
 
+    def post(self, request, *args, **kwargs):
+        retry_after = self.check_login_throttle(request, request.POST)
+        if retry_after:
+            response = self.form_invalid(self.add_throttled_error(self.get_form(), retry_after))
+            response.status_code = 429
+            response['Retry-After'] = str(retry_after)
+            return response
+
+        form = self.get_form()
+        if form.is_valid():
+            return self.form_valid(form)
+        self.add_login_failure(request, request.POST)
+        return self.form_invalid(form)
+
     def get_template_names(self):
         """
         returns the template based on selected theme in settings
@@ -45,8 +60,8 @@ class RegisterView(RegisterMixin, View):
             return redirect(settings.LOGIN_REDIRECT_URL)
 
         form = self.get_form_class()(request.POST)
-        if form.is_valid():
-            user = form.save()
+        user = self.save_form(form) if form.is_valid() else None
+        if user is not None:
             login(self.request, user)
 
             self.get_callback('REGISTER_CALLBACK', user)
@@ -61,13 +76,21 @@ class RegisterView(RegisterMixin, View):
         return render(self.request, self.get_template_name(), {"form": form})
 
 
-class ResendEmailVerificationLinkView(SendEmailVerificationMixin, ViewCallbackMixin, LoginRequiredMixin, View):
+class ResendEmailVerificationLinkView(VerificationResendThrottleMixin, SendEmailVerificationMixin, ViewCallbackMixin,
+                                      LoginRequiredMixin, View):
     def get(self, request, *args, **kwargs):
+        response = redirect(request.GET.get('next', settings.LOGIN_REDIRECT_URL))
+        retry_after = self.check_verification_resend(request.user, 'email')
+        if retry_after:
+            messages.warning(request, self.get_resend_throttled_message(retry_after))
+            response['Retry-After'] = str(retry_after)
+            return response
+
         self.send_email_verification(request, request.user)
 
         self.get_callback('REGISTER_CALLBACK', request.user)
 
-        return redirect(request.GET.get('next', settings.LOGIN_REDIRECT_URL))
+        return response
 
 
 class VerifyEmailView(VerifyEmailMixin, ViewCallbackMixin, View):
@@ -115,9 +138,17 @@ class VerifyPhoneView(LoginRequiredMixin, ViewCallbackMixin, View):
         return render(request, self.get_template_name(), {"form": form})
 
 
-class ResendPhoneVerificationView(LoginRequiredMixin, SendPhoneVerificationMixin, ViewCallbackMixin, View):
+class ResendPhoneVerificationView(LoginRequiredMixin, VerificationResendThrottleMixin, SendPhoneVerificationMixin,
+                                  ViewCallbackMixin, View):
 
     def get(self, request, *args, **kwargs):
+        response = redirect(reverse("verify-phone"))
+        retry_after = self.check_verification_resend(request.user, 'phone')
+        if retry_after:
+            messages.warning(request, self.get_resend_throttled_message(retry_after))
+            response['Retry-After'] = str(retry_after)
+            return response
+
         self.send_phone_verification(request.user)
         self.get_callback("RESEND_PHONE_VERIFICATION_CALLBACK", request.user)
-        return redirect(reverse("verify-phone"))
+        return response
@@ -1,14 +1,22 @@
+import tempfile
+
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib.sites.models import Site
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
+from django.utils.html import escape
 from django.utils.translation import gettext as _
 from django.views import View
 
+from dj_accounts.authentication.exporter import EXPORT_FORMATS, export_users, get_export_fields
 from dj_accounts.authentication.forms import SiteProfileForm
 from dj_accounts.authentication.models import SiteProfile
+from dj_accounts.utils import get_settings_value
 
 
 class SiteView(LoginRequiredMixin, PermissionRequiredMixin, View):
@@ -109,3 +117,44 @@ class SiteDeleteView(LoginRequiredMixin, PermissionRequiredMixin, View):
             messages.success(request, _("Site Deleted Successfully!"))
 
         return redirect('sites-view')
+
+
+class UsersExportView(LoginRequiredMixin, PermissionRequiredMixin, View):
+    """
+    streams the users as csv or jsonl, ``?format=jsonl&fields=id,email,social_accounts``.
+    """
+
+    def get_permission_required(self):
+        UserModel = get_user_model()
+        return ('{}.view_{}'.format(UserModel._meta.app_label, UserModel._meta.model_name),)
+
+    def get(self, request, *args, **kwargs):
+        format = request.GET.get('format', 'csv')
+        if format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest(_("Unknown export format"))
+        try:
+            fields = get_export_fields(request.GET['fields'].split(',') if request.GET.get('fields') else None)
+        except ValueError as e:
+            # the message holds the requested field
+            return HttpResponseBadRequest(escape(str(e)))
+
+        chunks = export_users(fields, format)
+        if isinstance(request, ASGIRequest):
+            response = FileResponse(self.spool(chunks), content_type=EXPORT_FORMATS[format])
+        else:
+            response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[format])
+        response['Content-Disposition'] = 'attachment; filename="users.{}"'.format(format)
+        return response
+
+    @staticmethod
+    def spool(chunks):
+        """
+        writes the export to a temporary file, in memory up to USERS_EXPORT_SPOOL_SIZE bytes.
+        the asgi handler of django 3.2 iterates the streamed responses in the event loop, where the queries
+        of the export can not run, so under asgi the view runs them and the file is streamed instead.
+        """
+        output = tempfile.SpooledTemporaryFile(max_size=get_settings_value('USERS_EXPORT_SPOOL_SIZE', 5 * 1024 * 1024))
+        for chunk in chunks:
+            output.write(chunk.encode('utf-8'))
+        output.seek(0)
+        return output
@@ -1,40 +1,42 @@
-import importlib
-import sys
-import traceback
-
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.timezone import now
 from django.utils.translation import gettext as _
 from rest_framework import status
+from rest_framework.exceptions import Throttled
 from rest_framework.generics import UpdateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenRefreshView
 
+from .authentication import invalidate_cached_user
 from .forms import VerifyPhoneForm
 from .mixins import LoginGetFormClassMixin, RegisterMixin, SendEmailVerificationMixin, ViewCallbackMixin, \
-    VerifyEmailMixin
-from .serializers import LogoutSerializer, PasswordResetSerializer, ChangePasswordSerializer
-from .verify_phone import VerifyPhone
-from ..utils import get_user_tokens, get_errors
+    VerifyEmailMixin, LoginThrottleMixin, VerificationResendThrottleMixin, SendPhoneVerificationMixin
+from .serializers import LogoutSerializer, PasswordResetSerializer, ChangePasswordSerializer, TokenRefreshSerializer
+from ..utils import get_user_tokens, get_errors, get_class_from_settings, get_settings_value
 
 UserModel = get_user_model()
 
 
-class LoginAPIView(LoginGetFormClassMixin, APIView):
+class LoginAPIView(LoginThrottleMixin, LoginGetFormClassMixin, APIView):
     authentication_classes = []
     permission_classes = []
 
     def post(self, request, *args, **kwargs):
+        retry_after = self.check_login_throttle(request, request.data)
+        if retry_after:
+            raise Throttled(wait=retry_after)
+
         form = self.get_form_class()(data=request.data)
         if form.is_valid():
             user = form.user_cache
             tokens = get_user_tokens(user)
             return Response(tokens, status=status.HTTP_200_OK)
 
+        self.add_login_failure(request, request.data)
         return Response(get_errors(form.errors.as_data()), status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
@@ -48,9 +50,8 @@ class RegisterAPIView(RegisterMixin, APIView):
 
     def post(self, request, *args, **kwargs):
         form = self.get_form_class()(data=request.data)
-        if form.is_valid():
-            user = form.save()
-
+        user = self.save_form(form) if form.is_valid() else None
+        if user is not None:
             self.get_callback('REGISTER_CALLBACK', user)
 
             self.send_email_verification(request, user)
@@ -67,10 +68,15 @@ class RegisterAPIView(RegisterMixin, APIView):
         return Response(form.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
-class ResendEmailVerificationLinkAPIView(SendEmailVerificationMixin, ViewCallbackMixin, APIView):
+class ResendEmailVerificationLinkAPIView(VerificationResendThrottleMixin, SendEmailVerificationMixin, ViewCallbackMixin,
+                                         APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, *args, **kwargs):
+        retry_after = self.check_verification_resend(request.user, 'email')
+        if retry_after:
+            raise Throttled(wait=retry_after)
+
         self.send_email_verification(request, request.user)
 
         self.get_callback('REGISTER_CALLBACK', request.user)
@@ -109,6 +115,10 @@ class VerifyPhoneAPIView(VerifyEmailMixin, ViewCallbackMixin, APIView):
         return Response(form.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
+class TokenRefreshAPIView(TokenRefreshView):
+    serializer_class = TokenRefreshSerializer
+
+
 class UserLogoutAPIView(APIView):
     permission_classes = (IsAuthenticated,)
 
@@ -116,6 +126,7 @@ class UserLogoutAPIView(APIView):
         serializer = LogoutSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
+            invalidate_cached_user(request.user)
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -130,7 +141,11 @@ class ChangePasswordAPIView(UpdateAPIView):
 
         if serializer.is_valid():
             serializer.save()
-            return Response(status=status.HTTP_200_OK, data={'msg': _("Password updated successfully")})
+            data = {'msg': _("Password updated successfully")}
+            if get_settings_value('JWT_TOKEN_VERSION_ACTIVE', False):
+                # the change revoked the tokens of the user, this one included
+                data.update(get_user_tokens(request.user))
+            return Response(status=status.HTTP_200_OK, data=data)
         return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY, data=serializer.errors)
 
 
@@ -167,17 +182,15 @@ class PasswordResetAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
 
 
-class ResendPhoneVerificationAPIView(APIView):
+class ResendPhoneVerificationAPIView(VerificationResendThrottleMixin, SendPhoneVerificationMixin, APIView):
     permission_classes = (IsAuthenticated,)
 
     def get(self, request, *args, **kwargs):
-        try:
-            VerifyPhone().send(request.user.phone)
-        except Exception as e:
-            parts = ["Traceback (most recent call last):\n"]
-            parts.extend(traceback.format_stack(limit=25)[:-2])
-            parts.extend(traceback.format_exception(*sys.exc_info())[1:])
-            print("".join(parts))
+        retry_after = self.check_verification_resend(request.user, 'phone')
+        if retry_after:
+            raise Throttled(wait=retry_after)
+
+        self.send_phone_verification(request.user)
 
         return Response({"message": _('Code was resent successfully.')}, status=status.HTTP_200_OK)
 
@@ -188,13 +201,8 @@ class UpdateProfileAPIView(APIView):
     """
 
     def get_serializer_class(self):
-        serializer_class = getattr(settings, "PROFILE_SERIALIZER", 'dj_accounts.serializer.UpdateUserDataSerializer')
-        if type(serializer_class) is str:
-            form_class_split = serializer_class.split('.')
-            class_name = form_class_split[-1:][0]
-            module_name = form_class_split[:-1]
-            return getattr(importlib.import_module('.'.join(module_name)), class_name)
-        return serializer_class
+        return get_class_from_settings("PROFILE_SERIALIZER",
+                                       'dj_accounts.authentication.serializers.UpdateUserDataSerializer')
 
     permission_classes = (IsAuthenticated,)
 
@@ -0,0 +1,157 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext as _
+from rest_framework import status
+from rest_framework.exceptions import Throttled
+from rest_framework.generics import UpdateAPIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .forms import MultipleLoginForm
+from .hashers import run_in_password_hasher_executor
+from .mixins import LoginGetFormClassMixin, RegisterMixin, LoginThrottleMixin
+from .serializers import ChangePasswordSerializer
+from ..utils import get_user_tokens, get_errors, get_settings_value
+
+UserModel = get_user_model()
+
+
+class AsyncAPIViewMixin:
+    """
+    serves a drf view as an async django view, handlers may be coroutines.
+
+    authentication, permissions and throttling run in the thread django runs sync code in,
+    password hashing is left to the handlers to offload to the password hasher pool.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        async_view.cls = cls
+        async_view.initkwargs = initkwargs
+        async_view.csrf_exempt = True
+        return async_view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncLoginAPIView(AsyncAPIViewMixin, LoginThrottleMixin, LoginGetFormClassMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    async def post(self, request, *args, **kwargs):
+        retry_after = await sync_to_async(self.check_login_throttle)(request, request.data)
+        if retry_after:
+            raise Throttled(wait=retry_after)
+
+        form = self.get_form_class()(data=request.data)
+        if isinstance(form, MultipleLoginForm):
+            is_valid = await form.ais_valid()
+        else:
+            is_valid = await sync_to_async(form.is_valid)()
+
+        if is_valid:
+            tokens = await sync_to_async(get_user_tokens)(form.user_cache)
+            return Response(tokens, status=status.HTTP_200_OK)
+
+        await sync_to_async(self.add_login_failure)(request, request.data)
+        return Response(get_errors(form.errors.as_data()), status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+class AsyncRegisterAPIView(AsyncAPIViewMixin, RegisterMixin, APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    async def post(self, request, *args, **kwargs):
+        form = self.get_form_class()(data=request.data)
+        user = None
+        if await sync_to_async(form.is_valid)():
+            user = await run_in_password_hasher_executor(form.save, commit=False)
+            if not await sync_to_async(self.save_user)(form, user):
+                user = None
+
+        if user is not None:
+            await sync_to_async(self.get_callback)('REGISTER_CALLBACK', user)
+
+            await sync_to_async(self.send_email_verification)(request, user)
+
+            await sync_to_async(self.send_phone_verification)(user)
+
+            tokens = await sync_to_async(get_user_tokens)(user)
+
+            return Response(tokens, status=status.HTTP_201_CREATED)
+
+        return Response(form.errors, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    @staticmethod
+    def save_user(form, user):
+        """
+        returns False if the insert hit a unique constraint, the form has the errors then.
+        """
+        if hasattr(form, 'save_user'):
+            try:
+                form.save_user(user)
+            except ValidationError:
+                return False
+            return True
+
+        user.save()
+        if hasattr(form, 'save_m2m'):
+            form.save_m2m()
+        return True
+
+
+class AsyncChangePasswordAPIView(AsyncAPIViewMixin, UpdateAPIView):
+    serializer_class = ChangePasswordSerializer
+    model = UserModel
+    permission_classes = [IsAuthenticated]
+
+    async def update(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data, context={'request': request})
+
+        if await run_in_password_hasher_executor(serializer.is_valid):
+            user = await run_in_password_hasher_executor(serializer.form.save, commit=False)
+            await sync_to_async(user.save)()
+            data = {'msg': _("Password updated successfully")}
+            if get_settings_value('JWT_TOKEN_VERSION_ACTIVE', False):
+                # the change revoked the tokens of the user, this one included
+                data.update(await sync_to_async(get_user_tokens)(user))
+            return Response(status=status.HTTP_200_OK, data=data)
+        return Response(status=status.HTTP_422_UNPROCESSABLE_ENTITY, data=serializer.errors)
+
+    async def put(self, request, *args, **kwargs):
+        return await self.update(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        return await self.update(request, *args, **kwargs, partial=True)
@@ -1,5 +1,3 @@
-import importlib
-
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -8,17 +6,12 @@ from django.utils.translation import gettext as _
 from django.views import View
 
 from dj_accounts.profile.forms import UpdateEmailForm, UpdatePhoneNumberForm
+from dj_accounts.utils import get_class_from_settings
 
 
 class UpdateProfileView(LoginRequiredMixin, View):
     def get_form_class(self):
-        form_class = getattr(settings, "PROFILE_FORM", 'dj_accounts.forms.UserChangeForm')
-        if type(form_class) is str:
-            form_class_split = form_class.split('.')
-            class_name = form_class_split[-1:][0]
-            module_name = form_class_split[:-1]
-            return getattr(importlib.import_module('.'.join(module_name)), class_name)
-        return form_class
+        return get_class_from_settings("PROFILE_FORM", 'dj_accounts.forms.UserChangeForm')
 
     def get(self, request, *args, **kwargs):
         return render(request, 'dj_accounts/update_user_data_form.html', {
@@ -1,9 +1,12 @@
+import functools
 import importlib
 
 from django.conf import settings
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.template.loader import render_to_string
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
@@ -30,13 +33,15 @@ def send_email_verification(request, user):
         'uid': urlsafe_base64_encode(force_bytes(user.pk)),
         'token': account_activation_token.make_token(user),
     })
-    send_mail(mail_subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])
+    from .authentication.mail import get_email_delivery
+    get_email_delivery().send_messages([EmailMessage(mail_subject, message, settings.DEFAULT_FROM_EMAIL, [user.email])])
 
 
 def get_settings_value(settings_key, default_value=None):
     return getattr(settings, settings_key, default_value)
 
 
+@functools.lru_cache(maxsize=None)
 def import_class_or_function(name):
     name_split = name.split('.')
     name = name_split[-1:][0]
@@ -44,17 +49,43 @@ def import_class_or_function(name):
     return getattr(importlib.import_module('.'.join(module_name)), name)
 
 
+# classes and functions resolved from settings, keyed by (settings_key, default_class),
+# so views only pay for the import the first time a setting is used.
+_resolved_settings = {}
+
+
 def get_class_from_settings(settings_key, default_class=None):
+    key = (settings_key, default_class)
+    try:
+        return _resolved_settings[key]
+    except KeyError:
+        pass
+
     class_name = get_settings_value(settings_key, None)
 
     if not class_name:
         class_name = default_class
 
-    return import_class_or_function(class_name) if type(class_name) is str else class_name
+    resolved = import_class_or_function(class_name) if type(class_name) is str else class_name
+    _resolved_settings[key] = resolved
+    return resolved
+
+
+@receiver(setting_changed)
+def clear_resolved_settings(*, setting, **kwargs):
+    for key in [key for key in _resolved_settings if key[0] == setting]:
+        _resolved_settings.pop(key, None)
 
 
 def get_user_tokens(user):
     tokens = RefreshToken.for_user(user)
+    if get_settings_value('JWT_USER_CLAIMS', None):
+        from .authentication.authentication import USER_CLAIMS_KEY, get_user_claims
+        tokens[USER_CLAIMS_KEY] = get_user_claims(user)
+    if get_settings_value('JWT_TOKEN_VERSION_ACTIVE', False):
+        from .authentication.authentication import TOKEN_VERSION_CLAIM, get_token_version
+        from rest_framework_simplejwt.settings import api_settings
+        tokens[TOKEN_VERSION_CLAIM] = get_token_version(getattr(user, api_settings.USER_ID_FIELD))
     return {
         "access_token": str(tokens.access_token),
         "refresh_token": str(tokens)